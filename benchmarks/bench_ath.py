@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized ATH engine (`analytic.ath_engine`) against the old per-date loop.
+
+Run from repo root:
+
+    python3 benchmarks/bench_ath.py
+    python3 benchmarks/bench_ath.py --rows 50000 200000 1000000
+
+Each size is three synthetic minute-level random walks with upward drift (so ATHs are frequent,
+which is the worst case for the old loop's list-membership tests). The legacy loop is skipped
+above `--legacy-max` rows since it grows quadratically. Event tables are compared for equality.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+import analytic  # noqa: E402
+
+
+def synthetic_prices(rows: int, seed: int = 0) -> dict[str, pd.Series]:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2020-01-01", periods=rows, freq="min")
+    out = {}
+    for i, label in enumerate(("BTC", "ETH", "XMR")):
+        steps = rng.normal(2e-5, 1e-3, rows)
+        # Stagger the listings so the outer join has leading gaps, like the real datasets.
+        start = i * rows // 10
+        out[label] = pd.Series(100 * np.exp(np.cumsum(steps[start:])), index=index[start:])
+    return out
+
+
+def legacy_events(prices: dict[str, pd.Series], start_date: pd.Timestamp) -> pd.DataFrame:
+    """
+    The pre-engine algorithm: per-asset ATH date lists, then a Python loop over the union with
+    `in` tests against the lists and per-date `.loc` lookups.
+    """
+    ath_dates = {}
+    for label, s in prices.items():
+        is_ath = s == s.cummax()
+        ath_dates[label] = s[is_ath & (s.index >= start_date)].index.tolist()
+
+    result_data = []
+    for date in sorted(set().union(*ath_dates.values())):
+        row = {"Date": date, "ATH_Coins": ", ".join(label for label in prices if date in ath_dates[label])}
+        for label, s in prices.items():
+            row[f"{label}_Price"] = s.loc[date] if date in s.index else None
+        result_data.append(row)
+    return pd.DataFrame(result_data)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized ATH engine.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 50_000, 200_000, 1_000_000])
+    parser.add_argument("--legacy-max", type=int, default=200_000, help="Skip the legacy loop above this size")
+    args = parser.parse_args()
+
+    print(f"{'rows':>9s} {'events':>7s} {'legacy':>10s} {'engine':>10s} {'speedup':>8s}  match")
+    for rows in args.rows:
+        prices = synthetic_prices(rows)
+        start = prices["BTC"].index[rows // 2]
+
+        t0 = time.perf_counter()
+        result = analytic.ath_engine(prices, start)
+        t_engine = time.perf_counter() - t0
+
+        if rows <= args.legacy_max:
+            t0 = time.perf_counter()
+            legacy = legacy_events(prices, start)
+            t_legacy = time.perf_counter() - t0
+            ok = np.array_equal(legacy["ATH_Coins"].to_numpy(), result.events["ATH_Coins"].to_numpy()) and all(
+                np.allclose(legacy[c].astype(float), result.events[c], equal_nan=True)
+                for c in legacy.columns
+                if c.endswith("_Price")
+            )
+            legacy_s, speedup, match = f"{t_legacy:9.3f}s", f"{t_legacy / t_engine:7.0f}x", str(ok)
+        else:
+            legacy_s, speedup, match = f"{'-':>10s}", f"{'-':>8s}", "-"
+
+        print(f"{rows:9d} {len(result.events):7d} {legacy_s} {t_engine:9.3f}s {speedup}  {match}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized daily CPI generator against the old row-by-row implementation.
+
+Run from repo root:
+
+    python3 benchmarks/bench_cpi_generator.py
+
+Both implementations run on `datasets/CPI_U.csv` with the same target end date, and the
+written CSVs are compared byte-for-byte.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "datasets"))
+
+import generator_cpi_daily as gen  # noqa: E402
+
+
+def legacy_generate(df: pd.DataFrame, target_end: date) -> pd.DataFrame:
+    """
+    The pre-vectorization generator (iterrows + per-day dicts + scalar .loc writes).
+    """
+    def add_month(d: datetime) -> datetime:
+        if d.month == 12:
+            return datetime(d.year + 1, 1, 1)
+        return datetime(d.year, d.month + 1, 1)
+
+    def interpolate_daily(start_value, end_value, start_date, end_date):
+        days = (end_date - start_date).days
+        if days <= 0:
+            return []
+        daily_increment = (end_value - start_value) / days
+        out = []
+        cur = start_date
+        for i in range(days):
+            out.append({"timestamp": cur.strftime("%Y-%m-%d"), "CPI": round(start_value + i * daily_increment, 4)})
+            cur += timedelta(days=1)
+        return out
+
+    points = []
+    for _, row in df.iterrows():
+        year = int(row["Year"])
+        monthly = pd.to_numeric(row[gen.MONTH_COLS], errors="coerce").values
+        for m in range(1, 13):
+            v = monthly[m - 1]
+            if pd.isna(v):
+                continue
+            points.append((datetime(year, m, 1), float(v)))
+    points.sort(key=lambda x: x[0])
+
+    end = datetime(target_end.year, target_end.month, target_end.day)
+    last_dt, last_v = points[-1]
+    prev_v = points[-2][1] if len(points) >= 2 else last_v
+    monthly_delta = last_v - prev_v
+    while add_month(last_dt) < end:
+        nxt_dt = add_month(last_dt)
+        nxt_v = last_v + monthly_delta
+        points.append((nxt_dt, nxt_v))
+        last_dt, last_v = nxt_dt, nxt_v
+
+    daily_data = []
+    for i in range(len(points) - 1):
+        dt0, v0 = points[i]
+        dt1, v1 = points[i + 1]
+        daily_data.extend(interpolate_daily(v0, v1, dt0, dt1))
+
+    daily_df = pd.DataFrame(daily_data)
+    daily_df = daily_df.drop_duplicates(subset=["timestamp"], keep="last")
+    daily_df["__dt__"] = pd.to_datetime(daily_df["timestamp"], errors="coerce")
+    daily_df = daily_df.dropna(subset=["__dt__"]).sort_values("__dt__")
+    daily_df = daily_df[daily_df["__dt__"] < pd.Timestamp(end)]
+    daily_df = daily_df.drop(columns=["__dt__"]).reset_index(drop=True)
+
+    daily_df["daily_multiplicator"] = 1.0
+    for i in range(1, len(daily_df)):
+        cpi_n = daily_df.loc[i, "CPI"]
+        cpi_n_1 = daily_df.loc[i - 1, "CPI"]
+        daily_df.loc[i, "daily_multiplicator"] = round(1 + (cpi_n - cpi_n_1) / cpi_n_1, 6)
+    return daily_df
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark daily CPI generation (legacy vs vectorized).")
+    parser.add_argument("--cpi-path", default=str(REPO_ROOT / "datasets" / "CPI_U.csv"))
+    parser.add_argument("--end", default=None, help="Exclusive end date (YYYY-MM-DD). Default: tomorrow (UTC).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per implementation (best time is reported).")
+    args = parser.parse_args()
+
+    target_end = gen.default_target_end() if args.end is None else datetime.strptime(args.end, "%Y-%m-%d").date()
+    df = pd.read_csv(args.cpi_path, sep=",")
+
+    t_legacy = _best_of(lambda: legacy_generate(df, target_end), args.repeat)
+    t_new = _best_of(lambda: gen.generate_daily_cpi(df, target_end=target_end), args.repeat)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_csv = Path(tmp) / "legacy.csv"
+        new_csv = Path(tmp) / "new.csv"
+        legacy_generate(df, target_end).to_csv(
+            legacy_csv, sep=";", index=False, columns=["timestamp", "CPI", "daily_multiplicator"]
+        )
+        daily_df = gen.generate_daily_cpi(df, target_end=target_end)
+        gen.write_daily_cpi(daily_df, new_csv)
+        identical = legacy_csv.read_bytes() == new_csv.read_bytes()
+
+    print(f"rows={len(daily_df)} target_end={target_end}")
+    print(f"legacy:     {t_legacy * 1000:9.1f} ms")
+    print(f"vectorized: {t_new * 1000:9.1f} ms  ({t_legacy / t_new:.0f}x faster)")
+    print(f"byte-identical output: {identical}")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Check and time the incremental daily CPI update against a full rebuild.
+
+Run from repo root:
+
+    python3 benchmarks/bench_cpi_incremental.py
+
+Each scenario edits a copy of `datasets/CPI_U.csv` in memory, splices the change into a
+copy of the daily file and compares the bytes with a full rebuild.
+"""
+from __future__ import annotations
+
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "datasets"))
+
+import generator_cpi_daily as gen  # noqa: E402
+
+
+def _set(year: int, col: str, value: str):
+    def apply(df: pd.DataFrame) -> None:
+        df.loc[df["Year"] == str(year), col] = value
+
+    return apply
+
+
+SCENARIOS = [
+    ("no change (tail only)", [], set()),
+    ("fill latest hole", [_set(2025, "Oct", "324.5")], {(2025, 10)}),
+    ("new latest month", [_set(2026, "May", "334.1")], {(2026, 5)}),
+    ("revise an old month", [_set(1990, "Mar", "128.0")], {(1990, 3)}),
+    ("blank latest month", [_set(2026, "Apr", "")], {(2026, 4)}),
+]
+
+
+def main() -> int:
+    target_end = date(2026, 10, 18)
+    base = pd.read_csv(REPO_ROOT / "datasets" / "CPI_U.csv", dtype=str, keep_default_na=False)
+    ok = True
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        seed = tmp / "seed.csv"
+        gen.write_daily_cpi(gen.generate_daily_cpi(base, target_end=target_end), seed)
+
+        for name, edits, touched in SCENARIOS:
+            df = base.copy()
+            for edit in edits:
+                edit(df)
+
+            work = tmp / "work.csv"
+            shutil.copy(seed, work)
+            t0 = time.perf_counter()
+            written = gen.update_daily_cpi(df, work, touched=touched, target_end=target_end)
+            t_inc = time.perf_counter() - t0
+
+            full = tmp / "full.csv"
+            t0 = time.perf_counter()
+            gen.write_daily_cpi(gen.generate_daily_cpi(df, target_end=target_end), full)
+            t_full = time.perf_counter() - t0
+
+            same = work.read_bytes() == full.read_bytes()
+            ok = ok and same
+            print(
+                f"{name:24s} rows rewritten={written:6d}  incremental={t_inc * 1000:6.1f} ms  "
+                f"full={t_full * 1000:6.1f} ms  identical={same}"
+            )
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark one million random CPI deflations with `debase_data.CpiIndex`.
+
+Run from repo root:
+
+    python3 benchmarks/bench_cpi_index.py
+    python3 benchmarks/bench_cpi_index.py --lookups 5000000
+
+Compared ways of turning (price, date) pairs into real dollars:
+- "pandas": `Series.reindex` of the date-indexed daily CPI frame (hash lookup per date)
+- "searchsorted": binary search on the sorted day array (O(log n) per date)
+- "CpiIndex": dense array offset (O(1) per date), dates given as datetime64 or epoch days
+- "bisect loop": stdlib `bisect` per scalar, as a plain-Python script would do it; run on a
+  subset and extrapolated
+
+Load times (CSV parse vs cached daily array vs in-memory rebuild from `CPI_U.csv`) are also shown.
+All methods must agree.
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+from debase_data import CpiIndex, clear_cache, load  # noqa: E402
+
+
+def _timed(fn, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark CpiIndex lookups.")
+    parser.add_argument("--lookups", type=int, default=1_000_000)
+    parser.add_argument("--loop-lookups", type=int, default=100_000, help="Subset run through the bisect loop")
+    args = parser.parse_args()
+
+    csv_path = REPO_ROOT / "datasets" / "daily_cpi_inflation.csv"
+    t_csv, _ = _timed(lambda: pd.read_csv(csv_path, sep=";", parse_dates=["timestamp"]))
+
+    def cached():
+        clear_cache()
+        return CpiIndex.load(fallback=False)
+
+    t_cached, cpi = _timed(cached)
+    t_monthly, _ = _timed(lambda: CpiIndex.from_monthly())
+
+    rng = np.random.default_rng(0)
+    days = rng.integers(cpi.first_day, cpi.last_day + 1, args.lookups)
+    dates = days.astype("datetime64[D]")
+    prices = rng.uniform(1, 100_000, args.lookups)
+    base = cpi.last_date
+
+    frame = load("daily_cpi")
+    series = frame["cpi"]
+    sorted_days = np.asarray(frame.index, dtype="datetime64[D]").astype(np.int64)
+    values = series.to_numpy()
+    base_cpi = cpi.at(base)
+
+    t_pandas, r_pandas = _timed(
+        lambda: prices * base_cpi / series.reindex(pd.DatetimeIndex(dates.astype("datetime64[ns]"))).to_numpy()
+    )
+    t_search, r_search = _timed(lambda: prices * base_cpi / values[np.searchsorted(sorted_days, days)])
+    t_dense_dt, r_dense = _timed(lambda: cpi.deflate(prices, dates, base))
+    t_dense_days, r_dense_days = _timed(lambda: cpi.deflate(prices, days, base))
+
+    n_loop = min(args.loop_lookups, args.lookups)
+    day_list, value_list = sorted_days.tolist(), values.tolist()
+    loop_days, loop_prices = days[:n_loop].tolist(), prices[:n_loop].tolist()
+
+    def bisect_loop():
+        return [p * base_cpi / value_list[bisect.bisect_left(day_list, d)] for p, d in zip(loop_prices, loop_days)]
+
+    t_loop, r_loop = _timed(bisect_loop, repeat=1)
+    t_loop *= args.lookups / n_loop
+
+    ok = (
+        np.allclose(r_pandas, r_dense)
+        and np.allclose(r_search, r_dense)
+        and np.allclose(r_dense_days, r_dense)
+        and np.allclose(r_loop, r_dense[:n_loop])
+    )
+
+    print(f"load: read_csv {t_csv * 1000:.1f}ms | CpiIndex (cache) {t_cached * 1000:.2f}ms | "
+          f"CpiIndex.from_monthly {t_monthly * 1000:.1f}ms")
+    print(f"{args.lookups:,} random deflations ({cpi.first_date}..{cpi.last_date}, {len(cpi):,} days):")
+    for label, t in [
+        ("bisect loop (extrapolated)", t_loop),
+        ("pandas reindex", t_pandas),
+        ("searchsorted", t_search),
+        ("CpiIndex, datetime64 dates", t_dense_dt),
+        ("CpiIndex, epoch days", t_dense_days),
+    ]:
+        print(f"  {label:28s} {t * 1000:9.2f}ms  {args.lookups / t / 1e6:8.1f}M/s")
+    print(f"  all agree: {ok}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark end-to-end `update_cpi` latency against a stubbed BLS endpoint.
+
+Run from repo root:
+
+    python3 benchmarks/bench_cpi_update.py
+    python3 benchmarks/bench_cpi_update.py --repeat 10
+
+Each run starts from a fresh temp copy of `CPI_U.csv`, the generator and a daily file rebuilt
+from that table (so the incremental splice starts from a consistent file). The local stub
+answers with the table's own values for the requested years plus one new month. Compared daily-series paths after the monthly table is written:
+- "subprocess": the old flow, `python generator_cpi_daily.py` in the datasets directory (new
+  interpreter, re-reads `CPI_U.csv`, rebuilds the whole daily file)
+- "in-process full": `generate_daily_cpi()` on the in-memory table (`--full-daily`)
+- "in-process incremental": the default splice of the touched months
+
+All three must leave byte-identical files behind.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+import update_cpi  # noqa: E402
+from debase_data.cache import refresh_cache  # noqa: E402
+from http_client import make_session  # noqa: E402
+
+FILES = ["CPI_U.csv", "daily_cpi_inflation.csv", "generator_cpi_daily.py"]
+
+
+def bls_rows(cpi_csv: Path) -> dict[int, list[dict]]:
+    """BLS-style data rows per year from the CPI table, plus one month after the last value."""
+    df = update_cpi._load_cpi_table(cpi_csv)
+    out: dict[int, list[dict]] = {}
+    last = None
+    for _, row in df.iterrows():
+        for m, col in update_cpi.MONTH_NUM_TO_COL.items():
+            value = str(row[col]).strip()
+            if value:
+                out.setdefault(int(row["Year"]), []).append({"year": str(row["Year"]), "period": f"M{m:02d}", "value": value})
+                last = (int(row["Year"]), m, float(value))
+    year, month, value = last
+    year, month = (year, month + 1) if month < 12 else (year + 1, 1)
+    out.setdefault(year, []).append({"year": str(year), "period": f"M{month:02d}", "value": f"{value * 1.003:.3f}"})
+    return out
+
+
+def serve_bls(rows: dict[int, list[dict]]) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            years = range(int(payload["startyear"]), int(payload["endyear"]) + 1)
+            data = [r for y in reversed(years) for r in reversed(rows.get(y, []))]
+            series = [{"seriesID": s, "data": data} for s in payload["seriesid"]]
+            body = json.dumps({"status": "REQUEST_SUCCEEDED", "message": [], "Results": {"series": series}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def subprocess_regenerate(cfg, df, touched_cells, full, verify) -> None:
+    # The flow before the generator became importable.
+    subprocess.run(
+        [sys.executable, cfg.generator_py.name], cwd=cfg.generator_py.parent, check=True, capture_output=True
+    )
+    refresh_cache(cfg.daily_csv)
+
+
+def seed(tmp: Path) -> Path:
+    """Copy the inputs, with the daily file rebuilt so it matches `CPI_U.csv` exactly."""
+    seed_dir = tmp / "seed"
+    seed_dir.mkdir()
+    for name in FILES:
+        shutil.copy2(REPO_ROOT / "datasets" / name, seed_dir / name)
+    generator = update_cpi._load_generator(seed_dir / "generator_cpi_daily.py")
+    table = update_cpi._load_cpi_table(seed_dir / "CPI_U.csv")
+    generator.write_daily_cpi(generator.generate_daily_cpi(table), seed_dir / "daily_cpi_inflation.csv")
+    return seed_dir
+
+
+def run_once(seed_dir: Path, url: str, mode: str) -> tuple[float, bytes, bytes]:
+    work = seed_dir.parent / mode
+    shutil.rmtree(work, ignore_errors=True)
+    shutil.copytree(seed_dir, work)
+    cfg = update_cpi.CpiConfig("CUUR0000SA0", work / "CPI_U.csv", work / "generator_cpi_daily.py")
+
+    original = update_cpi._regenerate_daily
+    if mode == "subprocess":
+        update_cpi._regenerate_daily = subprocess_regenerate
+    try:
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            update_cpi.update_cpi(
+                cfg,
+                end_year=pd.Timestamp.now(tz="UTC").year,
+                dry_run=False,
+                debug=False,
+                lookback_years=3,
+                overwrite_existing=True,
+                full_daily=mode == "in-process full",
+                session=make_session(None),
+                bls_url=url,
+            )
+        elapsed = time.perf_counter() - t0
+    finally:
+        update_cpi._regenerate_daily = original
+    return elapsed, cfg.cpi_csv.read_bytes(), cfg.daily_csv.read_bytes()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark update_cpi end to end against a stubbed BLS.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    server = serve_bls(bls_rows(REPO_ROOT / "datasets" / "CPI_U.csv"))
+    url = f"http://127.0.0.1:{server.server_port}/"
+    modes = ["subprocess", "in-process full", "in-process incremental"]
+    timings: dict[str, list[float]] = {m: [] for m in modes}
+    outputs: dict[str, tuple[bytes, bytes]] = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp_name:
+            seed_dir = seed(Path(tmp_name))
+            for _ in range(args.repeat):
+                for mode in modes:
+                    elapsed, monthly, daily = run_once(seed_dir, url, mode)
+                    timings[mode].append(elapsed)
+                    outputs[mode] = (monthly, daily)
+    finally:
+        server.shutdown()
+
+    ok = all(outputs[m] == outputs[modes[0]] for m in modes)
+    baseline = statistics.median(timings["subprocess"])
+    print(f"update_cpi end to end (stubbed BLS, median of {args.repeat}):")
+    for mode in modes:
+        t = statistics.median(timings[mode])
+        print(f"  {mode:24s} {t * 1000:8.1f}ms  ({baseline / t:4.1f}x)")
+    print(f"  identical outputs: {ok}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark loading the seven date-indexed datasets from CSV vs the binary cache.
+
+Run from repo root:
+
+    python3 benchmarks/bench_dataset_cache.py
+
+"csv" parses the file with pandas and date parsing (what the scripts do today); "cache"
+memory-maps the `.npy` arrays through `dataset_cache.load_dataset` (fresh cache, stat check
+only), and "cache+frame" also wraps them in a date-indexed DataFrame.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+from debase_data import cache as dataset_cache  # noqa: E402
+
+
+def load_csv(csv_path: Path, spec: dataset_cache.DatasetSpec) -> pd.DataFrame:
+    df = pd.read_csv(csv_path, sep=spec.sep, parse_dates=[spec.date_column])
+    return df.set_index(spec.date_column).sort_index()
+
+
+def _per_call(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark CSV vs binary cache load times.")
+    parser.add_argument("--datasets-dir", default=str(REPO_ROOT / "datasets"))
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    root = Path(args.datasets_dir)
+    totals = [0.0, 0.0, 0.0]
+    print(f"{'dataset':10s} {'rows':>6s} {'csv':>9s} {'cache':>9s} {'cache+frame':>12s} {'speedup':>8s}")
+    for spec in dataset_cache.DATASETS.values():
+        csv_path = root / spec.csv_name
+        if not csv_path.exists():
+            continue
+        rows = len(dataset_cache.load_dataset(csv_path, spec).dates)  # also warms/builds the cache
+
+        t_csv = _per_call(lambda: load_csv(csv_path, spec), args.repeat)
+        t_cache = _per_call(lambda: dataset_cache.load_dataset(csv_path, spec), args.repeat)
+        t_frame = _per_call(lambda: dataset_cache.load_dataset(csv_path, spec).to_frame(), args.repeat)
+        for i, t in enumerate((t_csv, t_cache, t_frame)):
+            totals[i] += t
+        print(
+            f"{spec.name:10s} {rows:6d} {t_csv * 1000:7.2f}ms {t_cache * 1000:7.3f}ms "
+            f"{t_frame * 1000:10.3f}ms {t_csv / t_frame:7.0f}x"
+        )
+
+    print(
+        f"{'all':10s} {'':6s} {totals[0] * 1000:7.2f}ms {totals[1] * 1000:7.3f}ms "
+        f"{totals[2] * 1000:10.3f}ms {totals[0] / totals[2]:7.0f}x"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming Kraken dump importer (`scripts/import_kraken_dump.py`) on a generated
+trades dump.
+
+Run from repo root:
+
+    python3 benchmarks/bench_kraken_import.py                 # 2 GB fixture in a temp dir
+    python3 benchmarks/bench_kraken_import.py --gb 8 --keep /data/XBTUSD_fixture.csv
+
+The fixture is a headerless `timestamp,price,volume` file like Kraken's "Time and Sales" dumps
+(one trade every ~2s on average, random-walk price). The importer runs in a child process
+writing daily rows to a temp CSV (`--output`, no dataset merge), and its peak RSS is read from
+`getrusage(RUSAGE_CHILDREN)`. A small fixture is also checked against a whole-file groupby.
+"""
+from __future__ import annotations
+
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+import import_kraken_dump  # noqa: E402
+
+BLOCK_ROWS = 1_000_000
+
+
+def write_fixture(path: Path, target_bytes: int, seed: int = 0) -> int:
+    """Write trades until the file reaches `target_bytes`; returns the row count."""
+    rng = np.random.default_rng(seed)
+    ts, price, rows = 1_381_000_000.0, 100.0, 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        while f.tell() < target_bytes:
+            stamps = ts + np.cumsum(rng.exponential(2.0, BLOCK_ROWS))
+            prices = price * np.exp(np.cumsum(rng.normal(0, 2e-4, BLOCK_ROWS)))
+            volumes = rng.exponential(0.5, BLOCK_ROWS)
+            block = pd.DataFrame({"t": stamps.round(4), "p": prices.round(5), "v": volumes.round(8)})
+            block.to_csv(f, header=False, index=False)
+            ts, price, rows = stamps[-1], prices[-1], rows + BLOCK_ROWS
+    return rows
+
+
+def check_small(tmp: Path) -> bool:
+    path = tmp / "small.csv"
+    write_fixture(path, 20_000_000, seed=1)
+    streamed, _ = import_kraken_dump.aggregate_dump(path, chunksize=50_000)
+
+    df = pd.read_csv(path, header=None, names=["t", "p", "v"])
+    g = df.groupby((df["t"] // 86400).astype(np.int64))
+    expected = pd.DataFrame(
+        {"Open": g["p"].first(), "High": g["p"].max(), "Low": g["p"].min(), "Close": g["p"].last(),
+         "Volume": g["v"].sum()}
+    )
+    return len(streamed) == len(expected) and all(
+        np.allclose(streamed[c].to_numpy(), expected[c].to_numpy()) for c in expected.columns
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the streaming Kraken dump importer.")
+    parser.add_argument("--gb", type=float, default=2.0, help="Fixture size in GB (default: 2)")
+    parser.add_argument("--chunksize", type=int, default=import_kraken_dump.DEFAULT_CHUNKSIZE)
+    parser.add_argument("--keep", default=None, help="Write/reuse the fixture at this path instead of a temp dir")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_name:
+        tmp = Path(tmp_name)
+        ok = check_small(tmp)
+        print(f"small fixture matches whole-file groupby: {ok}")
+
+        fixture = Path(args.keep) if args.keep else tmp / "XBTUSD_trades.csv"
+        target = int(args.gb * 1e9)
+        if not fixture.exists() or fixture.stat().st_size < target:
+            t0 = time.perf_counter()
+            rows = write_fixture(fixture, target)
+            print(f"generated {fixture} ({fixture.stat().st_size / 1e9:.2f} GB, {rows:,} rows) "
+                  f"in {time.perf_counter() - t0:.0f}s")
+
+        t0 = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, str(REPO_ROOT / "scripts" / "import_kraken_dump.py"), "--dump", str(fixture),
+             "--output", str(tmp / "daily.csv"), "--chunksize", str(args.chunksize)],
+            capture_output=True,
+            text=True,
+        )
+        elapsed = time.perf_counter() - t0
+        if proc.returncode != 0:
+            print(proc.stdout + proc.stderr)
+            return 1
+        peak_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024  # KiB -> MiB on Linux
+
+        print(proc.stdout.strip())
+        print(f"fixture {fixture.stat().st_size / 1e9:.2f} GB: {elapsed:.1f}s wall (incl. interpreter start), "
+              f"peak RSS {peak_rss:.0f} MiB, chunksize {args.chunksize:,}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark last-date detection on the real `datasets/*.csv` files: the old pandas full
+parse vs `csv_io.read_max_date` (seek + read the edges, full scan only for unsorted files).
+
+Run from repo root:
+
+    python3 benchmarks/bench_last_date.py
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+from csv_io import read_max_date, sort_direction  # noqa: E402
+
+DATASETS = [
+    ("bitcoin_2010-07-17_2025-07-25.csv", "End", ","),
+    ("ethereum_2015-08-07_2025-07-25.csv", "End", ","),
+    ("monero_2014-05-21_2025-07-25.csv", "End", ","),
+    ("gold.csv", "Price", ","),
+    ("silver.csv", "Price", ","),
+    ("daily_cpi_inflation.csv", "timestamp", ";"),
+    ("M2SL.csv", "observation_date", ","),
+]
+
+
+def pandas_max_date(csv_path: Path, column: str, sep: str):
+    # What the updaters used to do.
+    df = pd.read_csv(csv_path, usecols=[column], sep=sep)
+    parsed = pd.to_datetime(df[column], errors="coerce", utc=True).dropna()
+    return None if parsed.empty else parsed.max().date()
+
+
+def _per_call(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark last-date detection on datasets/*.csv.")
+    parser.add_argument("--datasets-dir", default=str(REPO_ROOT / "datasets"))
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    ok = True
+    print(f"{'file':38s} {'order':>5s} {'pandas':>10s} {'tail read':>10s} {'speedup':>8s}  max date")
+    for name, column, sep in DATASETS:
+        path = Path(args.datasets_dir) / name
+        if not path.exists():
+            continue
+        expected = pandas_max_date(path, column, sep)
+        got = read_max_date(path, column, delimiter=sep)
+        ok = ok and expected == got
+
+        t_pd = _per_call(lambda: pandas_max_date(path, column, sep), args.repeat)
+        t_tail = _per_call(lambda: read_max_date(path, column, delimiter=sep), args.repeat)
+        order = sort_direction(path, column, delimiter=sep) or "-"
+        flag = "" if expected == got else f"  MISMATCH (pandas={expected})"
+        print(
+            f"{name:38s} {order:>5s} {t_pd * 1000:8.2f}ms {t_tail * 1000:8.3f}ms {t_pd / t_tail:7.0f}x  {got}{flag}"
+        )
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
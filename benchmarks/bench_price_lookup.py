@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark the ETH month-end price lookups of a 10-year monthly SRS_stake analysis.
+
+Run from repo root:
+
+    python3 benchmarks/bench_price_lookup.py
+
+- "legacy": what SRS_stake.py used to do — read the CSV for the period, then for every month
+  end a boolean scan on string dates, retrying up to 7 days before/after one day at a time.
+- "loc": the same retry loop with `.loc` lookups on the date-indexed frame from `debase_data`.
+- "lookup": `PriceLookup.nearest()` on all month ends at once (searchsorted), built once.
+
+All three must return the same prices. Pass `--gaps` to drop random days from the data so the
+retry paths are exercised.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+from debase_data import PriceLookup, load  # noqa: E402
+from debase_data.cache import DATASETS  # noqa: E402
+
+
+def month_ends(start: date, months: int) -> list[date]:
+    out = []
+    for i in range(1, months + 1):
+        y, m = divmod(start.month - 1 + i, 12)
+        out.append(date(start.year + y, m + 1, 1) - timedelta(days=1))
+    return out
+
+
+def _retry(get, day: date):
+    price = get(day)
+    for step in (-1, 1):
+        for j in range(1, 8):
+            if price is not None:
+                return price
+            price = get(day + timedelta(days=step * j))
+    return price
+
+
+def legacy(csv_path: Path, days: list[date], drop: set[str]) -> list:
+    eth_data = pd.read_csv(csv_path)
+    eth_data["Start"] = pd.to_datetime(eth_data["Start"]).dt.strftime("%Y-%m-%d")
+    eth_data = eth_data[~eth_data["Start"].isin(drop)]
+
+    def get(d: date):
+        try:
+            return eth_data[eth_data["Start"] == d.strftime("%Y-%m-%d")]["Close"].iloc[0]
+        except (IndexError, KeyError):
+            return None
+
+    return [_retry(get, d) for d in days]
+
+
+def with_loc(frame: pd.DataFrame, days: list[date]) -> list:
+    def get(d: date):
+        try:
+            return frame.loc[pd.Timestamp(d), "close"]
+        except KeyError:
+            return None
+
+    return [_retry(get, d) for d in days]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark SRS_stake price lookups.")
+    parser.add_argument("--start", default="2015-09-01")
+    parser.add_argument("--months", type=int, default=120)
+    parser.add_argument("--gaps", type=float, default=0.0, help="Fraction of days to drop (default: 0)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    csv_path = REPO_ROOT / "datasets" / DATASETS["ethereum"].csv_name
+    days = month_ends(date.fromisoformat(args.start), args.months)
+
+    frame = load("ethereum")
+    rng = np.random.default_rng(0)
+    dropped = frame.index[rng.random(len(frame)) < args.gaps]
+    drop = set(dropped.strftime("%Y-%m-%d"))
+    frame = frame.drop(dropped)
+
+    def timed(fn):
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            out = fn()
+        return (time.perf_counter() - t0) / args.repeat, out
+
+    t_legacy, p_legacy = timed(lambda: legacy(csv_path, days, drop))
+    t_loc, p_loc = timed(lambda: with_loc(frame, days))
+    t_build, lookup = timed(lambda: PriceLookup.from_series(frame["close"]))
+    t_lookup, p_lookup = timed(lambda: lookup.nearest(days, max_days=7))
+
+    as_array = lambda xs: np.array([np.nan if x is None else x for x in xs], dtype=float)  # noqa: E731
+    same = np.allclose(as_array(p_legacy), p_lookup, equal_nan=True) and np.allclose(
+        as_array(p_loc), p_lookup, equal_nan=True
+    )
+
+    print(f"{len(days)} month ends from {days[0]} to {days[-1]}, {len(drop)} days dropped")
+    print(f"  legacy  (read CSV + string scan): {t_legacy * 1000:9.2f}ms")
+    print(f"  loc     (indexed frame, retries): {t_loc * 1000:9.2f}ms")
+    print(f"  lookup  (batch searchsorted):     {t_lookup * 1000:9.3f}ms  (+{t_build * 1000:.3f}ms to build once)")
+    print(f"  speedup vs legacy: {t_legacy / (t_lookup + t_build):.0f}x  vs loc: {t_loc / t_lookup:.0f}x")
+    print(f"  same prices: {same}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
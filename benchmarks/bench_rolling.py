@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark `build_rolling.build_rolling()` on the real datasets: time and peak memory.
+
+Run from repo root:
+
+    python3 benchmarks/bench_rolling.py
+    python3 benchmarks/bench_rolling.py --repeat 10
+
+Timed runs are untraced (best of `--repeat`, loaders warm); the peak is the tracemalloc peak
+of one more run, traced on its own since tracing slows every allocation. `build_rolling.py`
+itself only traces memory under `--profile`.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+import build_rolling  # noqa: E402
+from debase_data.cache import DEFAULT_DATASETS_DIR  # noqa: E402
+
+MIB = 1024 * 1024
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the rolling-horizon matrices build.")
+    parser.add_argument("--datasets-dir", default=str(DEFAULT_DATASETS_DIR), help="Directory with the dataset CSVs")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs; the fastest counts (default: 5)")
+    args = parser.parse_args()
+    datasets_dir = Path(args.datasets_dir)
+
+    build_rolling.build_rolling(datasets_dir)  # warm the loaders' binary cache
+    best = float("inf")
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        manifest, arrays = build_rolling.build_rolling(datasets_dir)
+        best = min(best, time.perf_counter() - t0)
+
+    del manifest, arrays
+    tracemalloc.start()
+    manifest, arrays = build_rolling.build_rolling(datasets_dir)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    size = sum(a.nbytes for a in arrays.values())
+    for name, entry in manifest["assets"].items():
+        print(f"{name:9s} {entry['days']:6d} days x {len(manifest['horizons'])} horizons")
+    print(f"{len(arrays)} matrices, {size / MIB:.1f} MiB")
+    print(f"  build_rolling(): {best:8.3f}s (best of {args.repeat})")
+    print(f"  traced peak:     {peak / MIB:8.1f} MiB")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
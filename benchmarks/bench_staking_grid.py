@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark `staking.simulate()` on a start-date x horizon grid against a per-cell Python loop.
+
+Run from repo root:
+
+    python3 benchmarks/bench_staking_grid.py
+    python3 benchmarks/bench_staking_grid.py --starts 3000 --horizons 90 365 730
+
+The loop is what extending SRS_stake.py by hand would look like: for every strategy, start and
+horizon, compound the balance one day at a time and look up the end price. It only runs on the
+first `--loop-starts` start dates; its time is scaled up to the full grid for the comparison.
+Balances and end values of the shared cells are compared.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+from debase_data import PriceLookup  # noqa: E402
+from staking import Strategy, simulate  # noqa: E402
+
+
+def loop_grid(prices: pd.Series, strategies: list[Strategy], starts: pd.DatetimeIndex, horizons: list[int]):
+    rows = []
+    for strategy in strategies:
+        daily = 1 + strategy.apr * (1 - strategy.reward_fee) / strategy.compounds_per_year
+        for h in horizons:
+            for start in starts:
+                balance = 1.0
+                for _ in range(h):
+                    balance *= daily
+                end = start + pd.Timedelta(days=h)
+                price = prices.get(end, np.nan)
+                rows.append((balance, balance * price))
+    return np.array(rows)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark vectorized staking grid sweeps.")
+    parser.add_argument("--starts", type=int, default=3000, help="Number of daily start dates")
+    parser.add_argument("--horizons", type=int, nargs="+", default=[90, 365, 730], help="Horizons in days")
+    parser.add_argument("--loop-starts", type=int, default=100, help="Start dates run through the loop")
+    args = parser.parse_args()
+
+    strategies = [Strategy.from_apy("SRS", 0.045), Strategy.from_apy("ETH Stake", 0.027, reward_fee=0.1)]
+    lookup = PriceLookup.from_dataset("ethereum")
+    series = pd.Series(lookup.values, index=pd.DatetimeIndex(lookup.days.astype("datetime64[D]").astype("datetime64[ns]")))
+    starts = pd.date_range("2016-01-01", periods=args.starts)
+    cells = len(strategies) * len(starts) * len(args.horizons)
+
+    t0 = time.perf_counter()
+    grid = simulate(lookup, strategies, starts, args.horizons, max_gap_days=0)
+    t_vec = time.perf_counter() - t0
+
+    few = starts[: args.loop_starts]
+    t0 = time.perf_counter()
+    looped = loop_grid(series, strategies, few, args.horizons)
+    t_loop = (time.perf_counter() - t0) * len(starts) / len(few)
+
+    same_cells = grid["start"].isin(few).to_numpy()
+    vec = grid.loc[same_cells, ["units_end", "value_end"]].to_numpy()
+    ok = np.allclose(vec, looped, rtol=1e-9, equal_nan=True)
+
+    print(f"{cells} cells ({len(strategies)} strategies x {len(starts)} starts x {len(args.horizons)} horizons)")
+    print(f"  python loop (extrapolated): {t_loop:8.2f}s")
+    print(f"  simulate():                 {t_vec:8.3f}s  ({cells / t_vec:,.0f} cells/s)")
+    print(f"  speedup: {t_loop / t_vec:.0f}x   same results on {len(few)} starts: {ok}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
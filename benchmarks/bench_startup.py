@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Benchmark the startup cost of the script entry points with `python -X importtime`.
+
+Run from repo root:
+
+    python3 benchmarks/bench_startup.py
+    python3 benchmarks/bench_startup.py --against HEAD~1    # compare with the scripts at a git ref
+
+Each case is a fresh interpreter: `--help` for every entry point, plus the "already up to
+date" runs of the crypto and metals updaters with `--no-cache --no-metrics`, so nothing is
+fetched or written (metals: `--end` is the last day of the real gold/silver CSVs; crypto: the
+real CSVs have historical gaps it would try to fill, so it runs on gap-free synthetic CSVs of
+the same size in a temp directory). Reported per case,
+best of `--repeat`: wall time, the summed time of the top-level imports, which of the heavy
+modules (pandas, numpy, yfinance, requests) got imported, and the slowest top-level import.
+With `--against REF` the same cases run against `git archive REF scripts` unpacked in a temp
+directory (same datasets, same cwd), and the speedup is shown.
+
+`update_cpi.py` has no offline up-to-date run: it always re-fetches its lookback window from
+BLS and only then knows whether the table changed.
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+from csv_io import read_max_date  # noqa: E402
+
+HEAVY = ("pandas", "numpy", "yfinance", "requests")
+HELP_SCRIPTS = [
+    "update_crypto",
+    "update_metals",
+    "update_cpi",
+    "update_all",
+    "build_adjusted",
+    "build_rolling",
+    "build_lod",
+    "import_kraken_dump",
+]
+CRYPTO_DAYS = 5500  # about the length of the bitcoin CSV
+CRYPTO_HEADER = "Start,End,Open,High,Low,Close,Volume,Market Cap\n"
+
+
+def _write_crypto_csvs(directory: Path, end: date) -> list[str]:
+    """Gap-free daily crypto CSVs ending at `end`, as update_crypto.py path arguments."""
+    args = []
+    for flag in ("--btc-path", "--eth-path", "--xmr-path"):
+        path = directory / f"{flag[2:5]}.csv"
+        first = end - timedelta(days=CRYPTO_DAYS - 1)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(CRYPTO_HEADER)
+            for i in range(CRYPTO_DAYS):
+                day = first + timedelta(days=i)
+                price = 100.0 + i * 0.25
+                f.write(f"{day},{day + timedelta(days=1)},{price},{price + 1},{price - 1},{price},1000.0,0.0\n")
+        args += [flag, str(path)]
+    return args
+
+
+def cases(tmp: Path) -> list[tuple[str, str, list[str]]]:
+    """(label, script, args)"""
+    out = [(f"{name} --help", name, ["--help"]) for name in HELP_SCRIPTS]
+    quiet = ["--no-cache", "--no-metrics"]
+    crypto_end = date(2026, 1, 1)
+    crypto_args = _write_crypto_csvs(tmp, crypto_end)
+    out.append(("update_crypto up to date", "update_crypto", [*crypto_args, "--end", crypto_end.isoformat(), *quiet]))
+    metals_end = min(read_max_date(REPO_ROOT / "datasets" / f, "Price") for f in ("gold.csv", "silver.csv"))
+    out.append(("update_metals up to date", "update_metals", ["--end", metals_end.isoformat(), *quiet]))
+    return out
+
+
+def parse_importtime(stderr: str) -> tuple[float, set[str], tuple[str, float]]:
+    """(seconds in top-level imports, heavy modules imported, slowest top-level import)."""
+    total = 0.0
+    heavy: set[str] = set()
+    slowest = ("", 0.0)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # the header line
+        stripped = name.strip()
+        if stripped.split(".")[0] in HEAVY:
+            heavy.add(stripped.split(".")[0])
+        if name.startswith("  "):
+            continue  # nested import, already counted in its parent
+        seconds = int(cumulative) / 1e6
+        total += seconds
+        if seconds > slowest[1]:
+            slowest = (stripped, seconds)
+    return total, heavy, slowest
+
+
+def measure(scripts_dir: Path, script: str, args: list[str], repeat: int) -> tuple[float, float, set[str], tuple]:
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", str(scripts_dir / f"{script}.py"), *args],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+        )
+        wall = time.perf_counter() - t0
+        if proc.returncode != 0:
+            raise RuntimeError(f"{script} {' '.join(args)} failed:\n{proc.stdout}\n{proc.stderr[-2000:]}")
+        imports, heavy, slowest = parse_importtime(proc.stderr)
+        if best is None or wall < best[0]:
+            best = (wall, imports, heavy, slowest)
+    return best
+
+
+def _checkout(ref: str, into: Path) -> Path:
+    archive = subprocess.run(["git", "archive", ref, "scripts"], cwd=REPO_ROOT, capture_output=True, check=True)
+    subprocess.run(["tar", "-x", "-C", str(into)], input=archive.stdout, check=True)
+    return into / "scripts"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark script startup (python -X importtime).")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case; the fastest counts (default: 5)")
+    parser.add_argument("--against", default=None, metavar="REF", help="Also run the scripts at this git ref")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        other = _checkout(args.against, Path(tmp)) if args.against else None
+        all_cases = cases(Path(tmp))
+
+        header = f"{'case':28s} {'wall':>9s} {'imports':>9s}  {'heavy imports':24s} slowest import"
+        if other is not None:
+            header = f"{'case':28s} {'wall':>9s} {args.against[:9]:>9s} {'speedup':>8s} {'imports':>9s}  " \
+                     f"{'heavy imports':24s} slowest import"
+        print(header)
+        for label, script, script_args in all_cases:
+            wall, imports, heavy, (slow_name, slow_s) = measure(REPO_ROOT / "scripts", script, script_args, args.repeat)
+            heavy_s = ",".join(m for m in HEAVY if m in heavy) or "-"
+            slowest = f"{slow_name} {slow_s * 1000:.0f}ms"
+            if other is None:
+                print(f"{label:28s} {wall * 1000:7.0f}ms {imports * 1000:7.0f}ms  {heavy_s:24s} {slowest}")
+                continue
+            if not (other / f"{script}.py").exists():
+                print(f"{label:28s} {wall * 1000:7.0f}ms {'-':>9s} {'-':>8s} {imports * 1000:7.0f}ms  {heavy_s:24s} {slowest}")
+                continue
+            try:
+                old_wall = measure(other, script, script_args, args.repeat)[0]
+                ref_s, speedup = f"{old_wall * 1000:7.0f}ms", f"{old_wall / wall:7.1f}x"
+            except RuntimeError:  # e.g. a flag the older script doesn't know
+                ref_s, speedup = "failed", "-"
+            print(f"{label:28s} {wall * 1000:7.0f}ms {ref_s:>9s} {speedup:>8s} {imports * 1000:7.0f}ms  {heavy_s:24s} {slowest}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
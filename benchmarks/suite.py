@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: the load, merge, generate, analyze and end-to-end update paths on synthetic
+datasets at 1x, 10x and 100x the size of `datasets/*.csv` (see `synthetic.py`).
+
+Run from repo root:
+
+    python3 benchmarks/suite.py                          # all cases at 1x, 10x and 100x
+    python3 benchmarks/suite.py --scales 1 10 --filter merge
+    python3 benchmarks/suite.py --list
+
+Datasets are generated once per scale under `benchmarks/.data/` (git-ignored) and each case
+runs on a scratch copy of the files it writes. Every case is timed `--repeat` times (setup
+excluded) and the fastest run is kept. Nothing touches the network: the Kraken and BLS APIs are
+local HTTP stubs and yfinance's `download` is replaced by a stub that returns synthetic rows.
+
+Results are appended to `benchmarks/.history.jsonl` (one JSON object per run, with the commit
+and host). A case is flagged as a regression when it is more than `--threshold` (default 25%)
+and `MIN_DELTA` seconds slower than the median of its last `--baseline-runs` results on the same
+host; the exit status is 1 if anything was flagged.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+import analytic  # noqa: E402
+import build_lod  # noqa: E402
+import import_kraken_dump  # noqa: E402
+import synthetic  # noqa: E402
+import update_cpi  # noqa: E402
+import update_crypto  # noqa: E402
+import update_metals  # noqa: E402
+from csv_io import read_max_date  # noqa: E402
+from debase_data import loaders  # noqa: E402
+from debase_data.cache import DATASETS  # noqa: E402
+from http_client import RetryClient, make_session  # noqa: E402
+
+DEFAULT_DATA_DIR = REPO_ROOT / "benchmarks" / ".data"
+DEFAULT_HISTORY = REPO_ROOT / "benchmarks" / ".history.jsonl"
+# Differences below this many seconds are never flagged (timer and scheduler noise).
+MIN_DELTA = 0.005
+# Days removed from the end (and from the middle) of a scratch copy before an update.
+TAIL_DAYS = 30
+HOLE_DAYS = 5
+
+GENERATOR = update_cpi._load_generator(synthetic.DATASETS_DIR / synthetic.GENERATOR)
+
+
+# --- local API stubs -------------------------------------------------------------------------
+
+def _serve(handler: type[BaseHTTPRequestHandler]) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class _JsonHandler(BaseHTTPRequestHandler):
+    def _reply(self, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class KrakenStub(_JsonHandler):
+    """720 daily OHLC candles from `since` on, like one Kraken page (there is no "today" here)."""
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)
+        since = int(query["since"][0])
+        first = -(-since // update_crypto.DAY_SECONDS) * update_crypto.DAY_SECONDS
+        stamps = range(first, first + update_crypto.KRAKEN_MAX_CANDLES * update_crypto.DAY_SECONDS,
+                       update_crypto.DAY_SECONDS)
+        candles = [[ts, "1.0", "1.2", "0.9", "1.1", "1.05", "10.0", 7] for ts in stamps]
+        last = stamps[-1]
+        self._reply({"error": [], "result": {query["pair"][0]: candles, "last": last}})
+
+
+class BlsStub(_JsonHandler):
+    """Each registered series' own table values for the requested years, plus one new month."""
+
+    rows: dict[str, dict[int, list[dict]]] = {}
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        years = range(int(payload["startyear"]), int(payload["endyear"]) + 1)
+        series = [
+            {"seriesID": s, "data": [r for y in reversed(years) for r in reversed(self.rows.get(s, {}).get(y, []))]}
+            for s in payload["seriesid"]
+        ]
+        self._reply({"status": "REQUEST_SUCCEEDED", "message": [], "Results": {"series": series}})
+
+
+def bls_rows(table: pd.DataFrame) -> dict[int, list[dict]]:
+    """BLS-style data rows per year from a monthly table, plus one month after the last value."""
+    out: dict[int, list[dict]] = {}
+    last = None
+    for year, values in zip(table["Year"], table[synthetic.MONTH_COLS].to_numpy()):
+        for m, value in enumerate(values, start=1):
+            if str(value).strip():
+                out.setdefault(int(year), []).append({"year": str(year), "period": f"M{m:02d}", "value": str(value)})
+                last = (int(year), m, float(value))
+    year, month, value = last
+    year, month = (year, month + 1) if month < 12 else (year + 1, 1)
+    out.setdefault(year, []).append({"year": str(year), "period": f"M{month:02d}", "value": f"{value * 1.003:.3f}"})
+    return out
+
+
+def yahoo_stub(ticker, start, end, **kwargs) -> pd.DataFrame:
+    """Stands in for `yf.download`: synthetic daily rows in yfinance's shape."""
+    days = pd.date_range(start, pd.Timestamp(end) - pd.Timedelta(days=1), freq="D", name="Date")
+    close = np.linspace(250.0, 260.0, len(days))
+    return pd.DataFrame(
+        {"Close": close, "High": close * 1.01, "Low": close * 0.99, "Open": close, "Volume": 100}, index=days
+    )
+
+
+# --- cases -----------------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Fixture:
+    data: Path  # generated datasets (read-only)
+    scratch: Path  # per-run copies
+    scale: int
+    kraken_url: str
+    bls_url: str
+
+    def copy(self, *names: str) -> Path:
+        """Fresh scratch copies of `names` (files or directories under `data`)."""
+        shutil.rmtree(self.scratch, ignore_errors=True)
+        self.scratch.mkdir(parents=True)
+        for name in names:
+            src = self.data / name
+            if src.is_dir():
+                shutil.copytree(src, self.scratch / name)
+            else:
+                shutil.copy2(src, self.scratch / name)
+        return self.scratch
+
+
+@dataclass(frozen=True)
+class Case:
+    group: str
+    name: str
+    # Prepares a run (untimed) and returns the callable to time.
+    setup: Callable[[Fixture], Callable[[], object]]
+
+    @property
+    def key(self) -> str:
+        return f"{self.group}/{self.name}"
+
+
+CRYPTO = list(synthetic.CRYPTO_FILES.values())
+METALS = list(synthetic.METAL_FILES.values())
+
+
+def _cpi_tables(fx: Fixture) -> list[pd.DataFrame]:
+    return [update_cpi._load_cpi_table(d / "CPI_U.csv") for d in synthetic.cpi_dirs(fx.data)]
+
+
+def _last_day(csv_path: Path) -> date:
+    column = "Price" if csv_path.name in METALS else "Start"
+    return read_max_date(csv_path, column)
+
+
+def _drop_days(csv_path: Path) -> None:
+    """Remove the last TAIL_DAYS rows and HOLE_DAYS rows from the middle (updates refill them)."""
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    mid = len(df) // 2
+    df = pd.concat([df.iloc[:mid], df.iloc[mid + HOLE_DAYS : len(df) - TAIL_DAYS]])
+    df.to_csv(csv_path, index=False)
+
+
+def last_date(fx: Fixture):
+    paths = [fx.data / name for name in CRYPTO]
+    metals = [fx.data / name for name in METALS]
+    return lambda: [read_max_date(p, "Start") for p in paths] + [read_max_date(p, "Price") for p in metals]
+
+
+def read_start_dates(fx: Fixture):
+    paths = [fx.data / name for name in CRYPTO]
+    return lambda: [update_crypto._read_start_dates(p) for p in paths]
+
+
+def _load_all(fx: Fixture, cold: bool):
+    scratch = fx.copy(*CRYPTO, *METALS)
+    names = [(name, scratch / DATASETS[name].csv_name) for name in ("bitcoin", "ethereum", "monero", "gold", "silver")]
+    loaders.clear_cache()
+    if not cold:
+        for name, path in names:
+            loaders.load(name, path)
+    loaders.clear_cache()
+    return lambda: [loaders.load(name, path) for name, path in names]
+
+
+def load_cold(fx: Fixture):
+    return _load_all(fx, cold=True)
+
+
+def load_cached(fx: Fixture):
+    return _load_all(fx, cold=False)
+
+
+def cpi_tables(fx: Fixture):
+    return lambda: _cpi_tables(fx)
+
+
+def kraken_dump(fx: Fixture):
+    return lambda: import_kraken_dump.aggregate_dump(fx.data / synthetic.MINUTE_DUMP)
+
+
+def crypto_merge(fx: Fixture):
+    scratch = fx.copy(*CRYPTO)
+    # Rows for the last 10 days (overlap) and 20 new ones: the merge-rewrite path.
+    new_rows = {name: synthetic.crypto_frame("new", _last_day(scratch / name) - timedelta(days=9), 30) for name in CRYPTO}
+
+    def run():
+        for name in CRYPTO:
+            merged, _ = update_crypto._merge_append(scratch / name, new_rows[name])
+            update_crypto._write_csv(scratch / name, merged)
+
+    return run
+
+
+def crypto_append(fx: Fixture):
+    scratch = fx.copy(*CRYPTO)
+    new_rows = {name: synthetic.crypto_frame("new", _last_day(scratch / name) + timedelta(days=1), 20) for name in CRYPTO}
+    return lambda: [update_crypto._try_append(scratch / name, new_rows[name], dry_run=False) for name in CRYPTO]
+
+
+def metal_merge(fx: Fixture):
+    scratch = fx.copy(*METALS)
+    new_rows = {name: synthetic.metal_frame("new", _last_day(scratch / name) - timedelta(days=9), 30) for name in METALS}
+
+    def run():
+        for name in METALS:
+            merged, _ = update_metals._merge_append(scratch / name, new_rows[name])
+            update_metals._write_csv(scratch / name, merged)
+
+    return run
+
+
+def cpi_merge(fx: Fixture):
+    tables = _cpi_tables(fx)
+    rows = [[r for year_rows in bls_rows(t).values() for r in year_rows] for t in tables]
+    end = int(tables[0]["Year"].max()) + 1
+    return lambda: [
+        update_cpi._merge_points(t.copy(), r, end - 3, end, overwrite_existing=True) for t, r in zip(tables, rows)
+    ]
+
+
+def cpi_generate_full(fx: Fixture):
+    tables = _cpi_tables(fx)
+    return lambda: [GENERATOR.generate_daily_cpi(t) for t in tables]
+
+
+def cpi_generate_incremental(fx: Fixture):
+    scratch = fx.copy("cpi")
+    work = []
+    for d, table in zip(synthetic.cpi_dirs(scratch), _cpi_tables(fx)):
+        rows = bls_rows(table)
+        table, _, _, touched = update_cpi._merge_points(
+            table, [r for year_rows in rows.values() for r in year_rows], max(rows), max(rows), True
+        )
+        work.append((table, d / "daily_cpi_inflation.csv", touched))
+    return lambda: [GENERATOR.update_daily_cpi(t, path, touched=touched) for t, path, touched in work]
+
+
+def ath_daily(fx: Fixture):
+    scratch = fx.copy(*CRYPTO)
+    paths = [scratch / name for name in CRYPTO]
+    loaders.clear_cache()
+    for name, path in zip(synthetic.CRYPTO_FILES, paths):
+        loaders.load(name, path)  # build the binary cache; the analysis itself is timed
+
+    def run():
+        loaders.clear_cache()
+        return analytic.analyze_crypto_aths(*paths)
+
+    return run
+
+
+def lod_series(fx: Fixture):
+    scratch = fx.copy(*CRYPTO, *METALS)
+    files = {**synthetic.CRYPTO_FILES, **synthetic.METAL_FILES}
+    # Loading goes through the binary cache (built here); the downsampling itself is timed.
+    series = [(name, *build_lod.load_series(scratch / file_name, name)) for name, file_name in files.items()]
+    return lambda: [build_lod.build_lod(x, y, name) for name, x, y in series]
+
+
+@lru_cache(maxsize=1)
+def _minute_closes(dump_path: Path) -> pd.Series:
+    dump = pd.read_csv(dump_path, header=None, usecols=[0, 4], names=["ts", "close"])
+    return pd.Series(dump["close"].to_numpy(), index=pd.to_datetime(dump["ts"], unit="s"))
+
+
+def ath_minute(fx: Fixture):
+    close = _minute_closes(fx.data / synthetic.MINUTE_DUMP)
+    prices = {"BTC": close, "BTC_1H": close.iloc[::60]}
+    return lambda: analytic.ath_engine(prices, close.index[len(close) // 2])
+
+
+def update_crypto_e2e(fx: Fixture):
+    scratch = fx.copy(*CRYPTO)
+    cryptos = []
+    for (name, csv_name), pair in zip(synthetic.CRYPTO_FILES.items(), ("XBTUSD", "ETHUSD", "XMRUSD")):
+        end = _last_day(scratch / csv_name)
+        _drop_days(scratch / csv_name)
+        cryptos.append((update_crypto.Crypto(name, pair, scratch / csv_name), end))
+    session = make_session(None)
+    return lambda: [
+        update_crypto.update_crypto(
+            c, end, dry_run=False, debug=False, base_url=fx.kraken_url, session=session, history_days=None
+        )
+        for c, end in cryptos
+    ]
+
+
+def update_metals_e2e(fx: Fixture):
+    scratch = fx.copy(*METALS)
+    metals = []
+    for (name, csv_name), ticker in zip(synthetic.METAL_FILES.items(), ("GC=F", "SI=F")):
+        end = _last_day(scratch / csv_name)
+        df = pd.read_csv(scratch / csv_name, dtype=str, keep_default_na=False)
+        df.iloc[: len(df) - TAIL_DAYS].to_csv(scratch / csv_name, index=False)
+        metals.append((update_metals.Metal(name, ticker, scratch / csv_name), end))
+    return lambda: [update_metals.update_metal(m, end, dry_run=False) for m, end in metals]
+
+
+def update_cpi_e2e(fx: Fixture):
+    scratch = fx.copy("cpi")
+    configs = []
+    for i, d in enumerate(synthetic.cpi_dirs(scratch)):
+        series_id = f"SYN{i:05d}"
+        BlsStub.rows[series_id] = bls_rows(update_cpi._load_cpi_table(d / "CPI_U.csv"))
+        configs.append(update_cpi.CpiConfig(series_id, d / "CPI_U.csv", d / synthetic.GENERATOR))
+    session = make_session(None)
+    end_year = synthetic.cpi_last_month()[0] + 1
+    return lambda: update_cpi.update_cpi_series(
+        configs, end_year, dry_run=False, debug=False, lookback_years=3, overwrite_existing=True,
+        session=session, bls_url=fx.bls_url,
+    )
+
+
+CASES = [
+    Case("load", "last_date", last_date),
+    Case("load", "read_start_dates", read_start_dates),
+    Case("load", "loaders_cold", load_cold),
+    Case("load", "loaders_cached", load_cached),
+    Case("load", "cpi_tables", cpi_tables),
+    Case("load", "kraken_minute_dump", kraken_dump),
+    Case("merge", "crypto_merge_append", crypto_merge),
+    Case("merge", "crypto_try_append", crypto_append),
+    Case("merge", "metal_merge_append", metal_merge),
+    Case("merge", "cpi_merge_points", cpi_merge),
+    Case("generate", "cpi_daily_full", cpi_generate_full),
+    Case("generate", "cpi_daily_incremental", cpi_generate_incremental),
+    Case("generate", "lod_series", lod_series),
+    Case("analyze", "ath_daily", ath_daily),
+    Case("analyze", "ath_minute", ath_minute),
+    Case("update", "crypto", update_crypto_e2e),
+    Case("update", "metals", update_metals_e2e),
+    Case("update", "cpi", update_cpi_e2e),
+]
+
+
+# --- running and history ---------------------------------------------------------------------
+
+def time_case(case: Case, fx: Fixture, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            run = case.setup(fx)
+            t0 = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def load_history(path: Path) -> list[dict]:
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def baselines(history: list[dict], host: str, runs: int) -> dict[str, float]:
+    """Median of the last `runs` results per case key on `host`."""
+    seen: dict[str, list[float]] = {}
+    for record in reversed(history):
+        if record.get("host") != host:
+            continue
+        for key, seconds in record["results"].items():
+            if len(seen.setdefault(key, [])) < runs:
+                seen[key].append(seconds)
+    return {key: statistics.median(values) for key, values in seen.items()}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark suite on synthetic scaled datasets.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", default=None, help="Only cases whose group/name contains this")
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR), help="Where the synthetic datasets are kept")
+    parser.add_argument("--history", default=str(DEFAULT_HISTORY), help="JSON-lines results history")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Flag cases slower than baseline by this fraction")
+    parser.add_argument("--baseline-runs", type=int, default=5)
+    parser.add_argument("--no-save", action="store_true", help="Don't append this run to the history")
+    parser.add_argument("--list", action="store_true", help="List the cases and exit")
+    args = parser.parse_args()
+
+    cases = [c for c in CASES if args.filter is None or args.filter in c.key]
+    if args.list or not cases:
+        for c in cases or CASES:
+            print(c.key)
+        return 0 if cases else 1
+
+    history_path = Path(args.history)
+    host = platform.node()
+    base = baselines(load_history(history_path), host, args.baseline_runs)
+    # Offline: yfinance is stubbed and Yahoo isn't rate limited (this times our code, not theirs).
+    update_metals.yf = types.SimpleNamespace(download=yahoo_stub)
+    update_metals.DEFAULT_CLIENT = RetryClient(policies={})
+    kraken, bls = _serve(KrakenStub), _serve(BlsStub)
+    results: dict[str, float] = {}
+    regressions = []
+    print(f"{'case':32s} {'scale':>5s} {'seconds':>9s} {'baseline':>9s} {'change':>8s}")
+    try:
+        with tempfile.TemporaryDirectory() as tmp_name:
+            for scale in args.scales:
+                fx = Fixture(
+                    data=synthetic.build(Path(args.data_dir) / f"{scale}x", scale),
+                    scratch=Path(tmp_name) / f"{scale}x",
+                    scale=scale,
+                    kraken_url=f"http://127.0.0.1:{kraken.server_port}/0/public/OHLC",
+                    bls_url=f"http://127.0.0.1:{bls.server_port}/",
+                )
+                for case in cases:
+                    key = f"{case.key}@{scale}x"
+                    seconds = results[key] = time_case(case, fx, args.repeat)
+                    line = f"{case.key:32s} {scale:>4d}x {seconds:9.4f}"
+                    if key in base:
+                        change = seconds / base[key] - 1
+                        line += f" {base[key]:9.4f} {change:+7.1%}"
+                        if change > args.threshold and seconds - base[key] > MIN_DELTA:
+                            regressions.append(key)
+                            line += "  REGRESSION"
+                    print(line)
+    finally:
+        kraken.shutdown()
+        bls.shutdown()
+
+    if not args.no_save:
+        record = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "host": host,
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "repeat": args.repeat,
+            "results": results,
+        }
+        history_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(history_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,196 @@
+"""
+Synthetic datasets for the benchmark suite, in the layouts of `datasets/*.csv`.
+
+`build(directory, scale)` writes, for scale k:
+- the crypto CSVs (bitcoin/ethereum/monero, `Start,End,Open,...,Market Cap`) and the metal CSVs
+  (gold/silver, `Price,Close,...`) under their real file names, with k times the rows of the
+  real files: one row per day from the real file's first day on, so at 10x/100x they run into
+  later centuries (pandas parses those at microsecond resolution; going back instead would hit
+  years below 1000, which pandas can't infer a date format for)
+- `cpi/sNNN/`: k monthly tables in the `CPI_U.csv` layout (1971 to the current year) with their
+  daily files. CPI scales by series count, as `update_cpi.py --extra-series` adds them, because
+  k times the monthly span would start before year 1
+- `XBTUSD_1.csv`: a headerless Kraken OHLCVT dump of 1-minute candles, k x 43,200 rows (30 days
+  at 1x), i.e. the minute-resolution input of `import_kraken_dump.py`
+
+Values are seeded random walks, so every build at a scale writes the same files. A build is
+reused while its `built.json` matches `VERSION`, the real files' row counts and the current
+CPI month.
+"""
+from __future__ import annotations
+
+import importlib.util
+import json
+import shutil
+import zlib
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DATASETS_DIR = REPO_ROOT / "datasets"
+
+# Bump when the generated layout or values change.
+VERSION = 1
+
+CRYPTO_FILES = {
+    "bitcoin": "bitcoin_2010-07-17_2025-07-25.csv",
+    "ethereum": "ethereum_2015-08-07_2025-07-25.csv",
+    "monero": "monero_2014-05-21_2025-07-25.csv",
+}
+METAL_FILES = {"gold": "gold.csv", "silver": "silver.csv"}
+CRYPTO_COLUMNS = ["Start", "End", "Open", "High", "Low", "Close", "Volume", "Market Cap"]
+METAL_COLUMNS = ["Price", "Close", "High", "Low", "Open", "Volume"]
+MONTH_COLS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+CPI_FIRST_YEAR = 1971
+MINUTE_DUMP = "XBTUSD_1.csv"
+MINUTE_ROWS = 30 * 1440
+GENERATOR = "generator_cpi_daily.py"
+
+
+def _rng(name: str) -> np.random.Generator:
+    return np.random.default_rng(zlib.crc32(name.encode()))
+
+
+def base_rows() -> dict[str, list]:
+    """(first date, data rows) of the real files: the 1x shapes."""
+    out = {}
+    for name, csv_name in {**CRYPTO_FILES, **METAL_FILES}.items():
+        with open(DATASETS_DIR / csv_name, "rb") as f:
+            f.readline()
+            first = f.readline().decode().split(",", 1)[0]
+            out[name] = [first, sum(1 for _ in f) + 1]  # a list, to compare equal to the JSON stamp
+    return out
+
+
+def days_from(first: date | str, rows: int) -> np.ndarray:
+    start = np.datetime64(first, "D")
+    return np.arange(start, start + rows, dtype="datetime64[D]")
+
+
+def _walk(rng: np.random.Generator, rows: int, start: float, end: float, vol: float) -> np.ndarray:
+    """Random walk from `start` to `end` (a Brownian bridge on a log trend, so no overflow)."""
+    noise = np.cumsum(rng.normal(0, vol, rows))
+    noise -= np.linspace(0, noise[-1], rows)
+    return np.exp(np.linspace(np.log(start), np.log(end), rows) + noise)
+
+
+def crypto_frame(name: str, first: date | str, rows: int) -> pd.DataFrame:
+    rng = _rng(name)
+    days = days_from(first, rows)
+    close = _walk(rng, rows, 0.05, 60000.0, 0.04)
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = 1 + np.abs(rng.normal(0, 0.02, (2, rows)))
+    return pd.DataFrame(
+        {
+            "Start": days.astype(str),
+            "End": (days + 1).astype(str),
+            "Open": open_.round(6),
+            "High": (np.maximum(open_, close) * spread[0]).round(6),
+            "Low": (np.minimum(open_, close) / spread[1]).round(6),
+            "Close": close.round(6),
+            "Volume": rng.exponential(1e6, rows).round(2),
+            "Market Cap": (close * 1.9e7).round(2),
+        },
+        columns=CRYPTO_COLUMNS,
+    )
+
+
+def metal_frame(name: str, first: date | str, rows: int) -> pd.DataFrame:
+    rng = _rng(name)
+    close = _walk(rng, rows, 250.0, 2500.0, 0.01)
+    spread = 1 + np.abs(rng.normal(0, 0.005, (2, rows)))
+    return pd.DataFrame(
+        {
+            "Price": days_from(first, rows).astype(str),
+            "Close": close,
+            "High": close * spread[0],
+            "Low": close / spread[1],
+            "Open": close * spread[0] / spread[1],
+            "Volume": rng.integers(0, 500, rows),
+        },
+        columns=METAL_COLUMNS,
+    )
+
+
+def cpi_table(seed: int, last_year: int, last_month: int) -> pd.DataFrame:
+    """Monthly table in the `CPI_U.csv` layout, filled through `last_year`-`last_month`."""
+    rng = _rng(f"cpi{seed}")
+    years = list(range(CPI_FIRST_YEAR, last_year + 1))
+    months = len(years) * 12
+    values = _walk(rng, months, 39.8, 39.8 * 1.0035**months, 3e-3).round(3).reshape(len(years), 12)
+    df = pd.DataFrame(values, columns=MONTH_COLS).map(lambda v: f"{v:.3f}")
+    df.iloc[-1, last_month:] = ""
+    df.insert(0, "Year", years)
+    df["HALF1"] = ""
+    df["HALF2"] = ""
+    return df
+
+
+def minute_dump(path: Path, rows: int) -> None:
+    """Kraken OHLCVT dump (timestamp, open, high, low, close, volume, trades), 1-minute candles."""
+    rng = _rng("XBTUSD_1")
+    ts = 1_700_000_040 + 60 * np.arange(rows)
+    close = _walk(rng, rows, 30000.0, 45000.0, 1e-3)
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = 1 + np.abs(rng.normal(0, 3e-4, (2, rows)))
+    pd.DataFrame(
+        {
+            "timestamp": ts,
+            "open": open_.round(1),
+            "high": (np.maximum(open_, close) * spread[0]).round(1),
+            "low": (np.minimum(open_, close) / spread[1]).round(1),
+            "close": close.round(1),
+            "volume": rng.exponential(2.0, rows).round(8),
+            "trades": rng.integers(1, 80, rows),
+        }
+    ).to_csv(path, header=False, index=False)
+
+
+def cpi_last_month() -> tuple[int, int]:
+    """Latest published month as of today (BLS publishes with a ~6 week lag)."""
+    today = date.today()
+    return (today.year, today.month - 2) if today.month > 2 else (today.year - 1, today.month + 10)
+
+
+def cpi_dirs(directory: Path) -> list[Path]:
+    return sorted(p for p in (directory / "cpi").iterdir() if p.is_dir())
+
+
+def build(directory: Path, scale: int, quiet: bool = False) -> Path:
+    """Write (or reuse) the k=`scale` datasets under `directory`; returns `directory`."""
+    base = base_rows()
+    last_year, last_month = cpi_last_month()
+    stamp = {"version": VERSION, "scale": scale, "base_rows": base, "cpi_last": [last_year, last_month]}
+    stamp_path = directory / "built.json"
+    if stamp_path.exists() and json.loads(stamp_path.read_text()) == stamp:
+        return directory
+
+    if not quiet:
+        print(f"[synthetic] building {scale}x datasets in {directory}")
+    shutil.rmtree(directory, ignore_errors=True)
+    directory.mkdir(parents=True)
+    for name, csv_name in CRYPTO_FILES.items():
+        first, rows = base[name]
+        crypto_frame(name, first, rows * scale).to_csv(directory / csv_name, index=False)
+    for name, csv_name in METAL_FILES.items():
+        first, rows = base[name]
+        metal_frame(name, first, rows * scale).to_csv(directory / csv_name, index=False)
+
+    # Loaded from the repo, so the daily files match what update_cpi.py would write.
+    spec = importlib.util.spec_from_file_location("generator_cpi_daily", DATASETS_DIR / GENERATOR)
+    generator = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(generator)
+    for i in range(scale):
+        series_dir = directory / "cpi" / f"s{i:03d}"
+        series_dir.mkdir(parents=True)
+        table = cpi_table(i, last_year, last_month)
+        table.to_csv(series_dir / "CPI_U.csv", index=False)
+        shutil.copy2(DATASETS_DIR / GENERATOR, series_dir / GENERATOR)
+        generator.write_daily_cpi(generator.generate_daily_cpi(table), series_dir / "daily_cpi_inflation.csv")
+
+    minute_dump(directory / MINUTE_DUMP, MINUTE_ROWS * scale)
+    stamp_path.write_text(json.dumps(stamp))
+    return directory
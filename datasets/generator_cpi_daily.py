@@ -19,101 +19,369 @@ How it works:
   most recent month can still produce daily values even when the next official month isn't
   published yet (e.g. generate December daily values even without Jan).
 
+Usage:
+- CLI: `python3 generator_cpi_daily.py` (run inside `datasets/`).
+- Library: `generate_daily_cpi(pd.read_csv("CPI_U.csv"))` returns the daily DataFrame;
+  `write_daily_cpi(daily_df, path)` writes it in the CSV format above.
+- Incremental: `update_daily_cpi(cpi_table, path, touched={(2025, 10)})` recomputes only the
+  interpolation segments around the touched months plus the extrapolated tail, and rewrites
+  the existing file from the first changed row on (falls back to a full rebuild if needed).
+
 Notes:
 - This produces a smooth approximation between known monthly values; it is not an official CPI.
+- All per-day work is vectorized with NumPy (interpolation, rounding, day-over-day ratio).
 """
 
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta, timezone
+
+try:
+    # Per-stage timing when loaded by scripts/update_cpi.py (scripts/ is on sys.path there).
+    from instrument import span as _span
+except ImportError:
+    from contextlib import nullcontext
+
+    def _span(stage: str, **counts: float):
+        return nullcontext()
 
 MONTH_COLS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+OUTPUT_COLUMNS = ["timestamp", "CPI", "daily_multiplicator"]
 
 
-def month_start(year: int, month: int) -> datetime:
-    return datetime(year, month, 1)
+def _round_half_even(values: np.ndarray, decimals: int) -> np.ndarray:
+    """
+    Round like Python's built-in `round(x, n)` (correctly rounded, half-even).
 
+    `np.round` scales by 10**n first, which can differ from `round()` in the last digit.
+    We use it as a fast first guess and only fix up the few values that land within
+    float noise of a rounding boundary.
+    """
+    out = np.round(values, decimals)
+    scaled = values * (10.0**decimals)
+    frac = np.abs(scaled - np.trunc(scaled))
+    suspicious = np.flatnonzero(np.abs(frac - 0.5) < 1e-6)
+    for i in suspicious:
+        out[i] = round(float(values[i]), decimals)
+    return out
 
-def add_month(d: datetime) -> datetime:
-    if d.month == 12:
-        return datetime(d.year + 1, 1, 1)
-    return datetime(d.year, d.month + 1, 1)
 
+def monthly_points(cpi_table: pd.DataFrame) -> pd.Series:
+    """
+    Return known monthly CPI points as a Series indexed by month start (datetime64), sorted.
+    """
+    years = pd.to_numeric(cpi_table["Year"], errors="coerce")
+    values = cpi_table.reindex(columns=MONTH_COLS).apply(pd.to_numeric, errors="coerce")
+    values = values[years.notna()]
+    years = years[years.notna()].astype(int)
 
-def interpolate_daily(start_value: float, end_value: float, start_date: datetime, end_date: datetime):
+    month_idx = np.tile(np.arange(12), len(values))
+    year_idx = np.repeat(years.to_numpy(), 12)
+    flat = values.to_numpy(dtype=float).ravel()
+    keep = ~np.isnan(flat)
+
+    months = (year_idx[keep] - 1970) * 12 + month_idx[keep]
+    dates = months.astype("datetime64[M]").astype("datetime64[ns]")
+    points = pd.Series(flat[keep], index=pd.DatetimeIndex(dates))
+    # Later rows win for duplicated years (same as the old row-by-row build).
+    points = points[~points.index.duplicated(keep="last")]
+    return points.sort_index()
+
+
+def extend_points(points: pd.Series, target_end: date) -> pd.Series:
     """
-    Linear interpolation from (start_date, start_value) inclusive up to end_date exclusive.
+    Extrapolate future months (constant last monthly delta) while the next month starts
+    before `target_end` (exclusive), so the latest month still gets daily values.
     """
-    days = (end_date - start_date).days
-    if days <= 0:
-        return []
-    daily_increment = (end_value - start_value) / days
-    out = []
-    cur = start_date
-    for i in range(days):
-        out.append({"timestamp": cur.strftime("%Y-%m-%d"), "CPI": round(start_value + i * daily_increment, 4)})
-        cur += timedelta(days=1)
-    return out
+    last_dt = points.index[-1].to_period("M")
+    last_v = float(points.iloc[-1])
+    prev_v = float(points.iloc[-2]) if len(points) >= 2 else last_v
+    monthly_delta = last_v - prev_v  # naive trend
+
+    end = pd.Timestamp(target_end)
+    extra_dates = []
+    extra_values = []
+    while (last_dt + 1).to_timestamp() < end:
+        last_dt = last_dt + 1
+        last_v = last_v + monthly_delta  # simple extrapolation
+        extra_dates.append(last_dt.to_timestamp())
+        extra_values.append(last_v)
+
+    if not extra_dates:
+        return points
+    return pd.concat([points, pd.Series(extra_values, index=pd.DatetimeIndex(extra_dates))])
+
+
+def interpolate_points(points: pd.Series, target_end: date) -> pd.DataFrame:
+    """
+    Linear daily interpolation between consecutive points: every day from the first point
+    (inclusive) to the last point (exclusive), capped at `target_end` (exclusive).
+    """
+    if len(points) < 2:
+        return pd.DataFrame({"CPI": pd.Series(dtype=float)}, index=pd.DatetimeIndex([], name="timestamp"))
+
+    point_days = points.index.to_numpy().astype("datetime64[D]").astype(np.int64)
+    last_day = min(int(point_days[-1]), int(np.datetime64(target_end, "D").astype(np.int64)))
+    days = np.arange(point_days[0], max(last_day, point_days[0]), dtype=np.int64)
+
+    cpi = np.interp(days.astype(float), point_days.astype(float), points.to_numpy(dtype=float))
+    cpi = _round_half_even(cpi, 4)
+
+    index = pd.DatetimeIndex(days.astype("datetime64[D]").astype("datetime64[ns]"), name="timestamp")
+    return pd.DataFrame({"CPI": cpi}, index=index)
+
+
+def add_daily_multiplicator(daily_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add `daily_multiplicator` = CPI[n] / CPI[n-1] (rounded to 6 places), 1.0 for the first row.
+    """
+    cpi = daily_df["CPI"].to_numpy(dtype=float)
+    mult = np.ones(len(cpi))
+    if len(cpi) > 1:
+        prev = cpi[:-1]
+        mult[1:] = _round_half_even(1 + (cpi[1:] - prev) / prev, 6)
+    daily_df["daily_multiplicator"] = mult
+    return daily_df
+
+
+def default_target_end() -> date:
+    """
+    Exclusive end of the generated series: tomorrow (UTC).
+    """
+    today_utc = datetime.now(timezone.utc).date()
+    return date.fromordinal(today_utc.toordinal() + 1)
+
+
+def generate_daily_cpi(cpi_table: pd.DataFrame, target_end: date | None = None) -> pd.DataFrame:
+    """
+    Build the daily CPI DataFrame (columns: timestamp, CPI, daily_multiplicator) from the
+    monthly CPI table (`Year`, `Jan`..`Dec` columns, as in `CPI_U.csv`).
+    """
+    if target_end is None:
+        target_end = default_target_end()
+
+    points = monthly_points(cpi_table)
+    if points.empty:
+        raise ValueError("No CPI values found in CPI_U.csv")
+
+    points = extend_points(points, target_end)
+    daily_df = interpolate_points(points, target_end)
+    daily_df = add_daily_multiplicator(daily_df)
+
+    daily_df = daily_df.reset_index()
+    daily_df["timestamp"] = daily_df["timestamp"].dt.strftime("%Y-%m-%d")
+    return daily_df[OUTPUT_COLUMNS]
+
+
+def write_daily_cpi(daily_df: pd.DataFrame, output_path: Path | str) -> None:
+    daily_df.to_csv(output_path, sep=";", index=False, columns=OUTPUT_COLUMNS)
+
+
+def dirty_ranges(points: pd.Series, touched: set[tuple[int, int]]) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+    """
+    Date ranges [start, end) whose daily values depend on the touched (year, month) cells.
+
+    A monthly point only feeds the two segments around it, so for each touched month we take
+    the previous known point up to the next known point. This also covers months that were
+    added (a hole got filled) or removed (a value got blanked). The extrapolated tail depends
+    on the last real points and on today's date, so it is always included.
+    """
+    index = points.index
+    ranges = []
+    for year, month in sorted(touched):
+        m = pd.Timestamp(year=year, month=month, day=1)
+        pos_before = index.searchsorted(m, side="left") - 1
+        pos_after = index.searchsorted(m, side="right")
+        start = index[pos_before] if pos_before >= 0 else index[0]
+        end = index[pos_after] if pos_after < len(index) else pd.Timestamp.max
+        ranges.append((min(start, m), end))
+    ranges.append((index[-1], pd.Timestamp.max))
+    return ranges
+
+
+def _row_windows(
+    ranges: list[tuple[pd.Timestamp, pd.Timestamp]], first: pd.Timestamp, n_total: int
+) -> list[tuple[int, int]]:
+    # date ranges -> [lo, hi) row offsets into a series starting at `first`
+    windows = []
+    for start, stop in ranges:
+        lo = max(0, (start - first).days)
+        hi = n_total if stop == pd.Timestamp.max else min(n_total, (stop - first).days)
+        if lo < hi:
+            windows.append((lo, hi))
+    return windows
+
+
+def splice_daily_cpi(
+    cpi_table: pd.DataFrame,
+    existing: pd.DataFrame,
+    touched: set[tuple[int, int]],
+    target_end: date | None = None,
+    start_row: int = 0,
+) -> tuple[pd.DataFrame, int] | None:
+    """
+    Recompute only the rows affected by `touched` months (plus the extrapolated tail) and
+    splice them into `existing`, the current daily rows from row `start_row` to the end of
+    the file (so callers can skip parsing an unchanged prefix).
+
+    Returns (daily_df, first_changed_row): `daily_df` holds the rows from `start_row` on and
+    `first_changed_row` is absolute. Returns None when `existing` doesn't line up with the new
+    series (gaps, other first date, changes before `start_row`) or ends before the newest real
+    monthly point (it was built from an older table, so its extrapolated tail is stale beyond
+    what `touched` says): do a full rebuild instead.
+    """
+    if target_end is None:
+        target_end = default_target_end()
+
+    real_points = monthly_points(cpi_table)
+    if real_points.empty:
+        raise ValueError("No CPI values found in CPI_U.csv")
+    if existing.empty:
+        return None
+
+    first = real_points.index[0]
+    existing_dates = pd.to_datetime(existing["timestamp"], errors="coerce")
+    expected = pd.date_range(first + pd.Timedelta(days=start_row), periods=len(existing), freq="D")
+    if existing_dates.isna().any() or not (existing_dates.to_numpy() == expected.to_numpy()).all():
+        return None
+    if existing_dates.iloc[-1] < real_points.index[-1]:
+        return None
+
+    points = extend_points(real_points, target_end)
+    last_row_end = min(points.index[-1], pd.Timestamp(target_end))  # exclusive end of the series
+    n_total = max(0, (last_row_end - first).days)
+    windows = _row_windows(dirty_ranges(real_points, touched), first, n_total)
+    existing_end = start_row + len(existing)
+    if existing_end < n_total:
+        windows.append((existing_end, n_total))  # series grew (e.g. today moved forward)
+    if n_total < start_row or any(max(lo - 1, 0) < start_row for lo, _ in windows):
+        # changes reach into the unparsed prefix (or need its last row for the ratio)
+        return None
+    first_changed = min([lo for lo, _ in windows] + [n_total, existing_end])
+
+    # Work on arrays covering rows [start_row, n_total); grow/shrink to the new length.
+    size = max(0, n_total - start_row)
+    cpi = np.full(size, np.nan)
+    mult = np.full(size, np.nan)
+    keep = min(size, len(existing))
+    cpi[:keep] = existing["CPI"].to_numpy(dtype=float)[:keep]
+    mult[:keep] = existing["daily_multiplicator"].to_numpy(dtype=float)[:keep]
+
+    for lo, hi in windows:
+        # Interpolate just this window: the points that bracket it are enough.
+        day_lo = first + pd.Timedelta(days=lo)
+        day_hi = first + pd.Timedelta(days=hi)
+        p_lo = max(0, points.index.searchsorted(day_lo, side="right") - 1)
+        p_hi = min(len(points), points.index.searchsorted(day_hi, side="left") + 1)
+        segment = interpolate_points(points.iloc[p_lo:p_hi], target_end)
+        cpi[lo - start_row : hi - start_row] = segment.loc[day_lo : day_hi - pd.Timedelta(days=1), "CPI"].to_numpy()
+
+        # The ratio of the row right after the window depends on the window's last value.
+        m_lo = max(lo, 1) - start_row
+        m_hi = min(n_total, hi + 1) - start_row
+        if m_lo < m_hi:
+            prev = cpi[m_lo - 1 : m_hi - 1]
+            mult[m_lo:m_hi] = _round_half_even(1 + (cpi[m_lo:m_hi] - prev) / prev, 6)
+        if lo == 0:
+            mult[0] = 1.0
+
+    timestamps = pd.date_range(first + pd.Timedelta(days=start_row), periods=size, freq="D").strftime("%Y-%m-%d")
+    daily_df = pd.DataFrame({"timestamp": timestamps, "CPI": cpi, "daily_multiplicator": mult})
+    return daily_df[OUTPUT_COLUMNS], first_changed
+
+
+def read_daily_cpi(path_or_buffer) -> pd.DataFrame:
+    # round_trip so re-writing unchanged rows reproduces the exact same text
+    return pd.read_csv(path_or_buffer, sep=";", float_precision="round_trip")
+
+
+def update_daily_cpi(
+    cpi_table: pd.DataFrame,
+    output_path: Path | str,
+    touched: set[tuple[int, int]],
+    target_end: date | None = None,
+    verify: bool = False,
+) -> int:
+    """
+    Incrementally refresh the daily CPI file at `output_path` for the touched (year, month)
+    cells. Only rows from the first changed row on are parsed and rewritten; the prefix is
+    kept byte-for-byte. Falls back to a full rebuild when the file can't be spliced, e.g. when it
+    ends before the newest monthly value (the same check as `CpiIndex.is_stale`).
+
+    Returns the number of rows (re)written. With `verify=True`, the result is compared against
+    a full rebuild and a RuntimeError is raised on any difference.
+    """
+    output_path = Path(output_path)
+    if target_end is None:
+        target_end = default_target_end()
+
+    spliced = None
+    with _span("daily_read"):
+        raw = output_path.read_bytes() if output_path.exists() else b""
+    real_points = monthly_points(cpi_table)
+    if raw and not real_points.empty:
+        # Line i+1 is data row i (line 0 is the header); find where each line starts.
+        newlines = np.flatnonzero(np.frombuffer(raw, dtype=np.uint8) == ord("\n"))
+        line_starts = np.concatenate([[0], newlines + 1])
+        first = real_points.index[0]
+        n_existing = len(line_starts) - 1 - (1 if line_starts[-1] == len(raw) else 0)
+
+        ranges = dirty_ranges(real_points, touched)
+        windows = _row_windows(ranges, first, 1 << 40)
+        start_row = min([lo for lo, _ in windows] + [n_existing])
+        start_row = max(0, min(start_row, n_existing) - 1)  # one row of context for the ratio
+        header = raw[: line_starts[1]] if len(line_starts) > 1 else raw
+        offset = int(line_starts[start_row + 1]) if start_row + 1 < len(line_starts) else len(raw)
+        with _span("daily_parse", bytes=len(raw) - offset):
+            existing = read_daily_cpi(BytesIO(header + raw[offset:]))
+        with _span("daily_splice"):
+            spliced = splice_daily_cpi(cpi_table, existing, touched, target_end, start_row=start_row)
+
+    if spliced is None:
+        with _span("daily_generate"):
+            daily_df = generate_daily_cpi(cpi_table, target_end=target_end)
+        with _span("daily_write", rows=len(daily_df)):
+            write_daily_cpi(daily_df, output_path)
+        written = len(daily_df)
+    else:
+        daily_df, first_changed = spliced
+        offset = int(line_starts[first_changed + 1]) if first_changed + 1 < len(line_starts) else len(raw)
+        rows = daily_df.iloc[first_changed - start_row :]
+        text = rows.to_csv(sep=";", index=False, header=False, columns=OUTPUT_COLUMNS).encode()
+        with _span("daily_write", rows=len(rows), bytes=len(text)):
+            with open(output_path, "r+b") as f:
+                f.seek(offset)
+                f.write(text)
+                f.truncate()
+        written = len(rows)
+
+    if verify:
+        with _span("daily_verify"):
+            full = generate_daily_cpi(cpi_table, target_end=target_end)
+            same = read_daily_cpi(output_path).equals(full)
+        if not same:
+            raise RuntimeError(f"incremental daily CPI differs from a full rebuild: {output_path}")
+
+    return written
+
+
+def main() -> int:
+    # Load CPI monthly table
+    df = pd.read_csv("CPI_U.csv", sep=",")
+    try:
+        daily_df = generate_daily_cpi(df)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    write_daily_cpi(daily_df, "daily_cpi_inflation.csv")
+    print(daily_df.head(10))
+    return 0
 
 
-# Load CPI monthly table
-csv_path = "CPI_U.csv"
-df = pd.read_csv(csv_path, sep=",")
-
-# Build sorted list of known monthly points (month start -> CPI value)
-points: list[tuple[datetime, float]] = []
-for _, row in df.iterrows():
-    year = int(row["Year"])
-    monthly = pd.to_numeric(row[MONTH_COLS], errors="coerce").values
-    for m in range(1, 13):
-        v = monthly[m - 1]
-        if pd.isna(v):
-            continue
-        points.append((month_start(year, m), float(v)))
-
-points.sort(key=lambda x: x[0])
-if not points:
-    raise SystemExit("No CPI values found in CPI_U.csv")
-
-# Extend with predicted future months so we can generate "in-between" days
-# even when the next month isn't published yet (e.g. generate December without Jan).
-today_utc = datetime.now(timezone.utc).date()
-target_end = datetime(today_utc.year, today_utc.month, today_utc.day) + timedelta(days=1)  # exclusive
-
-last_dt, last_v = points[-1]
-prev_v = points[-2][1] if len(points) >= 2 else last_v
-monthly_delta = last_v - prev_v  # naive trend
-
-while add_month(last_dt) < target_end:
-    nxt_dt = add_month(last_dt)
-    nxt_v = last_v + monthly_delta  # simple extrapolation
-    points.append((nxt_dt, nxt_v))
-    last_dt, last_v = nxt_dt, nxt_v
-
-# Generate daily series by interpolating across consecutive known/predicted points.
-# This also fills missing months (e.g. Sep -> Nov fills all October days).
-daily_data = []
-for i in range(len(points) - 1):
-    dt0, v0 = points[i]
-    dt1, v1 = points[i + 1]
-    daily_data.extend(interpolate_daily(v0, v1, dt0, dt1))
-
-# Optionally cap at target_end (in case we overshot by adding future months)
-daily_df = pd.DataFrame(daily_data)
-daily_df = daily_df.drop_duplicates(subset=["timestamp"], keep="last")
-daily_df["__dt__"] = pd.to_datetime(daily_df["timestamp"], errors="coerce")
-daily_df = daily_df.dropna(subset=["__dt__"]).sort_values("__dt__")
-daily_df = daily_df[daily_df["__dt__"] < pd.Timestamp(target_end)]
-daily_df = daily_df.drop(columns=["__dt__"]).reset_index(drop=True)
-
-# Calculate daily_multiplicator
-daily_df["daily_multiplicator"] = 1.0
-for i in range(1, len(daily_df)):
-    cpi_n = daily_df.loc[i, "CPI"]
-    cpi_n_1 = daily_df.loc[i - 1, "CPI"]
-    daily_df.loc[i, "daily_multiplicator"] = round(1 + (cpi_n - cpi_n_1) / cpi_n_1, 6)
-
-# Save
-output_path = "daily_cpi_inflation.csv"
-daily_df.to_csv(output_path, sep=";", index=False, columns=["timestamp", "CPI", "daily_multiplicator"])
-
-print(daily_df.head(10))
\ No newline at end of file
+if __name__ == "__main__":
+    raise SystemExit(main())
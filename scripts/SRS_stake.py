@@ -1,37 +1,65 @@
+# para rodar:
+#  python3 scripts/SRS_stake.py            # the three example periods, month by month
+#  python3 scripts/SRS_stake.py --sweep    # every daily start since 2016 x 3m/1y/2y horizons
+import argparse
+
 import pandas as pd
-import datetime
+
+import instrument
+import profiling
+from debase_data import PriceLookup
+from staking import Strategy, simulate
 
 # Constants
 initial_eth = 10  # Starting amount of 10 ETH
-srs_apy = 0.045   # 4.5% APY for SRS
-eth_stake_apy = 0.027 # 2.7% APY for ETH Stake
 
-# Daily multipliers (calculated once)
-srs_daily_multiplier = (1 + srs_apy) ** (1 / 365)
-eth_stake_daily_multiplier = (1 + eth_stake_apy) ** (1 / 365)
+STRATEGIES = [
+    Strategy.from_apy('SRS', 0.045),        # 4.5% APY for SRS
+    Strategy.from_apy('ETH Stake', 0.027),  # 2.7% APY for ETH Stake
+]
+# Extra note on a strategy's label in the final summary
+SUMMARY_NOTES = {'ETH Stake': 'ETH Price Change'}
+
+# (start date, months, label)
+PERIODS = [
+    ('2025-01-01', 3, "3-Month Period (Jan-Mar 2025)"),
+    ('2024-06-01', 12, "1-Year Period (Jun 2024 - Jun 2025)"),
+    ('2023-06-01', 24, "2-Year Period (Jun 2023 - Jun 2025)"),
+]
+
+_eth_prices = None
+
+# --- ETH close lookup, loaded once and shared by every period ---
+def get_eth_prices():
+    global _eth_prices
+    if _eth_prices is None:
+        with instrument.span('load'):
+            _eth_prices = PriceLookup.from_dataset('ethereum')
+    return _eth_prices
 
 # --- Function to get ETH price for a specific date ---
-def get_eth_price(eth_data, date_str):
-    try:
-        price = eth_data[eth_data['Start'] == date_str]['Close'].iloc[0]
-        return price
-    except (IndexError, KeyError):
+def get_eth_price(eth_prices, date_str):
+    price = eth_prices.price(date_str)
+    if price is None:
         print(f"Warning: No price data for {date_str}")
-        return None
+    return price
+
+def _label(strategy, note=None):
+    extra = f" + {note}" if note else ""
+    return f"{strategy.name} ({strategy.apy * 100:.1f}% APY{extra})"
 
 # --- Function to perform analysis for a given period ---
-def analyze_period(start_date_str, total_days, monthly_days_list, period_name):
+def analyze_period(start_date_str, months, period_name, strategies=STRATEGIES):
     print(f"\n--- {period_name} Analysis ({start_date_str} onwards) ---")
 
     try:
-        eth_data = pd.read_csv('datasets/ethereum_2015-08-07_2025-07-25.csv')
-        eth_data['Start'] = pd.to_datetime(eth_data['Start']).dt.strftime('%Y-%m-%d')
-        
+        eth_prices = get_eth_prices()
+
         # Get initial ETH price
-        eth_price_start = get_eth_price(eth_data, start_date_str)
+        eth_price_start = get_eth_price(eth_prices, start_date_str)
         if eth_price_start is None:
             return
-            
+
     except FileNotFoundError:
         print("Error: CSV file 'ethereum_2015-08-07_2025-07-25.csv' not found. Please ensure it's in the 'datasets/' folder.")
         return
@@ -41,141 +69,75 @@ def analyze_period(start_date_str, total_days, monthly_days_list, period_name):
     print(f"\nETH Price on {start_date_str}: ${eth_price_start:,.2f} USD")
     print(f"Starting amount: {initial_eth} ETH (${initial_usd:,.2f} USD)")
 
-    # Monthly breakdown
-    monthly_srs_eth = []
-    monthly_srs_usd = []
-    monthly_eth_stake_eth = []
-    monthly_eth_stake_usd = []
-    months_labels = []
-
-    current_srs_eth = initial_eth
-    current_eth_stake_eth = initial_eth
-    
-    # Generate month labels and calculate for each month
-    start_year, start_month, start_day = map(int, start_date_str.split('-'))
-    current_date = datetime.date(start_year, start_month, start_day)
-    days_passed = 0
-
-    for i, days_in_month in enumerate(monthly_days_list):
-        # Calculate end date for this month
-        end_date = current_date + datetime.timedelta(days=days_in_month)
-        end_date_str = end_date.strftime('%Y-%m-%d')
-        
-        # Get ETH price at end of month
-        eth_price_end = get_eth_price(eth_data, end_date_str)
-        if eth_price_end is None:
-            # Try to find closest date
-            for j in range(1, 8):  # Try up to 7 days before/after
-                test_date = end_date - datetime.timedelta(days=j)
-                eth_price_end = get_eth_price(eth_data, test_date.strftime('%Y-%m-%d'))
-                if eth_price_end is not None:
-                    break
-            if eth_price_end is None:
-                for j in range(1, 8):
-                    test_date = end_date + datetime.timedelta(days=j)
-                    eth_price_end = get_eth_price(eth_data, test_date.strftime('%Y-%m-%d'))
-                    if eth_price_end is not None:
-                        break
-        
-        if eth_price_end is None:
-            print(f"Error: Could not find ETH price for month ending around {end_date_str}")
-            continue
-        
-        # Calculate SRS growth (fixed APY, no price exposure)
-        current_srs_eth *= (srs_daily_multiplier ** days_in_month)
-        
-        # Calculate ETH Stake growth (staking yield + price appreciation)
-        # ETH amount grows by staking yield
-        current_eth_stake_eth *= (eth_stake_daily_multiplier ** days_in_month)
-        
-        # Create month label
-        month_label = f"End of {end_date.strftime('%b %Y')}"
-        months_labels.append(month_label)
-        
-        # Store results
-        monthly_srs_eth.append(current_srs_eth)
-        monthly_srs_usd.append(current_srs_eth * eth_price_end)  # SRS now uses current ETH price
-        monthly_eth_stake_eth.append(current_eth_stake_eth)
-        monthly_eth_stake_usd.append(current_eth_stake_eth * eth_price_end)  # ETH stake uses current ETH price
-        
-        # Move to next period
-        current_date = end_date
-        days_passed += days_in_month
-    
+    # One start date x one horizon per month end; month-end prices: that day, else up to 7 days
+    # before, else up to 7 days after
+    with instrument.span('simulate'):
+        grid = simulate(
+            eth_prices,
+            strategies,
+            starts=[start_date_str],
+            horizons=[f"{m}m" for m in range(1, months + 1)],
+            amount=initial_eth,
+        )
+
+    for end in grid.loc[grid['price_end'].isna(), 'end'].unique():
+        print(f"Error: Could not find ETH price for month ending around {pd.Timestamp(end):%Y-%m-%d}")
+
     # Print monthly breakdown
-    if True:
-        print(f"\n--- Monthly Breakdown ---")
-        print("\nSRS (4.5% APY):")
-        for i, label in enumerate(months_labels):
-            print(f"  {label}: {monthly_srs_eth[i]:.3f} ETH (${monthly_srs_usd[i]:,.2f} USD)")
-
-        print("\nETH Stake (2.7% APY):")
-        for i, label in enumerate(months_labels):
-            print(f"  {label}: {monthly_eth_stake_eth[i]:.3f} ETH (${monthly_eth_stake_usd[i]:,.2f} USD)")
-
-    # Final summary - get final ETH price
-    final_date = datetime.date(start_year, start_month, start_day) + datetime.timedelta(days=total_days)
-    final_date_str = final_date.strftime('%Y-%m-%d')
-    eth_price_final = get_eth_price(eth_data, final_date_str)
-    
-    if eth_price_final is None:
-        # Try to find closest date
-        for j in range(1, 8):
-            test_date = final_date - datetime.timedelta(days=j)
-            eth_price_final = get_eth_price(eth_data, test_date.strftime('%Y-%m-%d'))
-            if eth_price_final is not None:
-                break
-    
-    if eth_price_final is None:
+    print(f"\n--- Monthly Breakdown ---")
+    for strategy in strategies:
+        print(f"\n{_label(strategy)}:")
+        rows = grid[(grid['strategy'] == strategy.name) & grid['price_end'].notna()]
+        for row in rows.itertuples():
+            print(f"  End of {row.end:%b %Y}: {row.units_end:.3f} ETH (${row.value_end:,.2f} USD)")
+
+    # Final summary - last month end
+    final = grid[grid['horizon'] == f"{months}m"]
+    eth_price_final = final['price_end'].iloc[0]
+    if pd.isna(eth_price_final):
         print("Warning: Using start price for final calculations")
         eth_price_final = eth_price_start
 
-    # Calculate final amounts
-    srs_final_eth = initial_eth * (srs_daily_multiplier ** total_days)
-    srs_yield_eth = srs_final_eth - initial_eth
-    srs_final_usd = srs_final_eth * eth_price_final  # SRS now uses final ETH price
-    srs_yield_usd = srs_final_usd - initial_usd
-
-    eth_stake_final_eth = initial_eth * (eth_stake_daily_multiplier ** total_days)
-    eth_stake_yield_eth = eth_stake_final_eth - initial_eth
-    eth_stake_final_usd = eth_stake_final_eth * eth_price_final  # ETH stake uses final ETH price
-    eth_stake_yield_usd = eth_stake_final_usd - initial_usd
-
     print(f"\n--- Final Summary ({period_name}) ---")
     print(f"\nFinal ETH Price: ${eth_price_final:,.2f} USD (vs ${eth_price_start:,.2f} start)")
     print(f"ETH Price Change: {((eth_price_final/eth_price_start - 1) * 100):+.1f}%")
-    
-    print("\nSRS (4.5% APY):")
-    print(f"  Final amount: {srs_final_eth:.3f} ETH (${srs_final_usd:,.2f} USD)")
-    print(f"  Yield: {srs_yield_eth:.3f} ETH (${srs_yield_usd:,.2f} USD)")
-
-    print("\nETH Stake (2.7% APY + ETH Price Change):")
-    print(f"  Final amount: {eth_stake_final_eth:.3f} ETH (${eth_stake_final_usd:,.2f} USD)")
-    print(f"  Yield: {eth_stake_yield_eth:.3f} ETH (${eth_stake_yield_usd:,.2f} USD)")
-
-
-# --- Run Analyses ---
-
-# 3-Month Analysis (January 2025 - March 2025)
-analyze_period(
-    start_date_str='2025-01-01',
-    total_days=90, # Jan (31) + Feb (28) + Mar (31) = 90
-    monthly_days_list=[31, 28, 31], # Days for Jan, Feb (2025 is not leap year), Mar
-    period_name="3-Month Period (Jan-Mar 2025)"
-)
-
-# 1-Year Analysis (June 2024 - Jun 2025)
-analyze_period(
-    start_date_str='2024-06-01',
-    total_days=365,
-    monthly_days_list=[30, 31, 31, 30, 31, 30, 31, 31, 28, 31, 30, 31], # Jun 24 to May 25
-    period_name="1-Year Period (Jun 2024 - Jun 2025)"
-)
-
-# 2-Year Analysis (June 2023 - Jun 2025)
-analyze_period(
-    start_date_str='2023-06-01',
-    total_days=730,
-    monthly_days_list=[30, 31, 31, 30, 31, 30, 31, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31, 31, 28, 31, 30, 31], # Jun 23 to May 25 (24 months)
-    period_name="2-Year Period (Jun 2023 - Jun 2025)"
-)
\ No newline at end of file
+
+    for strategy, row in zip(strategies, final.itertuples()):
+        final_usd = row.units_end * eth_price_final
+        print(f"\n{_label(strategy, SUMMARY_NOTES.get(strategy.name))}:")
+        print(f"  Final amount: {row.units_end:.3f} ETH (${final_usd:,.2f} USD)")
+        print(f"  Yield: {row.reward_units:.3f} ETH (${final_usd - initial_usd:,.2f} USD)")
+
+
+# --- Return distribution over many start dates ---
+def sweep(start='2016-01-01', horizons=('3m', '1y', '2y'), strategies=STRATEGIES):
+    eth_prices = get_eth_prices()
+    last = pd.Timestamp(eth_prices.last_date)
+    starts = pd.date_range(start, last)
+    with instrument.span('simulate'):
+        grid = simulate(eth_prices, strategies, starts, list(horizons), amount=initial_eth)
+    grid = grid[grid['end'] <= last]
+
+    print(f"\n--- USD return over {len(starts)} daily starts ({start} to {last:%Y-%m-%d}) ---")
+    summary = (
+        grid.groupby(['strategy', 'horizon'], sort=False)['return_pct']
+        .describe(percentiles=[0.1, 0.5, 0.9])[['count', 'min', '10%', '50%', '90%', 'max']]
+    )
+    summary['count'] = summary['count'].astype(int)
+    print(summary.to_string(float_format=lambda x: f"{x:+.1f}%"))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="SRS vs ETH staking over historical ETH prices.")
+    parser.add_argument('--sweep', action='store_true', help="Summarize every daily start date instead")
+    parser.add_argument('--sweep-start', default='2016-01-01')
+    profiling.add_profile_args(parser)
+    args = parser.parse_args()
+    profiling.start(args, 'SRS_stake')
+
+    if args.sweep:
+        sweep(args.sweep_start)
+    else:
+        # --- Run Analyses ---
+        for start_date_str, months, period_name in PERIODS:
+            analyze_period(start_date_str, months, period_name)
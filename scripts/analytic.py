@@ -1,7 +1,146 @@
 # para rodar:
 #  python3 scripts/analytic.py
+#  python3 scripts/analytic.py --assets bitcoin ethereum monero gold --start 2024-01-01
+import argparse
+from dataclasses import dataclass
+
+import numpy as np
 import pandas as pd
 
+import instrument
+import profiling
+from debase_data import load
+
+ASSET_LABELS = {
+    'bitcoin': 'BTC',
+    'ethereum': 'ETH',
+    'monero': 'XMR',
+    'gold': 'GOLD',
+    'silver': 'SILVER',
+}
+ASSET_NAMES = {
+    'bitcoin': 'Bitcoin',
+    'ethereum': 'Ethereum',
+    'monero': 'Monero',
+    'gold': 'Ouro',
+    'silver': 'Prata',
+}
+MESES = [
+    'Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
+    'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro',
+]
+DEFAULT_ASSETS = ['bitcoin', 'ethereum', 'monero']
+DEFAULT_START = '2021-11-01'
+
+
+@dataclass
+class AthAnalysis:
+    """
+    Result of `ath_engine`.
+
+    Attributes:
+        frame (pd.DataFrame): Outer-joined per-date series, columns `(label, field)` with fields
+            `close`, `ath` (running max), `is_ath`, `drawdown` (close / ath - 1) and
+            `days_since_ath` (fractional days for intraday data). NaN where the asset has no row.
+        events (pd.DataFrame): One row per date on/after the start date where any asset made an
+            ATH: `Date`, `ATH_Coins` and `<label>_Price` for every asset.
+        counts (dict): Number of ATHs per asset on/after the start date.
+        pre_ath_values (dict): Highest close per asset before the start date (None if no data).
+    """
+    frame: pd.DataFrame
+    events: pd.DataFrame
+    counts: dict
+    pre_ath_values: dict
+
+
+def ath_engine(prices, start_date):
+    """
+    Computes ATH flags, drawdown and time since ATH for any number of assets in one pass.
+
+    All series are outer-joined on their timestamps, so every step is a column-wise vectorized
+    operation (`cummax`, comparisons, forward fill) and the cost is linear in the number of rows;
+    it works the same on daily or minute-level data.
+
+    Args:
+        prices (dict): Label -> close price Series indexed by timestamp.
+        start_date: First date counted as "new" ATH (str or Timestamp).
+
+    Returns:
+        AthAnalysis
+    """
+    start_date = pd.Timestamp(start_date)
+    labels = list(prices)
+    close = pd.concat(prices, axis=1, join='outer', sort=True)
+    close = close[~close.index.duplicated(keep='last')]
+
+    # History before the first row of an asset is NaN; cummax skips it and NaN never equals.
+    ath = close.cummax()
+    is_ath = close.eq(ath)
+    drawdown = close / ath - 1.0
+
+    stamps = close.index.to_numpy()
+    last_ath = pd.DataFrame(
+        np.where(is_ath.to_numpy(), stamps[:, None], np.datetime64('NaT')),
+        index=close.index,
+        columns=labels,
+    ).ffill()
+    days_since = (stamps[:, None] - last_ath.to_numpy()) / np.timedelta64(1, 'D')
+    days_since = pd.DataFrame(days_since, index=close.index, columns=labels).where(close.notna())
+
+    frame = pd.concat(
+        {'close': close, 'ath': ath, 'is_ath': is_ath, 'drawdown': drawdown, 'days_since_ath': days_since},
+        axis=1,
+    ).swaplevel(axis=1)
+    frame = frame[[(label, field) for label in labels for field in ('close', 'ath', 'is_ath', 'drawdown', 'days_since_ath')]]
+
+    pre = close[close.index < start_date].max()
+    pre_ath_values = {label: (None if pd.isna(pre.get(label)) else pre[label]) for label in labels}
+
+    new_ath = is_ath & (close.index >= start_date)[:, None]
+    counts = {label: int(n) for label, n in new_ath.sum().items()}
+
+    rows = new_ath.any(axis=1).to_numpy()
+    flags = new_ath.to_numpy()[rows]
+    names = np.where(flags, np.array([f'{label}, ' for label in labels], dtype=object), '')
+    events = pd.DataFrame({'Date': close.index[rows]})
+    events['ATH_Coins'] = names.astype(object).sum(axis=1) if len(events) else pd.Series([], dtype=object)
+    events['ATH_Coins'] = events['ATH_Coins'].str.rstrip(', ')
+    for label in labels:
+        events[f'{label}_Price'] = close[label].to_numpy()[rows]
+
+    return AthAnalysis(frame=frame, events=events, counts=counts, pre_ath_values=pre_ath_values)
+
+
+def analyze_aths(assets=DEFAULT_ASSETS, start_date=DEFAULT_START, paths=None, datasets_dir=None):
+    """
+    Loads the given datasets and runs `ath_engine` on their closes.
+
+    Args:
+        assets (list): Dataset names (see `ASSET_LABELS`).
+        start_date: First date counted as "new" ATH.
+        paths (dict): Optional dataset name -> CSV path overrides.
+        datasets_dir (str): Optional datasets directory.
+
+    Returns:
+        AthAnalysis, or None if a dataset could not be loaded.
+    """
+    paths = paths or {}
+    try:
+        with instrument.span('load'):
+            prices = {
+                ASSET_LABELS.get(name, name.upper()): load(name, paths.get(name), datasets_dir)['close']
+                for name in assets
+            }
+    except FileNotFoundError as e:
+        print(f"Erro: Arquivo não encontrado - {e}")
+        return None
+    except Exception as e:
+        print(f"Erro ao carregar dados: {e}")
+        return None
+    with instrument.span('analyze'):
+        return ath_engine(prices, start_date)
+
+
 def analyze_crypto_aths(btc_data_path, eth_data_path, xmr_data_path):
     """
     Analyses Bitcoin, Ethereum, and Monero All-Time Highs (ATHs) since November 2021.
@@ -17,108 +156,69 @@ def analyze_crypto_aths(btc_data_path, eth_data_path, xmr_data_path):
         dict: A dictionary containing the count of ATHs for each coin.
         dict: A dictionary with the ATHs of each coin before the analysis start date.
     """
-    try:
-        df_btc = pd.read_csv(btc_data_path, parse_dates=['Start']).drop_duplicates(subset='Start', keep='last').set_index('Start').sort_index()
-        df_eth = pd.read_csv(eth_data_path, parse_dates=['Start']).drop_duplicates(subset='Start', keep='last').set_index('Start').sort_index()
-        df_xmr = pd.read_csv(xmr_data_path, parse_dates=['Start']).drop_duplicates(subset='Start', keep='last').set_index('Start').sort_index()
-    except FileNotFoundError as e:
-        print(f"Erro: Arquivo não encontrado - {e}")
-        return None, None, None
-    except Exception as e:
-        print(f"Erro ao carregar dados: {e}")
+    paths = {'bitcoin': btc_data_path, 'ethereum': eth_data_path, 'monero': xmr_data_path}
+    result = analyze_aths(DEFAULT_ASSETS, DEFAULT_START, paths=paths)
+    if result is None:
         return None, None, None
+    if result.events.empty:
+        return pd.DataFrame(), {}, result.pre_ath_values
+    return result.events, result.counts, result.pre_ath_values
+
+
+def _describe(assets, start_date):
+    names = [ASSET_NAMES.get(name, name.capitalize()) for name in assets]
+    joined = names[0] if len(names) == 1 else f"{', '.join(names[:-1])} e {names[-1]}"
+    return joined, f"{MESES[start_date.month - 1]} de {start_date.year}"
 
-    start_date = pd.to_datetime('2021-11-01')
-
-    # Find ATHs before the start date
-    df_btc_pre_nov = df_btc[df_btc.index < start_date]
-    df_eth_pre_nov = df_eth[df_eth.index < start_date]
-    df_xmr_pre_nov = df_xmr[df_xmr.index < start_date]
-
-    pre_ath_values = {
-        'BTC': df_btc_pre_nov['Close'].max() if not df_btc_pre_nov.empty else None,
-        'ETH': df_eth_pre_nov['Close'].max() if not df_eth_pre_nov.empty else None,
-        'XMR': df_xmr_pre_nov['Close'].max() if not df_xmr_pre_nov.empty else None
-    }
-    
-    # Calculate cumulative max from the beginning of the entire dataset
-    df_btc['is_ath'] = df_btc['Close'] == df_btc['Close'].cummax()
-    df_eth['is_ath'] = df_eth['Close'] == df_eth['Close'].cummax()
-    df_xmr['is_ath'] = df_xmr['Close'] == df_xmr['Close'].cummax()
-    
-    # Filter the ATH dates to only include those that occurred on or after the start_date
-    btc_ath_dates = df_btc[df_btc['is_ath'] & (df_btc.index >= start_date)].index.tolist()
-    eth_ath_dates = df_eth[df_eth['is_ath'] & (df_eth.index >= start_date)].index.tolist()
-    xmr_ath_dates = df_xmr[df_xmr['is_ath'] & (df_xmr.index >= start_date)].index.tolist()
-
-    all_ath_dates = sorted(set(btc_ath_dates + eth_ath_dates + xmr_ath_dates))
-    
-    if not all_ath_dates:
-        print("Nenhum novo ATH encontrado para Bitcoin, Ethereum ou Monero desde Novembro de 2021.")
-        return pd.DataFrame(), {}, pre_ath_values
-
-    result_data = []
-    for date in all_ath_dates:
-        ath_coins = []
-        if date in btc_ath_dates:
-            ath_coins.append('BTC')
-        if date in eth_ath_dates:
-            ath_coins.append('ETH')
-        if date in xmr_ath_dates:
-            ath_coins.append('XMR')
-
-        row = {
-            'Date': date,
-            'ATH_Coins': ', '.join(ath_coins),
-            'BTC_Price': df_btc.loc[date, 'Close'] if date in df_btc.index else None,
-            'ETH_Price': df_eth.loc[date, 'Close'] if date in df_eth.index else None,
-            'XMR_Price': df_xmr.loc[date, 'Close'] if date in df_xmr.index else None
-        }
-        result_data.append(row)
-
-    df_result = pd.DataFrame(result_data)
-    
-    ath_counts = {
-        'BTC': len(btc_ath_dates),
-        'ETH': len(eth_ath_dates),
-        'XMR': len(xmr_ath_dates)
-    }
-
-    return df_result, ath_counts, pre_ath_values
 
 if __name__ == '__main__':
-    BTC_DATA_FILE = 'datasets/bitcoin_2010-07-17_2025-07-25.csv'
-    ETH_DATA_FILE = 'datasets/ethereum_2015-08-07_2025-07-25.csv'
-    XMR_DATA_FILE = 'datasets/monero_2014-05-21_2025-07-25.csv'
+    parser = argparse.ArgumentParser(description="ATHs, drawdown e dias desde o ATH por ativo.")
+    parser.add_argument('--assets', nargs='+', default=DEFAULT_ASSETS, choices=sorted(ASSET_LABELS))
+    parser.add_argument('--start', default=DEFAULT_START, help=f"Data inicial (default: {DEFAULT_START})")
+    parser.add_argument('--datasets-dir', default=None)
+    profiling.add_profile_args(parser)
+    args = parser.parse_args()
+    profiling.start(args, 'analytic')
 
-    result_df, ath_counts, pre_ath_values = analyze_crypto_aths(BTC_DATA_FILE, ETH_DATA_FILE, XMR_DATA_FILE)
+    start = pd.Timestamp(args.start)
+    start_str = start.strftime('%Y-%m-%d')
+    assets_desc, period_desc = _describe(args.assets, start)
+    result = analyze_aths(args.assets, start, datasets_dir=args.datasets_dir)
 
-    if result_df is not None:
-        print("\n--- ATHs de Bitcoin, Ethereum e Monero Antes de Novembro de 2021 ---")
-        for coin, price in pre_ath_values.items():
+    if result is not None:
+        print(f"\n--- ATHs de {assets_desc} Antes de {period_desc} ---")
+        for coin, price in result.pre_ath_values.items():
             if price is not None:
-                print(f"ATH para {coin} (antes de 2021-11-01): {price:.2f}")
+                print(f"ATH para {coin} (antes de {start_str}): {price:.2f}")
             else:
-                print(f"ATH para {coin} (antes de 2021-11-01): N/A")
-
-        if not result_df.empty:
-            print("\n--- ATHs de Bitcoin, Ethereum e Monero desde Novembro de 2021 ---")
-            
-            df_display = result_df.copy()
-            numeric_cols = ['BTC_Price', 'ETH_Price', 'XMR_Price']
-            for col in numeric_cols:
-                if col in df_display.columns:
+                print(f"ATH para {coin} (antes de {start_str}): N/A")
+
+        if not result.events.empty:
+            print(f"\n--- ATHs de {assets_desc} desde {period_desc} ---")
+
+            df_display = result.events.copy()
+            for col in df_display.columns:
+                if col.endswith('_Price'):
                     df_display[col] = df_display[col].apply(lambda x: f"{x:.2f}" if pd.notnull(x) else "N/A")
-            
+
             print(df_display.to_string(index=False))
-            
-            print("\n--- Contagem de ATHs desde Novembro de 2021 ---")
-            for coin, count in ath_counts.items():
+
+            print(f"\n--- Contagem de ATHs desde {period_desc} ---")
+            for coin, count in result.counts.items():
                 print(f"ATHs para {coin}: {count}")
-            
-            print(f"\nResumo final: BTC: {ath_counts['BTC']} | ETH: {ath_counts['ETH']} | XMR: {ath_counts['XMR']}")
+
+            summary = ' | '.join(f"{coin}: {count}" for coin, count in result.counts.items())
+            print(f"\nResumo final: {summary}")
+
+            print("\n--- Distância do ATH (último dia de cada ativo) ---")
+            for coin in result.counts:
+                last = result.frame[coin].dropna(subset=['close']).iloc[-1]
+                print(
+                    f"{coin}: ATH {last['ath']:.2f} | drawdown {last['drawdown'] * 100:.1f}% | "
+                    f"{last['days_since_ath']:.0f} dias desde o ATH"
+                )
             print("\n--- Fim da Análise ---")
         else:
-            print("Não houve novos ATHs desde Novembro de 2021.")
+            print(f"Não houve novos ATHs desde {period_desc}.")
     else:
-        print("Não foi possível gerar a análise.")
\ No newline at end of file
+        print("Não foi possível gerar a análise.")
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Precompute inflation-adjusted and gold-denominated daily prices for the front-end.
+
+For each asset (BTC, ETH, XMR, silver) this produces, on the asset's own trading days:
+- usd:      nominal close in USD
+- real_usd: close deflated by daily CPI to dollars of `--base-date`
+            (real = usd * CPI(base) / CPI(day))
+- gold_oz:  close in troy ounces of gold (usd / gold close of that day)
+
+CPI comes from `debase_data.CpiIndex` (dense daily array; days after the CPI file's end use its
+last value). Gold is matched with a vectorized as-of join (last close on or before the day, via
+`np.searchsorted`); gold weekends/holidays use the previous close, up to `--max-gold-gap` days.
+
+Output is one compact JSON file (`datasets/adjusted_prices.json`):
+
+    {"base_date": "YYYY-MM-DD",
+     "sources": {"<input CSV>": "<content hash>", ...},
+     "assets": {"bitcoin": {"start": "YYYY-MM-DD", "days": [0, 1, ...],
+                            "usd": [...], "real_usd": [...], "gold_oz": [...]}, ...}}
+
+`days` are offsets from `start`; missing values are null. `sources` holds the content hash of
+every input CSV; the file is only rebuilt when one of them or the base date differs (use
+`--force` to rebuild anyway); a checkout or `touch` that leaves the content alone doesn't count.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from datetime import date, datetime
+from pathlib import Path
+
+import instrument
+import profiling
+from csv_io import read_max_date
+from debase_data.cache import DATASETS, DEFAULT_DATASETS_DIR, file_hash
+
+ASSETS = ["bitcoin", "ethereum", "monero", "silver"]
+OUTPUT_NAME = "adjusted_prices.json"
+SIGNIFICANT_DIGITS = 6
+
+
+def _days(index: pd.DatetimeIndex) -> np.ndarray:
+    import numpy as np
+
+    return index.to_numpy().astype("datetime64[D]").astype(np.int64)
+
+
+def asof(keys: np.ndarray, values: np.ndarray, query: np.ndarray, max_gap: int | None = None) -> np.ndarray:
+    """
+    For each `query` day, the value at the last `keys` day <= query (NaN before the first key,
+    or when the match is more than `max_gap` days old). `keys` must be sorted.
+    """
+    import numpy as np
+
+    pos = np.searchsorted(keys, query, side="right") - 1
+    out = np.full(len(query), np.nan)
+    ok = pos >= 0
+    if max_gap is not None:
+        ok &= (query - keys[np.clip(pos, 0, None)]) <= max_gap
+    out[ok] = values[pos[ok]]
+    return out
+
+
+def build_adjusted(
+    datasets_dir: Path,
+    base_date: date | None = None,
+    assets: list[str] = ASSETS,
+    max_gold_gap: int = 7,
+) -> tuple[date, dict[str, pd.DataFrame]]:
+    """
+    Returns (base_date, {asset: DataFrame[usd, real_usd, gold_oz] indexed by date}).
+    `base_date` defaults to the last day of the daily CPI series.
+    """
+    import pandas as pd
+
+    from debase_data import CpiIndex, load
+
+    # The daily CPI file as written by update_cpi.py, so the output only changes with it.
+    cpi = CpiIndex.load(datasets_dir, fallback=False)
+    gold = load("gold", datasets_dir=datasets_dir)
+    gold_days = _days(gold.index)
+    gold_close = gold["close"].to_numpy()
+
+    if base_date is None:
+        base_date = cpi.last_date
+
+    out: dict[str, pd.DataFrame] = {}
+    for name in assets:
+        df = load(name, datasets_dir=datasets_dir)
+        days = _days(df.index)
+        usd = df["close"].to_numpy()
+        out[name] = pd.DataFrame(
+            {
+                "usd": usd,
+                "real_usd": cpi.deflate(usd, days, base_date),
+                "gold_oz": usd / asof(gold_days, gold_close, days, max_gap=max_gold_gap),
+            },
+            index=df.index,
+        )
+    return base_date, out
+
+
+def _compact(values: np.ndarray) -> list[float | None]:
+    import numpy as np
+
+    # Round to a few significant digits and turn NaN into null to keep the JSON small.
+    return [None if np.isnan(v) else float(f"{v:.{SIGNIFICANT_DIGITS}g}") for v in values]
+
+
+def to_json(base_date: date, series: dict[str, pd.DataFrame], sources: dict[str, str] | None = None) -> dict:
+    import numpy as np
+
+    assets = {}
+    for name, df in series.items():
+        days = _days(df.index)
+        start = int(days[0]) if len(days) else 0
+        assets[name] = {
+            "start": str(np.datetime64(start, "D")),
+            "days": (days - start).tolist(),
+            **{col: _compact(df[col].to_numpy()) for col in ("usd", "real_usd", "gold_oz")},
+        }
+    return {"base_date": base_date.isoformat(), "sources": sources or {}, "assets": assets}
+
+
+def _input_paths(datasets_dir: Path, assets: list[str]) -> list[Path]:
+    return [datasets_dir / DATASETS[name].csv_name for name in ["daily_cpi", "gold", *assets]]
+
+
+def _input_hashes(inputs: list[Path]) -> dict[str, str]:
+    """{CSV name: content hash} of the inputs that exist."""
+    return {p.name: file_hash(p) for p in inputs if p.exists()}
+
+
+def is_stale(output: Path, sources: dict[str, str], base_date: date) -> bool:
+    """
+    True if the output is missing, was built from inputs with other content hashes than
+    `sources`, or was built for another base date.
+    """
+    if not output.exists():
+        return True
+    # base_date and sources come before the (large) assets, so the head of the file is enough.
+    with open(output, encoding="utf-8") as f:
+        head = f.read(4096)
+    end = head.find(',"assets":')
+    try:
+        header = json.loads(head[:end] + "}") if end >= 0 else {}
+    except ValueError:
+        return True
+    return header.get("base_date") != base_date.isoformat() or header.get("sources") != sources
+
+
+def run(
+    datasets_dir: Path = DEFAULT_DATASETS_DIR,
+    output: Path | None = None,
+    base_date: date | None = None,
+    force: bool = False,
+) -> bool:
+    """
+    Rebuild the adjusted-prices JSON if any input changed. Returns True when it was written.
+    """
+    output = output or datasets_dir / OUTPUT_NAME
+    cpi_csv = datasets_dir / DATASETS["daily_cpi"].csv_name
+    expected_base = base_date or read_max_date(cpi_csv, "timestamp", delimiter=";")
+    sources = _input_hashes(_input_paths(datasets_dir, ASSETS))
+    if not force and expected_base and not is_stale(output, sources, expected_base):
+        print(f"[adjusted] up to date ({output})")
+        return False
+
+    with instrument.span("compute"):
+        base, series = build_adjusted(datasets_dir, base_date=base_date)
+    with instrument.span("write"):
+        payload = to_json(base, series, sources)
+        tmp = output.with_suffix(".tmp")
+        tmp.write_text(json.dumps(payload, separators=(",", ":")))
+        tmp.replace(output)
+
+    rows = sum(len(df) for df in series.values())
+    print(f"[adjusted] wrote {output} ({rows} rows, base_date={base}, {output.stat().st_size / 1024:.0f} KiB)")
+    return True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build inflation-adjusted / gold-denominated price series.")
+    parser.add_argument("--datasets-dir", default=str(DEFAULT_DATASETS_DIR), help="Directory with the dataset CSVs")
+    parser.add_argument("--output", default=None, help=f"Output JSON (default: <datasets-dir>/{OUTPUT_NAME})")
+    parser.add_argument(
+        "--base-date", default=None, help="Express real USD in dollars of this date (default: last CPI day)"
+    )
+    parser.add_argument("--force", action="store_true", help="Rebuild even if no input changed.")
+    profiling.add_profile_args(parser)
+    args = parser.parse_args()
+    profiling.start(args, "build_adjusted")
+
+    base_date = None if args.base_date is None else datetime.strptime(args.base_date, "%Y-%m-%d").date()
+    run(
+        datasets_dir=Path(args.datasets_dir),
+        output=None if args.output is None else Path(args.output),
+        base_date=base_date,
+        force=args.force,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Precompute level-of-detail (downsampled) versions of the daily series the charts draw.
+
+`index.html` plots full histories (about 20k daily CPI rows, 6k gold, 5.7k BTC) into charts a
+few hundred pixels wide. For every series in `SERIES` and every resolution in `RESOLUTIONS`
+this writes two variants the front-end can pick from by zoom level:
+
+- `lttb`: Largest-Triangle-Three-Buckets, the original points that keep the visual shape of
+  the line (first and last point always kept)
+- `envelope`: the min and max of every bucket, to draw as a band behind the line so spikes
+  that LTTB dropped are still visible
+
+    datasets/lod/manifest.json
+    datasets/lod/<dataset>_lttb_<n>.f32       # shape (2, k): epoch day, value
+    datasets/lod/<dataset>_envelope_<n>.f32   # shape (3, k): first epoch day of the bucket, min, max
+
+Values are little-endian float32 (epoch days are exact in float32) and `k` is in the manifest;
+a series shorter than a resolution is written whole. Bucket bounds, next-bucket averages and
+the envelope are whole-array numpy operations (`reduceat`); only LTTB's choice of point per
+bucket loops, because it depends on the point chosen in the previous bucket.
+
+Each manifest entry records the content hash of its CSV (no size/mtime, so a `touch` or a fresh
+checkout of the CSVs doesn't count as a change), and only the datasets whose CSV changed are
+rebuilt (use `--force` to rebuild all of them).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import instrument
+import profiling
+from debase_data.cache import DATASETS, DEFAULT_DATASETS_DIR, file_hash, load_dataset
+
+# dataset -> CSV column the charts plot
+SERIES = {
+    "daily_cpi": "CPI",
+    "gold": "Close",
+    "silver": "Close",
+    "bitcoin": "Close",
+    "ethereum": "Close",
+    "monero": "Close",
+}
+RESOLUTIONS = (500, 2000, 8000)
+OUTPUT_DIR_NAME = "lod"
+MANIFEST_NAME = "manifest.json"
+DTYPE = "<f4"  # little-endian float32
+LOD_VERSION = 1
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Indices of the `n_out` points LTTB keeps (all of them when the series is not longer).
+    """
+    import numpy as np
+
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    # The n - 2 inner points split into n_out - 2 buckets: bucket k is [edges[k], edges[k + 1]).
+    edges = (np.arange(n_out - 1) * (n - 2) // (n_out - 2) + 1).astype(np.int64)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[: n - 1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[: n - 1], edges[:-1]) / counts
+    # The third corner of bucket k's triangles: the average of bucket k + 1 (the last point for the last bucket).
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    # Pad the buckets into rows of equal width by repeating their last point (argmax keeps the first).
+    width = int(counts.max())
+    cols = np.minimum(edges[:-1, None] + np.arange(width), edges[1:, None] - 1)
+    bx, by = x[cols], y[cols]
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for k in range(n_out - 2):
+        ax, ay = x[a], y[a]
+        # Twice the triangle area (a, candidate, next average), without the constant factor.
+        area = np.abs((ax - next_x[k]) * (by[k] - ay) - (ax - bx[k]) * (next_y[k] - ay))
+        a = int(cols[k, area.argmax()])
+        out[k + 1] = a
+    return out
+
+
+def envelope(x: np.ndarray, y: np.ndarray, n_out: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (first x, min y, max y) of `n_out` equal-count buckets (one per point for short series).
+    """
+    import numpy as np
+
+    n = len(x)
+    starts = np.arange(n) if n_out >= n else np.arange(n_out) * n // n_out
+    return x[starts], np.minimum.reduceat(y, starts), np.maximum.reduceat(y, starts)
+
+
+def load_series(csv_path: Path, dataset: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (epoch days, values) as float64, one row per date (the last one wins), NaN rows dropped.
+    """
+    import numpy as np
+
+    data = load_dataset(csv_path, DATASETS[dataset])
+    days = np.asarray(data.dates, dtype=np.float64)
+    values = np.asarray(data.column(SERIES[dataset]), dtype=np.float64)
+    keep = np.append(days[1:] != days[:-1], True) & ~np.isnan(values)
+    return days[keep], values[keep]
+
+
+def build_lod(x: np.ndarray, y: np.ndarray, dataset: str, resolutions=RESOLUTIONS) -> dict[str, np.ndarray]:
+    """
+    {file name: float32 matrix} for one series.
+    """
+    import numpy as np
+
+    arrays = {}
+    for n_out in resolutions:
+        picked = lttb(x, y, n_out)
+        arrays[f"{dataset}_lttb_{n_out}.f32"] = np.vstack([x[picked], y[picked]]).astype(DTYPE)
+        arrays[f"{dataset}_envelope_{n_out}.f32"] = np.vstack(envelope(x, y, n_out)).astype(DTYPE)
+    return arrays
+
+
+def _is_current(entry: dict | None, sha: str, output_dir: Path) -> bool:
+    """True when the entry was built from a CSV with this content hash and its files exist."""
+    if not entry or entry.get("source", {}).get("sha") != sha:
+        return False
+    return all((output_dir / f).exists() for f in entry.get("files", {}).values())
+
+
+def _read_manifest(output_dir: Path) -> dict | None:
+    try:
+        manifest = json.loads((output_dir / MANIFEST_NAME).read_text())
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != LOD_VERSION or manifest.get("resolutions") != list(RESOLUTIONS):
+        return None
+    return manifest
+
+
+def write_arrays(output_dir: Path, arrays: dict[str, np.ndarray]) -> int:
+    """Write the matrices (each through a temp file + rename). Returns bytes written."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    total = 0
+    for file_name, matrix in arrays.items():
+        tmp = output_dir / f".{file_name}.tmp"
+        matrix.astype(DTYPE, copy=False).tofile(tmp)
+        tmp.replace(output_dir / file_name)
+        total += matrix.nbytes
+    return total
+
+
+def run(
+    datasets_dir: Path = DEFAULT_DATASETS_DIR,
+    output_dir: Path | None = None,
+    force: bool = False,
+) -> bool:
+    """
+    Rebuild the LOD series of every dataset whose CSV changed. Returns True when any was written.
+    """
+    output_dir = output_dir or datasets_dir / OUTPUT_DIR_NAME
+    old = None if force else _read_manifest(output_dir)
+    manifest = {
+        "version": LOD_VERSION,
+        "dtype": "float32-le",
+        "resolutions": list(RESOLUTIONS),
+        "methods": {"lttb": ["day", "value"], "envelope": ["day", "min", "max"]},
+        "datasets": {},
+    }
+
+    changed = []
+    t0 = time.perf_counter()
+    total = 0
+    for dataset in SERIES:
+        csv_path = datasets_dir / DATASETS[dataset].csv_name
+        if not csv_path.exists():
+            print(f"[lod] WARNING: {csv_path} not found, skipping {dataset}")
+            continue
+        sha = file_hash(csv_path)
+        entry = (old or {}).get("datasets", {}).get(dataset)
+        if old is not None and _is_current(entry, sha, output_dir):
+            manifest["datasets"][dataset] = entry
+            continue
+
+        with instrument.source(dataset):
+            with instrument.span("compute") as s:
+                x, y = load_series(csv_path, dataset)
+                arrays = build_lod(x, y, dataset)
+                s.add(rows=len(x))
+            with instrument.span("write") as s:
+                written = write_arrays(output_dir, arrays)
+                s.add(bytes=written)
+        total += written
+        files, points = {}, {}
+        for n_out in RESOLUTIONS:
+            for method in ("lttb", "envelope"):
+                file_name = f"{dataset}_{method}_{n_out}.f32"
+                files[f"{method}_{n_out}"] = file_name
+                points[f"{method}_{n_out}"] = arrays[file_name].shape[1]
+        manifest["datasets"][dataset] = {
+            "column": SERIES[dataset],
+            "rows": len(x),
+            "first_day": int(x[0]) if len(x) else None,
+            "last_day": int(x[-1]) if len(x) else None,
+            "points": points,
+            "files": files,
+            "source": {"csv": csv_path.name, "sha": sha},
+        }
+        changed.append(dataset)
+        print(f"[lod] {dataset:9s} {len(x):6d} rows -> {', '.join(str(points[f'lttb_{n}']) for n in RESOLUTIONS)} points")
+
+    if not changed:
+        print(f"[lod] up to date ({output_dir})")
+        return False
+    # The manifest goes last, so a reader never sees it pointing at missing files.
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tmp = output_dir / f".{MANIFEST_NAME}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=1))
+    tmp.replace(output_dir / MANIFEST_NAME)
+    print(
+        f"[lod] rebuilt {len(changed)} of {len(SERIES)} datasets in {output_dir} "
+        f"({total / 1024:.0f} KiB) in {time.perf_counter() - t0:.2f}s"
+    )
+    return True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build downsampled (LTTB / min-max envelope) chart series.")
+    parser.add_argument("--datasets-dir", default=str(DEFAULT_DATASETS_DIR), help="Directory with the dataset CSVs")
+    parser.add_argument("--output-dir", default=None, help=f"Output directory (default: <datasets-dir>/{OUTPUT_DIR_NAME})")
+    parser.add_argument("--force", action="store_true", help="Rebuild every dataset, changed or not.")
+    profiling.add_profile_args(parser)
+    args = parser.parse_args()
+    profiling.start(args, "build_lod")
+
+    run(
+        datasets_dir=Path(args.datasets_dir),
+        output_dir=None if args.output_dir is None else Path(args.output_dir),
+        force=args.force,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
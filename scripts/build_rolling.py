@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Precompute "bought on day X, held for N" return and CAGR matrices for the comparison charts.
+
+For each asset (BTC, ETH, XMR, gold, silver) and denomination (`usd`, `real_usd`, `gold_oz`,
+as produced by `build_adjusted.py`; gold has no `gold_oz`), prices are put on a dense daily
+calendar (gaps such as metal weekends forward-filled for up to `MAX_GAP_DAYS`) and, for every
+start day and every horizon:
+
+    return[h, i] = price[i + h] / price[i] - 1
+    cagr[h, i]   = (1 + return[h, i]) ** (365 / h) - 1
+
+Both are computed from one strided `sliding_window_view` over the NaN-padded price array (no
+per-start loop, no n x max_horizon copy) and stored as little-endian float32, NaN where the
+holding period runs past the data:
+
+    datasets/rolling/manifest.json
+    datasets/rolling/<asset>_<denomination>_<return|cagr>.f32   # shape (n_horizons, n_days)
+
+Row `h` of a matrix is horizon `manifest["horizons"][h]`; column `i` is `start + i` days.
+The browser can read a file straight into a `Float32Array`. The manifest records the content
+hash of every input CSV under `sources`, and the matrices are only rebuilt when one of them
+changed (use `--force` to rebuild anyway), as in `build_adjusted.py` and `build_lod.py`.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import build_adjusted
+import instrument
+import profiling
+from debase_data.cache import DEFAULT_DATASETS_DIR
+
+ASSETS = ["bitcoin", "ethereum", "monero", "gold", "silver"]
+DENOMINATIONS = ("usd", "real_usd", "gold_oz")
+HORIZONS = {"3m": 91, "6m": 182, "1y": 365, "2y": 730, "3y": 1095, "4y": 1461, "5y": 1826, "10y": 3652}
+MAX_GAP_DAYS = 7
+OUTPUT_DIR_NAME = "rolling"
+MANIFEST_NAME = "manifest.json"
+DTYPE = "<f4"  # little-endian float32
+
+
+def dense_daily(index: pd.DatetimeIndex, values: np.ndarray, max_gap: int = MAX_GAP_DAYS) -> tuple[int, np.ndarray]:
+    """
+    Returns (first epoch day, float64 array with one value per calendar day). Missing days take
+    the previous value if it is at most `max_gap` days old, else NaN.
+    """
+    import numpy as np
+
+    days = np.asarray(index, dtype="datetime64[D]").astype(np.int64)
+    first = int(days[0])
+    calendar = np.arange(first, int(days[-1]) + 1)
+    pos = np.searchsorted(days, calendar, side="right") - 1
+    out = values[pos].astype(np.float64)
+    out[calendar - days[pos] > max_gap] = np.nan
+    return first, out
+
+
+def rolling_returns(prices: np.ndarray, horizons: list[int]) -> np.ndarray:
+    """
+    (n_horizons, n) float32 matrix of `prices[i + h] / prices[i] - 1` (NaN past the end).
+    """
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    n = len(prices)
+    max_h = max(horizons)
+    padded = np.concatenate([prices, np.full(max_h, np.nan)])
+    # Row i of the view is padded[i : i + max_h + 1]; it is a view, nothing is copied.
+    windows = sliding_window_view(padded, max_h + 1)[:n]
+    out = np.empty((len(horizons), n), dtype=DTYPE)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for k, h in enumerate(horizons):
+            out[k] = windows[:, h] / windows[:, 0] - 1
+    return out
+
+
+def rolling_cagr(returns: np.ndarray, horizons: list[int]) -> np.ndarray:
+    import numpy as np
+
+    years = np.asarray(horizons, dtype=np.float64)[:, None] / 365
+    with np.errstate(invalid="ignore"):
+        return (np.power(1 + returns.astype(np.float64), 1 / years) - 1).astype(DTYPE)
+
+
+def build_rolling(
+    datasets_dir: Path,
+    assets: list[str] = ASSETS,
+    horizons: dict[str, int] = HORIZONS,
+) -> tuple[dict, dict[str, np.ndarray]]:
+    """
+    Returns (manifest, {file name: float32 matrix}).
+    """
+    import numpy as np
+
+    base_date, series = build_adjusted.build_adjusted(datasets_dir, assets=assets)
+    horizon_days = list(horizons.values())
+
+    manifest = {
+        "base_date": base_date.isoformat(),
+        "horizons": list(horizons),
+        "horizon_days": horizon_days,
+        "dtype": "float32-le",
+        "assets": {},
+    }
+    arrays: dict[str, np.ndarray] = {}
+    for name, df in series.items():
+        entry = {"files": {}}
+        for denom in DENOMINATIONS:
+            if name == "gold" and denom == "gold_oz":
+                continue
+            first, prices = dense_daily(df.index, df[denom].to_numpy())
+            returns = rolling_returns(prices, horizon_days)
+            cagr = rolling_cagr(returns, horizon_days)
+            entry["start"] = str(np.datetime64(first, "D"))
+            entry["days"] = len(prices)
+            for metric, matrix in (("return", returns), ("cagr", cagr)):
+                file_name = f"{name}_{denom}_{metric}.f32"
+                arrays[file_name] = matrix
+                entry["files"].setdefault(denom, {})[metric] = file_name
+        manifest["assets"][name] = entry
+    return manifest, arrays
+
+
+def write_rolling(output_dir: Path, manifest: dict, arrays: dict[str, np.ndarray]) -> int:
+    """
+    Write the matrices, then the manifest (last, so a reader never sees a manifest pointing at
+    missing files). Returns bytes written.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    total = 0
+    for file_name, matrix in arrays.items():
+        tmp = output_dir / f".{file_name}.tmp"
+        matrix.astype(DTYPE, copy=False).tofile(tmp)
+        tmp.replace(output_dir / file_name)
+        total += matrix.nbytes
+    tmp = output_dir / f".{MANIFEST_NAME}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=1))
+    tmp.replace(output_dir / MANIFEST_NAME)
+    return total
+
+
+def _is_current(output_dir: Path, sources: dict[str, str]) -> bool:
+    """True when the manifest was built from inputs with these content hashes and its files exist."""
+    try:
+        manifest = json.loads((output_dir / MANIFEST_NAME).read_text())
+    except (OSError, ValueError):
+        return False
+    if manifest.get("sources") != sources:
+        return False
+    files = [f for entry in manifest.get("assets", {}).values() for m in entry["files"].values() for f in m.values()]
+    return all((output_dir / f).exists() for f in files)
+
+
+def load_matrix(output_dir: Path, asset: str, denomination: str = "usd", metric: str = "return") -> np.ndarray:
+    """Read one matrix back as (n_horizons, n_days) float32 (memory-mapped)."""
+    import numpy as np
+
+    manifest = json.loads((output_dir / MANIFEST_NAME).read_text())
+    entry = manifest["assets"][asset]
+    path = output_dir / entry["files"][denomination][metric]
+    return np.memmap(path, dtype=DTYPE, mode="r", shape=(len(manifest["horizons"]), entry["days"]))
+
+
+def run(
+    datasets_dir: Path = DEFAULT_DATASETS_DIR,
+    output_dir: Path | None = None,
+    force: bool = False,
+) -> bool:
+    """
+    Rebuild the rolling matrices if any input changed. Returns True when they were written.
+    """
+    output_dir = output_dir or datasets_dir / OUTPUT_DIR_NAME
+    sources = build_adjusted._input_hashes(build_adjusted._input_paths(datasets_dir, ASSETS))
+    if not force and _is_current(output_dir, sources):
+        print(f"[rolling] up to date ({output_dir})")
+        return False
+
+    t0 = time.perf_counter()
+    with instrument.span("compute"):
+        manifest, arrays = build_rolling(datasets_dir)
+    manifest["sources"] = sources
+    elapsed = time.perf_counter() - t0
+
+    with instrument.span("write"):
+        total = write_rolling(output_dir, manifest, arrays)
+    for name, entry in manifest["assets"].items():
+        size = sum(arrays[f].nbytes for metrics in entry["files"].values() for f in metrics.values())
+        print(f"[rolling] {name:9s} {entry['days']:6d} days x {len(HORIZONS)} horizons, {size / 1024:6.0f} KiB")
+    print(
+        f"[rolling] wrote {len(arrays)} matrices to {output_dir} ({total / 1024 / 1024:.1f} MiB) "
+        f"in {elapsed:.2f}s"
+    )
+    return True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build rolling-horizon return/CAGR matrices.")
+    parser.add_argument("--datasets-dir", default=str(DEFAULT_DATASETS_DIR), help="Directory with the dataset CSVs")
+    parser.add_argument("--output-dir", default=None, help=f"Output directory (default: <datasets-dir>/{OUTPUT_DIR_NAME})")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if no input changed.")
+    profiling.add_profile_args(parser)
+    args = parser.parse_args()
+    profiling.start(args, "build_rolling")
+
+    run(
+        datasets_dir=Path(args.datasets_dir),
+        output_dir=None if args.output_dir is None else Path(args.output_dir),
+        force=args.force,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,225 @@
+"""
+Small CSV helpers shared by the dataset updaters (standard library only).
+
+- `read_max_date`: find the newest date in a date column by reading only the first and last
+  few KB of the file (with a seek), falling back to a full scan when the file isn't sorted.
+- `read_dates`: every date in a column (full scan), e.g. to find gaps without loading pandas.
+- `can_append` / `append_text`: append new rows in place (fsync'd) when they strictly follow
+  an ascending file, so daily updates cost O(new rows) instead of rewriting the history.
+- `atomic_write`: full rewrites go to a temp file in the same directory and are renamed over
+  the original, so readers never see a half-written CSV.
+"""
+from __future__ import annotations
+
+import csv
+import os
+import tempfile
+from datetime import date
+from pathlib import Path
+from typing import Callable, TextIO
+
+BLOCK_SIZE = 8192
+
+
+def _parse_date(value: str) -> date | None:
+    try:
+        return date.fromisoformat(value.strip()[:10])
+    except ValueError:
+        return None
+
+
+def _column_dates(lines: list[str], col: int, delimiter: str) -> list[date]:
+    out = []
+    for row in csv.reader(lines, delimiter=delimiter):
+        if len(row) > col:
+            d = _parse_date(row[col])
+            if d is not None:
+                out.append(d)
+    return out
+
+
+def _is_sorted(values: list[date], reverse: bool = False) -> bool:
+    if reverse:
+        return all(a >= b for a, b in zip(values, values[1:]))
+    return all(a <= b for a, b in zip(values, values[1:]))
+
+
+def read_header(csv_path: Path, delimiter: str = ",") -> list[str]:
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f, delimiter=delimiter), [])
+
+
+def _direction(head: list[date], tail: list[date]) -> str | None:
+    # Both edge blocks must be monotonic in the same direction and line up with each other.
+    if not head or not tail:
+        return None
+    if _is_sorted(head) and _is_sorted(tail) and head[-1] <= tail[0]:
+        return "asc"
+    if _is_sorted(head, reverse=True) and _is_sorted(tail, reverse=True) and head[-1] >= tail[0]:
+        return "desc"
+    return None
+
+
+def sort_direction(csv_path: Path, column: str, delimiter: str = ",", block_size: int = BLOCK_SIZE) -> str | None:
+    """
+    Guess the file's sort order on `column` from its first and last blocks: "asc", "desc",
+    or None (unsorted/unknown). The middle of the file is not read.
+    """
+    return _direction(*_edge_dates(csv_path, column, delimiter, block_size))
+
+
+def _edge_dates(csv_path: Path, column: str, delimiter: str, block_size: int) -> tuple[list[date], list[date]]:
+    """
+    Dates of `column` in the first and last `block_size` bytes (complete lines only).
+    Small files (the two blocks would overlap) are read whole: `head` then holds every date
+    and `tail` just the last one.
+    """
+    header = read_header(csv_path, delimiter)
+    if column not in header:
+        raise ValueError(f"{csv_path} has no {column!r} column")
+    col = header.index(column)
+
+    size = csv_path.stat().st_size
+    with open(csv_path, "rb") as f:
+        if size <= 2 * block_size:
+            lines = f.read().decode("utf-8").splitlines()[1:]
+            dates = _column_dates(lines, col, delimiter)
+            return dates, dates[-1:]
+
+        head_raw = f.read(block_size)
+        f.seek(size - block_size)
+        tail_raw = f.read()
+
+    # Drop the header and the partial line at each cut.
+    head_lines = head_raw.decode("utf-8", errors="ignore").splitlines()[1:-1]
+    tail_lines = tail_raw.decode("utf-8", errors="ignore").splitlines()[1:]
+    return _column_dates(head_lines, col, delimiter), _column_dates(tail_lines, col, delimiter)
+
+
+def _scan_max_date(csv_path: Path, column: str, delimiter: str) -> date | None:
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, [])
+        col = header.index(column)
+        values = [row[col].strip()[:10] for row in reader if len(row) > col]
+
+    # ISO dates sort as strings, so only the winner needs parsing.
+    candidates = sorted((v for v in values if len(v) == 10 and v[4] == "-" and v[7] == "-"), reverse=True)
+    for v in candidates:
+        d = _parse_date(v)
+        if d is not None:
+            return d
+    return None
+
+
+def read_dates(csv_path: Path, column: str, delimiter: str = ",") -> list[date]:
+    """Every parseable date in `column`, in file order (a full scan)."""
+    header = read_header(csv_path, delimiter)
+    if column not in header:
+        raise ValueError(f"{csv_path} has no {column!r} column")
+    col = header.index(column)
+
+    values = []
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        next(f)
+        for line in f:
+            # Plain rows are split directly (several times faster than csv.reader); only lines
+            # with quoting go through the csv module.
+            if '"' in line:
+                row = next(csv.reader([line], delimiter=delimiter))
+            else:
+                row = line.split(delimiter, col + 1)
+            if len(row) > col:
+                values.append(row[col])
+    return [d for d in map(_parse_date, values) if d is not None]
+
+
+def read_max_date(
+    csv_path: Path,
+    column: str,
+    delimiter: str = ",",
+    block_size: int = BLOCK_SIZE,
+) -> date | None:
+    """
+    Newest date in `column`, reading only the edges of the file when it is sorted.
+
+    Ascending files: the max is the last row (tail block). Descending (newest-first) files:
+    the max is the first row (head block). Anything else falls back to a full scan.
+    """
+    if not csv_path.exists() or csv_path.stat().st_size == 0:
+        return None
+
+    head, tail = _edge_dates(csv_path, column, delimiter, block_size)
+    direction = _direction(head, tail)
+    if direction == "asc":
+        return tail[-1]
+    if direction == "desc":
+        return head[0]
+    if not head and not tail and csv_path.stat().st_size <= 2 * block_size:
+        return None
+
+    return _scan_max_date(csv_path, column, delimiter)
+
+
+def can_append(
+    csv_path: Path,
+    column: str,
+    header: list[str],
+    new_dates: list[date],
+    delimiter: str = ",",
+) -> bool:
+    """
+    True when `new_dates` can simply be appended: the file exists with exactly `header`, is
+    sorted ascending on `column`, and the new dates are strictly increasing and all after the
+    file's last date. Anything else (overlap, out-of-order, schema drift) needs a full merge.
+    """
+    if not new_dates or not csv_path.exists() or csv_path.stat().st_size == 0:
+        return False
+    if read_header(csv_path, delimiter) != header:
+        return False
+    if any(a >= b for a, b in zip(new_dates, new_dates[1:])):
+        return False
+
+    head, tail = _edge_dates(csv_path, column, delimiter, BLOCK_SIZE)
+    if _direction(head, tail) != "asc":
+        return False
+    return new_dates[0] > tail[-1]
+
+
+def append_text(csv_path: Path, text: str) -> None:
+    """
+    Append already-formatted CSV rows and fsync, so a crash can't leave the rows half-written
+    in the page cache.
+    """
+    needs_newline = False
+    if csv_path.stat().st_size > 0:
+        with open(csv_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+
+    with open(csv_path, "a", encoding="utf-8", newline="") as f:
+        if needs_newline:
+            f.write("\n")
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def atomic_write(csv_path: Path, write: Callable[[TextIO], None]) -> None:
+    """
+    Call `write(f)` on a temp file next to `csv_path`, fsync it and atomically rename it into
+    place. On any error the original file is left untouched.
+    """
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{csv_path.name}.", suffix=".tmp", dir=csv_path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        if csv_path.exists():
+            os.chmod(tmp_name, csv_path.stat().st_mode & 0o777)
+        os.replace(tmp_name, csv_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
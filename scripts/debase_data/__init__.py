@@ -0,0 +1,39 @@
+"""
+Shared dataset access for the analysis scripts and updaters.
+
+All loaders return a DataFrame indexed by `date` with lowercase column names; see `loaders`.
+The names below are imported on first use, so `import debase_data.cache` (what the updaters
+need) doesn't pull in pandas.
+"""
+from importlib import import_module
+
+# name -> submodule that defines it
+_EXPORTS = {
+    "CpiIndex": ".cpi",
+    "DEFAULT_DATASETS_DIR": ".cache",
+    "PriceLookup": ".lookup",
+    "clear_cache": ".loaders",
+    "load": ".loaders",
+    "load_bitcoin": ".loaders",
+    "load_cpi_monthly": ".loaders",
+    "load_daily_cpi": ".loaders",
+    "load_ethereum": ".loaders",
+    "load_gold": ".loaders",
+    "load_m2": ".loaders",
+    "load_monero": ".loaders",
+    "load_silver": ".loaders",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_EXPORTS])
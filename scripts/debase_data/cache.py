@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Columnar binary cache for the date-indexed CSV datasets.
+
+Each dataset gets a directory `datasets/.cache/<name>/` next to its CSV with:
+- `dates.npy`: int64 days since 1970-01-01 (sorted ascending)
+- `values.npy`: float64 array shaped (n_columns, n_rows), so every column is contiguous
+- `meta.json`: column names plus the source CSV's size, mtime and BLAKE2 content hash
+
+`load_dataset()` memory-maps the arrays when the cache matches the CSV and rebuilds it
+otherwise (size/mtime are checked first; the hash only when they changed). The updaters call
+`refresh_cache()` after writing a CSV so the cache is ready for the next reader.
+
+Build every cache by hand (from repo root):
+
+    python3 scripts/debase_data/cache.py
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+DEFAULT_DATASETS_DIR = Path(__file__).resolve().parents[2] / "datasets"
+CACHE_DIR_NAME = ".cache"
+CACHE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    name: str
+    csv_name: str
+    date_column: str
+    columns: tuple[str, ...]
+    sep: str = ","
+
+
+CRYPTO_COLUMNS = ("Open", "High", "Low", "Close", "Volume", "Market Cap")
+METAL_COLUMNS = ("Close", "High", "Low", "Open", "Volume")
+
+DATASETS: dict[str, DatasetSpec] = {
+    spec.name: spec
+    for spec in [
+        DatasetSpec("bitcoin", "bitcoin_2010-07-17_2025-07-25.csv", "Start", CRYPTO_COLUMNS),
+        DatasetSpec("ethereum", "ethereum_2015-08-07_2025-07-25.csv", "Start", CRYPTO_COLUMNS),
+        DatasetSpec("monero", "monero_2014-05-21_2025-07-25.csv", "Start", CRYPTO_COLUMNS),
+        DatasetSpec("gold", "gold.csv", "Price", METAL_COLUMNS),
+        DatasetSpec("silver", "silver.csv", "Price", METAL_COLUMNS),
+        DatasetSpec("daily_cpi", "daily_cpi_inflation.csv", "timestamp", ("CPI", "daily_multiplicator"), sep=";"),
+        DatasetSpec("m2", "M2SL.csv", "observation_date", ("M2SL",)),
+    ]
+}
+
+
+@dataclass(frozen=True)
+class CachedDataset:
+    name: str
+    dates: np.ndarray  # int64 epoch days
+    values: np.ndarray  # float64, shape (n_columns, n_rows)
+    columns: tuple[str, ...]
+
+    def column(self, name: str) -> np.ndarray:
+        return self.values[self.columns.index(name)]
+
+    def to_frame(self) -> pd.DataFrame:
+        import pandas as pd
+
+        index = pd.DatetimeIndex(self.dates.astype("datetime64[D]").astype("datetime64[ns]"), name="date")
+        return pd.DataFrame({c: self.values[i] for i, c in enumerate(self.columns)}, index=index)
+
+
+def spec_for_csv(csv_path: Path) -> DatasetSpec | None:
+    for spec in DATASETS.values():
+        if spec.csv_name == csv_path.name:
+            return spec
+    return None
+
+
+def cache_dir(csv_path: Path, spec: DatasetSpec) -> Path:
+    # Resolved, so a CSV reached through a symlink (scripts/datasets/ in the Docker image) shares
+    # the cache next to the real file.
+    return Path(csv_path).resolve().parent / CACHE_DIR_NAME / spec.name
+
+
+def file_hash(path: Path) -> str:
+    """Content hash of a file (blake2b-128, hex), as stored in the cache metadata."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _read_meta(directory: Path) -> dict | None:
+    try:
+        return json.loads((directory / "meta.json").read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def is_fresh(csv_path: Path, spec: DatasetSpec) -> bool:
+    """
+    True when the cache matches the CSV. A size/mtime match is trusted; otherwise the content
+    hash decides (and the stat info is refreshed so the next check is cheap again).
+    """
+    directory = cache_dir(csv_path, spec)
+    meta = _read_meta(directory)
+    if not meta or meta.get("version") != CACHE_VERSION or tuple(meta.get("columns", ())) != spec.columns:
+        return False
+    if not (directory / "dates.npy").exists() or not (directory / "values.npy").exists():
+        return False
+
+    st = csv_path.stat()
+    if meta.get("size") == st.st_size and meta.get("mtime_ns") == st.st_mtime_ns:
+        return True
+    if meta.get("sha") != file_hash(csv_path):
+        return False
+
+    meta.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+    _write_json(directory / "meta.json", meta)
+    return True
+
+
+def _write_json(path: Path, data: dict) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, indent=2))
+    os.replace(tmp, path)
+
+
+def _save_npy(path: Path, array: np.ndarray) -> None:
+    import numpy as np
+
+    tmp = path.with_name(path.stem + ".tmp.npy")
+    np.save(tmp, array)
+    os.replace(tmp, path)
+
+
+def build_cache(csv_path: Path, spec: DatasetSpec) -> CachedDataset:
+    """
+    Parse the CSV once and write the cache. Rows with an unparseable date are skipped and the
+    rows are stored sorted by date.
+    """
+    import numpy as np
+    import pandas as pd
+
+    st = csv_path.stat()
+    sha = file_hash(csv_path)
+
+    df = pd.read_csv(csv_path, sep=spec.sep, usecols=[spec.date_column, *spec.columns])
+    parsed = pd.to_datetime(df[spec.date_column], errors="coerce", format="%Y-%m-%d")
+    df = df[parsed.notna()]
+    parsed = parsed[parsed.notna()]
+    order = np.argsort(parsed.to_numpy(), kind="stable")
+
+    dates = parsed.to_numpy().astype("datetime64[D]").astype(np.int64)[order]
+    values = np.empty((len(spec.columns), len(df)), dtype=np.float64)
+    for i, col in enumerate(spec.columns):
+        values[i] = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64)[order]
+
+    directory = cache_dir(csv_path, spec)
+    directory.mkdir(parents=True, exist_ok=True)
+    _save_npy(directory / "dates.npy", dates)
+    _save_npy(directory / "values.npy", values)
+    _write_json(
+        directory / "meta.json",
+        {
+            "version": CACHE_VERSION,
+            "source": csv_path.name,
+            "columns": list(spec.columns),
+            "rows": int(len(dates)),
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha": sha,
+        },
+    )
+    return CachedDataset(spec.name, dates, values, spec.columns)
+
+
+def load_dataset(csv_path: Path, spec: DatasetSpec | None = None) -> CachedDataset:
+    """
+    Load a dataset through its cache: memory-mapped when fresh, rebuilt from the CSV otherwise.
+    """
+    import numpy as np
+
+    csv_path = Path(csv_path)
+    spec = spec or spec_for_csv(csv_path)
+    if spec is None:
+        raise ValueError(f"No cache spec for {csv_path.name}")
+
+    if not is_fresh(csv_path, spec):
+        return build_cache(csv_path, spec)
+
+    directory = cache_dir(csv_path, spec)
+    dates = np.load(directory / "dates.npy", mmap_mode="r")
+    values = np.load(directory / "values.npy", mmap_mode="r")
+    return CachedDataset(spec.name, dates, values, spec.columns)
+
+
+def refresh_cache(csv_path: Path) -> None:
+    """
+    Rebuild the cache after an updater wrote `csv_path` (no-op for files without a spec).
+    Cache problems are reported but never fail an update.
+    """
+    spec = spec_for_csv(csv_path)
+    if spec is None or not csv_path.exists():
+        return
+    try:
+        if not is_fresh(csv_path, spec):
+            build_cache(csv_path, spec)
+    except Exception as e:
+        print(f"[cache] WARNING: could not refresh cache for {csv_path.name}: {e}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build/refresh the binary caches for datasets/*.csv.")
+    parser.add_argument("--datasets-dir", default="datasets", help="Directory with the CSVs (default: datasets)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even when the cache is fresh.")
+    args = parser.parse_args()
+
+    root = Path(args.datasets_dir)
+    for spec in DATASETS.values():
+        csv_path = root / spec.csv_name
+        if not csv_path.exists():
+            print(f"[cache] {spec.name}: {csv_path} not found, skipping")
+            continue
+        if not args.force and is_fresh(csv_path, spec):
+            print(f"[cache] {spec.name}: fresh")
+            continue
+        ds = build_cache(csv_path, spec)
+        print(f"[cache] {spec.name}: built {len(ds.dates)} rows -> {cache_dir(csv_path, spec)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,145 @@
+"""
+Daily CPI as a dense array, for converting nominal prices to real dollars.
+
+`CpiIndex` stores one float64 CPI value per calendar day starting at `first_day` (epoch days),
+so a lookup is a subtraction and an array offset. Dates after the last day use the last value
+(the latest CPI known), dates before the first day give NaN.
+
+    cpi = CpiIndex.load()
+    cpi.deflate(100.0, "2015-01-01")                     # 100 2015-dollars in dollars of the last CPI day
+    cpi.deflate(closes, dates, base_date="2020-01-01")   # arrays in, array out
+
+`load()` reads `daily_cpi_inflation.csv` (through the binary cache). If that file is stale (it
+ends before the newest month in `CPI_U.csv`), the daily series is rebuilt in memory from the
+monthly table with the same interpolation as `datasets/generator_cpi_daily.py`.
+"""
+from __future__ import annotations
+
+import importlib.util
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .lookup import to_days
+from .loaders import DEFAULT_DATASETS_DIR, load, load_cpi_monthly
+
+GENERATOR_NAME = "generator_cpi_daily.py"
+
+
+def _load_generator(datasets_dir: Path):
+    # The generator lives in datasets/, not on sys.path.
+    path = datasets_dir / GENERATOR_NAME
+    spec = importlib.util.spec_from_file_location("generator_cpi_daily", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class CpiIndex:
+    def __init__(self, first_day: int, cpi: np.ndarray, source: str = "daily"):
+        self.first_day = int(first_day)
+        self.cpi = np.ascontiguousarray(cpi, dtype=np.float64)
+        self.source = source
+
+    @classmethod
+    def from_days(cls, days: np.ndarray, values: np.ndarray, source: str = "daily") -> "CpiIndex":
+        """
+        Build from (epoch day, CPI) pairs; days missing in between are linearly interpolated.
+        """
+        days = np.asarray(days, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        keep = ~np.isnan(values)
+        days, values = days[keep], values[keep]
+        if not len(days):
+            raise ValueError("No CPI values")
+        order = np.argsort(days, kind="stable")
+        days, values = days[order], values[order]
+        calendar = np.arange(days[0], days[-1] + 1)
+        if len(calendar) == len(days):
+            return cls(days[0], values, source)
+        return cls(days[0], np.interp(calendar, days, values), source)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, column: str = "cpi", source: str = "daily") -> "CpiIndex":
+        days = np.asarray(df.index, dtype="datetime64[D]").astype(np.int64)
+        return cls.from_days(days, df[column].to_numpy(), source)
+
+    @classmethod
+    def from_monthly(
+        cls,
+        datasets_dir: Path | str | None = None,
+        target_end: date | None = None,
+    ) -> "CpiIndex":
+        """
+        Daily CPI interpolated from `CPI_U.csv` in memory (up to tomorrow by default).
+        """
+        root = Path(datasets_dir) if datasets_dir is not None else DEFAULT_DATASETS_DIR
+        generator = _load_generator(root)
+        daily = generator.generate_daily_cpi(pd.read_csv(root / "CPI_U.csv"), target_end)
+        days = pd.to_datetime(daily["timestamp"]).to_numpy().astype("datetime64[D]").astype(np.int64)
+        return cls.from_days(days, daily["CPI"].to_numpy(dtype=np.float64), source="monthly")
+
+    @classmethod
+    def load(cls, datasets_dir: Path | str | None = None, fallback: bool = True) -> "CpiIndex":
+        """
+        Daily CPI from `daily_cpi_inflation.csv`; with `fallback`, rebuilt from `CPI_U.csv` when
+        the daily file ends before the newest monthly CPI value.
+        """
+        index = cls.from_frame(load("daily_cpi", datasets_dir=datasets_dir))
+        if fallback and index.is_stale(datasets_dir):
+            return cls.from_monthly(datasets_dir)
+        return index
+
+    def is_stale(self, datasets_dir: Path | str | None = None) -> bool:
+        """True if `CPI_U.csv` has a month that starts after this index ends."""
+        try:
+            monthly = load_cpi_monthly(datasets_dir=datasets_dir)
+        except FileNotFoundError:
+            return False
+        if monthly.empty:
+            return False
+        newest = int(np.asarray(monthly.index[-1:], dtype="datetime64[D]").astype(np.int64)[0])
+        return newest > self.last_day
+
+    def __len__(self) -> int:
+        return len(self.cpi)
+
+    @property
+    def last_day(self) -> int:
+        return self.first_day + len(self.cpi) - 1
+
+    @property
+    def first_date(self) -> date:
+        return pd.Timestamp(self.first_day, unit="D").date()
+
+    @property
+    def last_date(self) -> date:
+        return pd.Timestamp(self.last_day, unit="D").date()
+
+    def _at_days(self, days: np.ndarray) -> np.ndarray:
+        offset = np.minimum(days - self.first_day, len(self.cpi) - 1)
+        out = self.cpi[np.clip(offset, 0, None)]
+        return np.where(offset < 0, np.nan, out)
+
+    def at(self, dates):
+        """
+        CPI on each date (str/date/Timestamp/datetime64, or an array of them, or int64 epoch
+        days). Scalar in, float out; array in, float64 array out.
+        """
+        scalar = np.ndim(dates) == 0
+        values = self._at_days(to_days(dates))
+        return float(values[0]) if scalar else values
+
+    def deflate(self, values, dates, base_date=None):
+        """
+        Express `values` observed on `dates` in dollars of `base_date` (default: the last CPI
+        day): `values * CPI(base_date) / CPI(dates)`. Scalars and arrays broadcast as in NumPy.
+        """
+        base_cpi = self.cpi[-1] if base_date is None else self.at(base_date)
+        if np.isnan(base_cpi):
+            raise ValueError(f"No CPI value on or before base date {base_date}")
+        scalar = np.ndim(values) == 0 and np.ndim(dates) == 0
+        real = np.asarray(values, dtype=np.float64) * (base_cpi / self._at_days(to_days(dates)))
+        return float(real.reshape(-1)[0]) if scalar else real
@@ -0,0 +1,128 @@
+"""
+One loader per data source, all returning the same shape:
+
+- a DataFrame indexed by `date` (datetime64[ns], ascending, one row per date)
+- lowercase float64 columns: crypto/metals `open, high, low, close, volume` (crypto also
+  `market_cap`), daily CPI `cpi, daily_multiplicator`, M2 `m2`, monthly CPI `cpi`
+
+Results are memoized per CSV path, so repeated calls in one process (e.g. once per analysis
+period) don't touch the disk again. Every call returns a fresh copy, so callers may add
+columns freely. Call `clear_cache()` after rewriting a CSV in-process.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cache import DATASETS, DEFAULT_DATASETS_DIR, load_dataset
+
+MONTH_COLS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+# CSV column -> normalized column, per source
+COLUMN_NAMES = {
+    "Open": "open",
+    "High": "high",
+    "Low": "low",
+    "Close": "close",
+    "Volume": "volume",
+    "Market Cap": "market_cap",
+    "CPI": "cpi",
+    "daily_multiplicator": "daily_multiplicator",
+    "M2SL": "m2",
+}
+
+_memo: dict[tuple[str, Path], pd.DataFrame] = {}
+
+
+def clear_cache() -> None:
+    _memo.clear()
+
+
+def _csv_path(name: str, csv_path: Path | str | None, datasets_dir: Path | str | None) -> Path:
+    if csv_path is not None:
+        return Path(csv_path).resolve()
+    root = Path(datasets_dir) if datasets_dir is not None else DEFAULT_DATASETS_DIR
+    return (root / DATASETS[name].csv_name).resolve()
+
+
+def _memoized(key: tuple[str, Path], build) -> pd.DataFrame:
+    if key not in _memo:
+        _memo[key] = build()
+    return _memo[key].copy()
+
+
+def load(name: str, csv_path: Path | str | None = None, datasets_dir: Path | str | None = None) -> pd.DataFrame:
+    """
+    Load a date-indexed dataset by name (see `debase_data.cache.DATASETS`), optionally from an
+    explicit CSV path or datasets directory.
+    """
+    if name not in DATASETS:
+        raise ValueError(f"Unknown dataset {name!r} (known: {', '.join(DATASETS)})")
+    path = _csv_path(name, csv_path, datasets_dir)
+
+    def build() -> pd.DataFrame:
+        if not path.exists():
+            raise FileNotFoundError(f"Missing dataset CSV: {path}")
+        df = load_dataset(path, DATASETS[name]).to_frame()
+        df = df.rename(columns=COLUMN_NAMES)
+        return df[~df.index.duplicated(keep="last")]
+
+    return _memoized((name, path), build)
+
+
+def load_bitcoin(csv_path: Path | str | None = None, datasets_dir: Path | str | None = None) -> pd.DataFrame:
+    return load("bitcoin", csv_path, datasets_dir)
+
+
+def load_ethereum(csv_path: Path | str | None = None, datasets_dir: Path | str | None = None) -> pd.DataFrame:
+    return load("ethereum", csv_path, datasets_dir)
+
+
+def load_monero(csv_path: Path | str | None = None, datasets_dir: Path | str | None = None) -> pd.DataFrame:
+    return load("monero", csv_path, datasets_dir)
+
+
+def load_gold(csv_path: Path | str | None = None, datasets_dir: Path | str | None = None) -> pd.DataFrame:
+    return load("gold", csv_path, datasets_dir)
+
+
+def load_silver(csv_path: Path | str | None = None, datasets_dir: Path | str | None = None) -> pd.DataFrame:
+    return load("silver", csv_path, datasets_dir)
+
+
+def load_daily_cpi(csv_path: Path | str | None = None, datasets_dir: Path | str | None = None) -> pd.DataFrame:
+    return load("daily_cpi", csv_path, datasets_dir)
+
+
+def load_m2(csv_path: Path | str | None = None, datasets_dir: Path | str | None = None) -> pd.DataFrame:
+    return load("m2", csv_path, datasets_dir)
+
+
+def load_cpi_monthly(csv_path: Path | str | None = None, datasets_dir: Path | str | None = None) -> pd.DataFrame:
+    """
+    Monthly CPI from the wide `CPI_U.csv` table (Year x Jan..Dec), as one row per month start.
+    Blank or placeholder cells ("-") are dropped.
+    """
+    if csv_path is None:
+        root = Path(datasets_dir) if datasets_dir is not None else DEFAULT_DATASETS_DIR
+        csv_path = root / "CPI_U.csv"
+    path = Path(csv_path).resolve()
+
+    def build() -> pd.DataFrame:
+        if not path.exists():
+            raise FileNotFoundError(f"Missing dataset CSV: {path}")
+        table = pd.read_csv(path, dtype=str, keep_default_na=False)
+        years = pd.to_numeric(table["Year"], errors="coerce")
+        table = table[years.notna()]
+        values = table.reindex(columns=MONTH_COLS).apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+
+        months = (np.repeat(years.dropna().astype(int).to_numpy(), 12) - 1970) * 12 + np.tile(np.arange(12), len(table))
+        flat = values.ravel()
+        keep = ~np.isnan(flat)
+        index = pd.DatetimeIndex(months[keep].astype("datetime64[M]").astype("datetime64[ns]"), name="date")
+        df = pd.DataFrame({"cpi": flat[keep]}, index=index).sort_index()
+        return df[~df.index.duplicated(keep="last")]
+
+    return _memoized(("cpi_monthly", path), build)
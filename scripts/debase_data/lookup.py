@@ -0,0 +1,148 @@
+"""
+Date -> value lookups on a sorted day index.
+
+`PriceLookup` keeps one column as two NumPy arrays (int64 days since 1970-01-01, float64
+values) and answers exact / nearest-before / nearest-after / closest queries with
+`np.searchsorted`, for one date or a whole array of dates at once. Build it once per dataset
+and share it instead of filtering a DataFrame per query.
+
+    eth = PriceLookup.from_dataset("ethereum")
+    eth.price("2025-01-01")                                   # exact day, or None
+    eth.before(["2025-01-31", "2025-02-28"], max_days=7)      # array, NaN when not found
+"""
+from __future__ import annotations
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from .loaders import load
+
+_FAR = np.iinfo(np.int64).max
+
+
+def to_days(dates) -> np.ndarray:
+    """
+    Dates (one str/date/Timestamp/datetime64 or a sequence of them) as int64 days since
+    1970-01-01. Times of day are truncated. Integer arrays are taken as epoch days already.
+    """
+    if isinstance(dates, np.ndarray):
+        if dates.dtype.kind in "iu":
+            return dates.astype(np.int64, copy=False)
+        if dates.dtype.kind == "M":
+            return dates.astype("datetime64[D]").astype(np.int64)
+    if isinstance(dates, (str, date, np.datetime64)):
+        dates = [dates]
+    return np.asarray(pd.to_datetime(dates), dtype="datetime64[D]").astype(np.int64)
+
+
+class PriceLookup:
+    def __init__(self, days: np.ndarray, values: np.ndarray):
+        days = np.asarray(days, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        if days.shape != values.shape:
+            raise ValueError("days and values must have the same length")
+        keep = ~np.isnan(values)
+        order = np.argsort(days[keep], kind="stable")
+        self.days = days[keep][order]
+        self.values = values[keep][order]
+
+    @classmethod
+    def from_series(cls, series: pd.Series) -> "PriceLookup":
+        index = pd.DatetimeIndex(series.index)
+        return cls(np.asarray(index, dtype="datetime64[D]").astype(np.int64), series.to_numpy())
+
+    @classmethod
+    def from_dataset(
+        cls,
+        name: str,
+        column: str = "close",
+        csv_path=None,
+        datasets_dir=None,
+    ) -> "PriceLookup":
+        return cls.from_series(load(name, csv_path, datasets_dir)[column])
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @property
+    def first_date(self) -> date | None:
+        return None if not len(self) else pd.Timestamp(self.days[0], unit="D").date()
+
+    @property
+    def last_date(self) -> date | None:
+        return None if not len(self) else pd.Timestamp(self.days[-1], unit="D").date()
+
+    def _take(self, pos: np.ndarray, ok: np.ndarray) -> np.ndarray:
+        out = np.full(len(pos), np.nan)
+        out[ok] = self.values[pos[ok]]
+        return out
+
+    # Positions of the candidate rows, their distance in days (_FAR when there is none) and
+    # whether they are within `max_days`.
+    def _before_pos(self, query: np.ndarray, max_days: int | None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        pos = np.searchsorted(self.days, query, side="right") - 1
+        found = pos >= 0
+        dist = np.where(found, query - self.days[np.clip(pos, 0, None)] if len(self) else 0, _FAR)
+        return pos, dist, found & (dist <= (_FAR if max_days is None else max_days))
+
+    def _after_pos(self, query: np.ndarray, max_days: int | None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        pos = np.searchsorted(self.days, query, side="left")
+        found = pos < len(self.days)
+        dist = np.where(found, self.days[np.clip(pos, None, len(self.days) - 1)] - query if len(self) else 0, _FAR)
+        return pos, dist, found & (dist <= (_FAR if max_days is None else max_days))
+
+    def at(self, dates) -> np.ndarray:
+        """Values on exactly these days (NaN where the day has no row)."""
+        pos, _, ok = self._after_pos(to_days(dates), max_days=0)
+        return self._take(pos, ok)
+
+    def before(self, dates, max_days: int | None = None) -> np.ndarray:
+        """Value of the last row on or before each day, at most `max_days` earlier (NaN if none)."""
+        pos, _, ok = self._before_pos(to_days(dates), max_days)
+        return self._take(pos, ok)
+
+    def after(self, dates, max_days: int | None = None) -> np.ndarray:
+        """Value of the first row on or after each day, at most `max_days` later (NaN if none)."""
+        pos, _, ok = self._after_pos(to_days(dates), max_days)
+        return self._take(pos, ok)
+
+    def closest(self, dates, max_days: int | None = None) -> np.ndarray:
+        """Value of the nearest row to each day (ties go to the earlier row)."""
+        query = to_days(dates)
+        b_pos, b_dist, b_ok = self._before_pos(query, max_days)
+        a_pos, a_dist, a_ok = self._after_pos(query, max_days)
+        use_before = b_ok & ((b_dist <= a_dist) | ~a_ok)
+        out = self._take(a_pos, a_ok & ~use_before)
+        out[use_before] = self.values[b_pos[use_before]]
+        return out
+
+    def nearest(self, dates, max_days: int = 7) -> np.ndarray:
+        """
+        Before-then-after fallback: the row on or up to `max_days` before each day, otherwise the
+        first row up to `max_days` after it.
+        """
+        query = to_days(dates)
+        pos, _, ok = self._before_pos(query, max_days)
+        out = self._take(pos, ok)
+        missing = np.isnan(out)
+        if missing.any():
+            pos, _, ok = self._after_pos(query[missing], max_days)
+            out[missing] = self._take(pos, ok)
+        return out
+
+    def price(self, day, how: str = "exact", max_days: int | None = None) -> float | None:
+        """
+        Scalar convenience wrapper: `how` is one of "exact", "before", "after", "closest",
+        "nearest". Returns None when nothing matches.
+        """
+        if how == "exact":
+            value = self.at([day])[0]
+        elif how == "nearest":
+            value = self.nearest([day], max_days=7 if max_days is None else max_days)[0]
+        elif how in ("before", "after", "closest"):
+            value = getattr(self, how)([day], max_days=max_days)[0]
+        else:
+            raise ValueError(f"Unknown lookup {how!r}")
+        return None if np.isnan(value) else float(value)
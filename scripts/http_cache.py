@@ -0,0 +1,249 @@
+"""
+On-disk HTTP response cache for the dataset updaters.
+
+`CachingSession` is a drop-in `requests.Session`: every request is keyed by method + URL +
+query params + body, and a stored response is reused while it is younger than the TTL of its
+host (`DEFAULT_TTLS`). Once it is older, the request is revalidated with `If-None-Match` /
+`If-Modified-Since` when the server sent an ETag / Last-Modified; a 304 refreshes the entry
+without downloading the body again. Only 2xx responses are stored.
+
+Clients that don't go through `requests` (yfinance) can use `HttpCache.memoize()` to cache
+their result bytes under a key with a TTL.
+
+The cache directory (`datasets/.cache/http/` by default) holds `<key>.json` (metadata) and
+`<key>.body` per entry; a hit bumps the body's mtime, and when the total size exceeds
+`max_bytes` the least recently used entries are removed. With `offline=True` everything is
+served from the cache regardless of age and a miss raises `OfflineCacheMiss`, so updates can
+be replayed without network access.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / "datasets" / ".cache" / "http"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Seconds a stored response is used without asking the server again.
+DEFAULT_TTLS = {
+    "api.bls.gov": 12 * 3600,  # monthly data, revised rarely
+    "api.kraken.com": 15 * 60,  # today's daily candle keeps changing
+    "yahoo": 3600,  # yfinance downloads (memoized, see update_metals.py)
+}
+DEFAULT_TTL = 3600
+
+_STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class OfflineCacheMiss(RuntimeError):
+    pass
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+class HttpCache:
+    def __init__(
+        self,
+        directory: Path | str = DEFAULT_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        offline: bool = False,
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "stored": 0, "evicted": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(*parts: object) -> str:
+        h = hashlib.sha256()
+        for part in parts:
+            h.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+    def get(self, key: str) -> tuple[dict, bytes] | None:
+        """Stored (metadata, body) or None. Marks the entry as recently used."""
+        body_path = self.directory / f"{key}.body"
+        try:
+            meta = json.loads((self.directory / f"{key}.json").read_text())
+            body = body_path.read_bytes()
+            os.utime(body_path)
+        except (OSError, ValueError):
+            return None
+        return meta, body
+
+    def put(self, key: str, meta: dict, body: bytes) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta = {**meta, "stored_at": time.time(), "size": len(body)}
+        # Body first, so metadata never points at a missing body.
+        _atomic_write_bytes(self.directory / f"{key}.body", body)
+        _atomic_write_bytes(self.directory / f"{key}.json", json.dumps(meta).encode("utf-8"))
+        self._count("stored")
+        self.evict()
+
+    def refresh(self, key: str, meta: dict) -> None:
+        """Restart an entry's TTL (after a 304)."""
+        meta = {**meta, "stored_at": time.time()}
+        _atomic_write_bytes(self.directory / f"{key}.json", json.dumps(meta).encode("utf-8"))
+
+    def discard(self, key: str) -> None:
+        (self.directory / f"{key}.json").unlink(missing_ok=True)
+        (self.directory / f"{key}.body").unlink(missing_ok=True)
+
+    def is_fresh(self, meta: dict, ttl: float) -> bool:
+        return self.offline or time.time() - meta.get("stored_at", 0) < ttl
+
+    def evict(self) -> None:
+        """Drop least recently used entries until the cache fits in `max_bytes`."""
+        with self._lock:
+            entries = []
+            for body_path in self.directory.glob("*.body"):
+                try:
+                    st = body_path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, body_path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, body_path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                body_path.unlink(missing_ok=True)
+                body_path.with_suffix(".json").unlink(missing_ok=True)
+                total -= size
+                self.stats["evicted"] += 1
+
+    def memoize(self, key: str, ttl: float, fetch: Callable[[], bytes | None]) -> bytes | None:
+        """
+        Cached bytes for `key` while younger than `ttl`, else `fetch()` (None results are not
+        stored). Offline, a miss raises `OfflineCacheMiss`.
+        """
+        entry = self.get(key)
+        if entry is not None and self.is_fresh(entry[0], ttl):
+            self._count("hits")
+            return entry[1]
+        if self.offline:
+            raise OfflineCacheMiss(f"not in cache: {key}")
+        self._count("misses")
+        body = fetch()
+        if body is not None:
+            self.put(key, {"kind": "memoize"}, body)
+        return body
+
+    def summary(self) -> str:
+        s = self.stats
+        return (
+            f"{s['hits']} hits, {s['revalidated']} revalidated, {s['misses']} misses, "
+            f"{s['stored']} stored, {s['evicted']} evicted"
+        )
+
+
+def _cached_response(meta: dict, body: bytes, request_url: str, key: str) -> requests.Response:
+    response = requests.Response()
+    response.cache_key = key
+    response.status_code = meta.get("status", 200)
+    response.headers = CaseInsensitiveDict(meta.get("headers", {}))
+    response._content = body
+    response.url = meta.get("url", request_url)
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers) or "utf-8"
+    return response
+
+
+def _request_key_parts(params, data, json_body) -> tuple[str, bytes]:
+    # (query string, body bytes) identifying a request beyond its method and URL.
+    query = urlencode(sorted(params.items())) if isinstance(params, dict) else str(params or "")
+    if data is None and json_body is not None:
+        data = json.dumps(json_body, sort_keys=True)
+    body = data if isinstance(data, bytes) else str(data or "").encode("utf-8")
+    return query, body
+
+
+class CachingSession(requests.Session):
+    def __init__(self, cache: HttpCache, ttls: dict[str, float] | None = None):
+        super().__init__()
+        self.cache = cache
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+
+    def ttl_for(self, url: str) -> float:
+        return self.ttls.get(urlsplit(url).hostname or "", DEFAULT_TTL)
+
+    def request(self, method, url, params=None, data=None, headers=None, json=None, **kwargs):
+        key = self.cache.key(method.upper(), url, *_request_key_parts(params, data, json))
+
+        entry = self.cache.get(key)
+        if entry is not None and self.cache.is_fresh(entry[0], self.ttl_for(url)):
+            self.cache._count("hits")
+            return _cached_response(entry[0], entry[1], url, key)
+        if self.cache.offline:
+            raise OfflineCacheMiss(f"{method.upper()} {url} is not in the cache")
+
+        headers = dict(headers or {})
+        if entry is not None:
+            stored = CaseInsensitiveDict(entry[0].get("headers", {}))
+            if "ETag" in stored:
+                headers["If-None-Match"] = stored["ETag"]
+            if "Last-Modified" in stored:
+                headers["If-Modified-Since"] = stored["Last-Modified"]
+
+        response = super().request(method, url, params=params, data=data, headers=headers, json=json, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self.cache._count("revalidated")
+            self.cache.refresh(key, entry[0])
+            return _cached_response(entry[0], entry[1], url, key)
+
+        self.cache._count("misses")
+        response.cache_key = key
+        if 200 <= response.status_code < 300:
+            meta = {
+                "method": method.upper(),
+                "url": response.url,
+                "status": response.status_code,
+                "headers": {h: response.headers[h] for h in _STORED_HEADERS if h in response.headers},
+            }
+            self.cache.put(key, meta, response.content)
+        return response
+
+    def discard(self, response: requests.Response) -> None:
+        """Drop a stored response whose payload turned out to be an error (HTTP 200 + API error)."""
+        key = getattr(response, "cache_key", None)
+        if key is not None:
+            self.cache.discard(key)
+
+
+def add_cache_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--offline", action="store_true", help="Serve every request from the HTTP cache (no network).")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the HTTP response cache.")
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR), help="HTTP cache directory")
+
+
+def cache_from_args(args: argparse.Namespace) -> HttpCache | None:
+    if args.no_cache:
+        if args.offline:
+            raise SystemExit("--offline needs the cache (drop --no-cache)")
+        return None
+    return HttpCache(args.cache_dir, offline=args.offline)
+
@@ -0,0 +1,314 @@
+"""
+Retry, rate limiting and circuit breaking shared by the dataset fetchers.
+
+`RetryClient.call(host, attempt, what)` runs `attempt()` until it returns:
+- failures are retried with exponential backoff plus jitter (`RetryPolicy`)
+- `RateLimited` errors (HTTP 429/503, Kraken `EAPI:Rate limit exceeded`, ...) wait for the
+  server's `Retry-After` hint instead; a hint longer than `max_delay` gives up right away
+- `QuotaExceeded` (e.g. the BLS daily request threshold), `RequestRejected` (the API refused
+  this request, e.g. an unknown Kraken pair), `OfflineCacheMiss` and other 4xx responses are
+  not retried
+- after `failure_threshold` calls in a row fail for a host, its circuit opens for `cooldown`
+  seconds and further calls fail immediately with `CircuitOpen`, so one dead API doesn't
+  stall the sources queued behind it. Only failures that say the host is in trouble count
+  (5xx, 429 / `RateLimited`, transport errors, retries exhausted on anything else); a bad
+  request (other 4xx, `RequestRejected`) fails on its own without blocking the host
+
+Requests are also rate limited per host by a token bucket (`HostPolicy.rate`/`burst`). Sessions
+from `make_session()` throttle in their transport adapter, so responses served from the HTTP
+cache don't spend tokens; non-requests clients (yfinance) call `throttle(host)` themselves.
+
+Every host keeps counters (calls, attempts, retries, failures, short circuits, seconds spent in
+backoff and throttling); `summary()` formats them for the end-of-run report.
+"""
+from __future__ import annotations
+
+import email.utils
+import random
+import threading
+import time
+from dataclasses import dataclass, field, fields
+from typing import Callable, TypeVar
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_cache import CachingSession, HttpCache, OfflineCacheMiss
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    attempts: int = 3
+    base_delay: float = 1.5
+    max_delay: float = 60.0
+    # Fraction of each backoff delay that is randomized.
+    jitter: float = 0.5
+
+    def delay(self, attempt: int, rng: random.Random) -> float:
+        """Backoff before retry number `attempt` (1-based)."""
+        d = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return d * (1 - self.jitter) + rng.uniform(0, d * self.jitter)
+
+
+@dataclass(frozen=True)
+class HostPolicy:
+    # Sustained requests per second (None: unlimited) and how many may go out back to back.
+    rate: float | None = None
+    burst: int = 1
+    failure_threshold: int = 2
+    cooldown: float = 300.0
+
+
+DEFAULT_HOST_POLICIES = {
+    "api.kraken.com": HostPolicy(rate=1.0, burst=3),  # public endpoints: ~1 req/s
+    "api.bls.gov": HostPolicy(rate=1.0, burst=4),
+    "yahoo": HostPolicy(rate=2.0, burst=4),
+}
+
+
+class RateLimited(RuntimeError):
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QuotaExceeded(RuntimeError):
+    pass
+
+
+class RequestRejected(RuntimeError):
+    pass
+
+
+class CircuitOpen(RuntimeError):
+    pass
+
+
+class RetriesExhausted(RuntimeError):
+    pass
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds from a `Retry-After` header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def check_response(response: requests.Response) -> None:
+    """`raise_for_status()`, but 429/503 become `RateLimited` with the server's hint."""
+    if response.status_code in (429, 503):
+        raise RateLimited(
+            f"HTTP {response.status_code} from {urlsplit(response.url).hostname}",
+            parse_retry_after(response.headers.get("Retry-After")),
+        )
+    response.raise_for_status()
+
+
+def _retryable(err: Exception) -> bool:
+    if isinstance(err, (QuotaExceeded, RequestRejected, CircuitOpen, OfflineCacheMiss)):
+        return False
+    if isinstance(err, requests.HTTPError) and err.response is not None:
+        status = err.response.status_code
+        return status >= 500 or status in (408, 429)
+    return True
+
+
+def _client_error(err: Exception) -> bool:
+    """A failure caused by the request itself (4xx other than 429), not by the host's health."""
+    if isinstance(err, RequestRejected):
+        return True
+    if isinstance(err, requests.HTTPError) and err.response is not None:
+        return 400 <= err.response.status_code < 500 and err.response.status_code != 429
+    return False
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token; returns how long the caller must wait before using it."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+@dataclass
+class HostMetrics:
+    calls: int = 0
+    attempts: int = 0
+    retries: int = 0
+    failures: int = 0
+    short_circuits: int = 0
+    backoff_seconds: float = 0.0
+    throttle_seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+@dataclass
+class _HostState:
+    policy: HostPolicy
+    bucket: TokenBucket | None
+    metrics: HostMetrics = field(default_factory=HostMetrics)
+    consecutive_failures: int = 0
+    open_until: float = 0.0
+
+
+class RetryClient:
+    def __init__(
+        self,
+        policies: dict[str, HostPolicy] | None = None,
+        retry: RetryPolicy = RetryPolicy(),
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+        seed: int | None = None,
+    ):
+        self.policies = DEFAULT_HOST_POLICIES if policies is None else policies
+        self.retry = retry
+        self._sleep = sleep
+        self._clock = clock
+        self._rng = random.Random(seed)
+        self._hosts: dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host: str) -> _HostState:
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                policy = self.policies.get(host, HostPolicy())
+                bucket = TokenBucket(policy.rate, policy.burst, self._clock) if policy.rate else None
+                state = self._hosts[host] = _HostState(policy, bucket)
+            return state
+
+    def throttle(self, host: str) -> None:
+        """Wait for the host's token bucket (no-op for hosts without a rate)."""
+        state = self._host(host)
+        if state.bucket is None:
+            return
+        wait = state.bucket.reserve()
+        if wait > 0:
+            with self._lock:
+                state.metrics.throttle_seconds += wait
+            self._sleep(wait)
+
+    def _record_failure(self, state: _HostState, open_for: float | None = None, host_failure: bool = True) -> None:
+        with self._lock:
+            state.metrics.failures += 1
+            if not host_failure:
+                # The host answered, only this request was bad: it says nothing about the host.
+                state.consecutive_failures = 0
+                return
+            state.consecutive_failures += 1
+            if open_for is not None or state.consecutive_failures >= state.policy.failure_threshold:
+                state.open_until = self._clock() + (state.policy.cooldown if open_for is None else open_for)
+
+    def call(self, host: str, attempt: Callable[[], T], what: str) -> T:
+        """
+        Run `attempt()` with retries; raises `CircuitOpen` without calling it while the host's
+        circuit is open, and `RetriesExhausted` (or the non-retryable error) when it gives up.
+        """
+        state = self._host(host)
+        with self._lock:
+            state.metrics.calls += 1
+            remaining = state.open_until - self._clock()
+            if remaining > 0:
+                state.metrics.short_circuits += 1
+                raise CircuitOpen(f"{what}: {host} circuit open for another {remaining:.0f}s")
+
+        last_err: Exception | None = None
+        for n in range(1, self.retry.attempts + 1):
+            with self._lock:
+                state.metrics.attempts += 1
+            try:
+                result = attempt()
+            except Exception as e:
+                last_err = e
+                if isinstance(e, OfflineCacheMiss):
+                    raise
+                if not _retryable(e):
+                    self._record_failure(
+                        state,
+                        open_for=state.policy.cooldown if isinstance(e, QuotaExceeded) else None,
+                        host_failure=not _client_error(e),
+                    )
+                    raise
+                hint = e.retry_after if isinstance(e, RateLimited) else None
+                if hint is not None and hint > self.retry.max_delay:
+                    self._record_failure(state, open_for=hint)
+                    raise RetriesExhausted(f"{what}: {e} (retry after {hint:.0f}s)") from e
+                if n == self.retry.attempts:
+                    break
+                delay = hint if hint is not None else self.retry.delay(n, self._rng)
+                with self._lock:
+                    state.metrics.retries += 1
+                    state.metrics.backoff_seconds += delay
+                self._sleep(delay)
+                continue
+            with self._lock:
+                state.consecutive_failures = 0
+            return result
+
+        self._record_failure(state)
+        raise RetriesExhausted(f"Failed to fetch {what} after {self.retry.attempts} attempts: {last_err}") from last_err
+
+    def metrics(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {host: state.metrics.as_dict() for host, state in sorted(self._hosts.items())}
+
+    def summary(self) -> list[str]:
+        return [
+            f"{host}: {m['calls']} calls, {m['attempts']} attempts, {m['retries']} retries, "
+            f"{m['failures']} failed, {m['short_circuits']} short-circuited, "
+            f"waited {m['backoff_seconds']:.1f}s backoff + {m['throttle_seconds']:.1f}s throttle"
+            for host, m in self.metrics().items()
+        ]
+
+
+# Shared by every fetcher in the process, so concurrent sources see the same limits.
+DEFAULT_CLIENT = RetryClient()
+
+
+class ThrottledAdapter(HTTPAdapter):
+    """Transport adapter that waits for the host's token bucket before each request."""
+
+    def __init__(self, client: RetryClient, **kwargs):
+        super().__init__(**kwargs)
+        self.client = client
+
+    def send(self, request, **kwargs):
+        self.client.throttle(urlsplit(request.url).hostname or "")
+        return super().send(request, **kwargs)
+
+
+def make_session(
+    cache: HttpCache | None = None,
+    pool_size: int = 10,
+    client: RetryClient = DEFAULT_CLIENT,
+) -> requests.Session:
+    """A (caching, if `cache` is given) session whose network requests are rate limited."""
+    session = requests.Session() if cache is None else CachingSession(cache)
+    adapter = ThrottledAdapter(client, pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
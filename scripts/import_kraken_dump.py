@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Build daily OHLC rows from Kraken's bulk CSV dumps and merge them into a crypto dataset.
+
+Kraken publishes full histories as headerless CSVs, per pair:
+- trades ("Time and Sales"):  timestamp, price, volume
+- OHLCVT candles (any interval): timestamp, open, high, low, close, volume, trades
+
+The format is detected from the first line. Files can be tens of GB, so they are read with
+`pd.read_csv(chunksize=...)`; each chunk is reduced to one row per UTC day (first/last
+timestamp, open, high, low, close, volume) and the per-day partials are folded together, so
+memory stays bounded by the chunk size plus the number of days, not the file size.
+
+The result uses the dataset schema (`Start, End, Open, High, Low, Close, Volume, Market Cap`,
+market cap left empty) and is merged like `update_crypto.py` does:
+- `--mode fill` (default): only days missing from the CSV are added
+- `--mode replace`: days from the dump overwrite existing rows
+
+Usage (from repo root):
+
+    python3 scripts/import_kraken_dump.py --crypto bitcoin --dump ~/kraken/XBTUSD.csv
+    python3 scripts/import_kraken_dump.py --crypto monero --dump XMRUSD_1440.csv --mode replace --dry-run
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+import instrument
+import profiling
+import update_crypto
+from debase_data.cache import DATASETS
+from update_crypto import CSV_COLUMNS, DAY_SECONDS
+
+DEFAULT_CHUNKSIZE = 1_000_000
+# Fold the per-chunk partials together once this many are pending.
+FOLD_EVERY = 64
+
+TRADE_COLUMNS = ["timestamp", "price", "volume"]
+OHLCVT_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume", "trades"]
+PARTIAL_COLUMNS = ["first_ts", "last_ts", "open", "high", "low", "close", "volume"]
+
+
+def detect_format(dump_path: Path) -> tuple[str, bool]:
+    """
+    Returns ("trades" | "ohlcvt", has_header) from the first line of the dump.
+    """
+    with open(dump_path, encoding="utf-8") as f:
+        first = f.readline().strip()
+    fields = first.split(",")
+    try:
+        float(fields[0])
+        has_header = False
+    except ValueError:
+        has_header = True
+    if len(fields) == len(TRADE_COLUMNS):
+        return "trades", has_header
+    if len(fields) == len(OHLCVT_COLUMNS):
+        return "ohlcvt", has_header
+    raise ValueError(f"{dump_path}: expected 3 (trades) or 7 (OHLCVT) columns, got {len(fields)}")
+
+
+def read_chunks(dump_path: Path, fmt: str, has_header: bool, chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    Chunks normalized to `timestamp, open, high, low, close, volume` (trades: price in all four).
+    """
+    columns = TRADE_COLUMNS if fmt == "trades" else OHLCVT_COLUMNS
+    usecols = columns if fmt == "trades" else columns[:6]
+    reader = pd.read_csv(
+        dump_path,
+        header=0 if has_header else None,
+        names=columns,
+        usecols=usecols,
+        dtype={c: np.float64 for c in usecols},
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        if fmt == "trades":
+            price = chunk["price"]
+            chunk = pd.DataFrame(
+                {"timestamp": chunk["timestamp"], "open": price, "high": price, "low": price, "close": price,
+                 "volume": chunk["volume"]}
+            )
+        yield chunk.dropna(subset=["timestamp", "open"])
+
+
+def aggregate_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    One partial row per UTC day in the chunk, indexed by epoch day.
+    """
+    ts = chunk["timestamp"].to_numpy()
+    if len(ts) > 1 and np.any(ts[1:] < ts[:-1]):
+        chunk = chunk.sort_values("timestamp", kind="stable")
+    day = (chunk["timestamp"].to_numpy() // DAY_SECONDS).astype(np.int64)
+    grouped = chunk.groupby(day, sort=True)
+    out = pd.DataFrame(
+        {
+            "first_ts": grouped["timestamp"].first(),
+            "last_ts": grouped["timestamp"].last(),
+            "open": grouped["open"].first(),
+            "high": grouped["high"].max(),
+            "low": grouped["low"].min(),
+            "close": grouped["close"].last(),
+            "volume": grouped["volume"].sum(),
+        }
+    )
+    out.index.name = "day"
+    return out
+
+
+def fold_partials(partials: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Combine per-chunk partials of the same day: open of the earliest row, close of the latest.
+    """
+    if not partials:
+        return pd.DataFrame(columns=PARTIAL_COLUMNS, index=pd.Index([], name="day", dtype=np.int64))
+    if len(partials) == 1:
+        return partials[0]
+    both = pd.concat(partials)
+    by_day = both.groupby(level="day", sort=True)
+    opens = both.sort_values("first_ts", kind="stable").groupby(level="day", sort=True)
+    closes = both.sort_values("last_ts", kind="stable").groupby(level="day", sort=True)
+    return pd.DataFrame(
+        {
+            "first_ts": opens["first_ts"].first(),
+            "last_ts": closes["last_ts"].last(),
+            "open": opens["open"].first(),
+            "high": by_day["high"].max(),
+            "low": by_day["low"].min(),
+            "close": closes["close"].last(),
+            "volume": by_day["volume"].sum(),
+        }
+    )
+
+
+def to_daily_rows(partial: pd.DataFrame) -> pd.DataFrame:
+    """Per-day partials -> rows in the crypto CSV schema."""
+    days = partial.index.to_numpy(dtype=np.int64).astype("datetime64[D]")
+    return pd.DataFrame(
+        {
+            "Start": np.datetime_as_string(days, unit="D"),
+            "End": np.datetime_as_string(days + 1, unit="D"),
+            "Open": partial["open"].to_numpy(),
+            "High": partial["high"].to_numpy(),
+            "Low": partial["low"].to_numpy(),
+            "Close": partial["close"].to_numpy(),
+            "Volume": partial["volume"].to_numpy(),
+            "Market Cap": "",
+        },
+        columns=CSV_COLUMNS,
+    )
+
+
+def aggregate_dump(
+    dump_path: Path,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    progress: bool = False,
+) -> tuple[pd.DataFrame, int]:
+    """
+    Stream the dump into daily rows. Returns (daily rows in CSV schema, input rows read).
+    """
+    fmt, has_header = detect_format(dump_path)
+    pending: list[pd.DataFrame] = []
+    folded = fold_partials([])
+    rows = 0
+    t0 = time.perf_counter()
+    for i, chunk in enumerate(read_chunks(dump_path, fmt, has_header, chunksize), start=1):
+        rows += len(chunk)
+        pending.append(aggregate_chunk(chunk))
+        if len(pending) >= FOLD_EVERY:
+            folded = fold_partials([folded, *pending])
+            pending = []
+        if progress and i % 10 == 0:
+            rate = rows / (time.perf_counter() - t0)
+            print(f"[import] {rows:,} rows ({rate:,.0f} rows/s)")
+    folded = fold_partials([folded, *pending])
+    return to_daily_rows(folded), rows
+
+
+def merge_into_dataset(csv_path: Path, daily: pd.DataFrame, mode: str, dry_run: bool, name: str) -> None:
+    starts = update_crypto._read_start_dates(csv_path)
+    if mode == "fill" and not starts.empty:
+        have = set(starts.strftime("%Y-%m-%d"))
+        daily = daily[~daily["Start"].isin(have)]
+    if daily.empty:
+        print(f"[{name}] nothing to import (all days already present)")
+        return
+
+    if update_crypto._try_append(csv_path, daily, dry_run=dry_run):
+        verb = "would append" if dry_run else "appended"
+        print(f"[{name}] {verb} {len(daily)} rows ({daily['Start'].iloc[0]}..{daily['Start'].iloc[-1]})")
+        return
+
+    merged, _ = update_crypto._merge_append(csv_path, daily)
+    if dry_run:
+        print(f"[{name}] dry-run: would write {len(merged)} rows ({len(daily)} from the dump, mode={mode})")
+        return
+    update_crypto._write_csv(csv_path, merged)
+    print(f"[{name}] wrote {len(merged)} rows ({len(daily)} from the dump, mode={mode})")
+
+
+def main() -> int:
+    crypto_names = ["bitcoin", "ethereum", "monero"]
+    parser = argparse.ArgumentParser(description="Import a Kraken trades/OHLCVT dump as daily OHLC rows.")
+    parser.add_argument("--dump", required=True, help="Kraken CSV dump (trades or OHLCVT)")
+    parser.add_argument("--crypto", choices=crypto_names, help="Dataset to merge into")
+    parser.add_argument("--csv-path", default=None, help="Target CSV (default: the --crypto dataset)")
+    parser.add_argument("--mode", choices=["fill", "replace"], default="fill", help="Fill gaps only or overwrite days")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Rows per chunk")
+    parser.add_argument("--output", default=None, help="Only write the daily rows to this CSV, no merge")
+    parser.add_argument("--dry-run", action="store_true", help="Aggregate and merge in-memory without writing files.")
+    parser.add_argument("--progress", action="store_true", help="Print rows/s while reading.")
+    profiling.add_profile_args(parser)
+    args = parser.parse_args()
+    profiling.start(args, "import_kraken_dump")
+
+    if args.output is None and args.csv_path is None and args.crypto is None:
+        parser.error("one of --crypto, --csv-path or --output is required")
+
+    t0 = time.perf_counter()
+    with instrument.span("aggregate"):
+        daily, rows = aggregate_dump(Path(args.dump), chunksize=args.chunksize, progress=args.progress)
+    elapsed = time.perf_counter() - t0
+    print(f"[import] {rows:,} rows -> {len(daily)} days in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+    if args.output is not None:
+        if not args.dry_run:
+            daily.to_csv(args.output, index=False)
+        print(f"[import] {'dry-run: would write' if args.dry_run else 'wrote'} {len(daily)} rows to {args.output}")
+        return 0
+
+    if args.csv_path is not None:
+        csv_path = Path(args.csv_path)
+    else:
+        csv_path = update_crypto._resolve_dataset_path(f"datasets/{DATASETS[args.crypto].csv_name}")
+    with instrument.span("merge"):
+        merge_into_dataset(csv_path, daily, args.mode, args.dry_run, name=args.crypto or csv_path.stem)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
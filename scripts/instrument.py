@@ -0,0 +1,229 @@
+"""
+Per-stage timing and counters for the dataset updaters (standard library only).
+
+Updaters wrap their stages in spans; the source (bitcoin, gold, cpi, ...) comes from the
+enclosing `source()` block, and counters can be added to the innermost open span from deeper
+code (e.g. response bytes inside a fetch):
+
+    with instrument.source("bitcoin"):
+        with instrument.span("fetch") as s:
+            rows = fetch(...)            # fetch() may call instrument.add(bytes=len(body))
+            s.add(rows=len(rows))
+
+At the end of a run `finish()` writes every span (plus a run summary with HTTP retry/cache
+counters) to a JSON-lines log, and the per (source, stage) totals to a Prometheus
+textfile-collector file (`debase_<updater>.prom`, replaced atomically). Both go to
+`datasets/.metrics/` unless `--metrics-dir` / `--no-metrics` say otherwise. Recording a span is
+two `perf_counter()` calls and a list append.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
+
+from csv_io import atomic_write
+
+DEFAULT_METRICS_DIR = Path(__file__).resolve().parent.parent / "datasets" / ".metrics"
+LOG_NAME = "updates.jsonl"
+PROM_PREFIX = "debase"
+
+
+@dataclass
+class Span:
+    source: str
+    stage: str
+    started: float  # epoch seconds
+    seconds: float = 0.0
+    ok: bool = True
+    error: str | None = None
+    counts: dict[str, float] = field(default_factory=dict)
+
+    def add(self, **counts: float) -> None:
+        with _COUNT_LOCK:
+            for name, value in counts.items():
+                self.counts[name] = self.counts.get(name, 0) + value
+
+
+_COUNT_LOCK = threading.Lock()
+_SOURCE: ContextVar[str] = ContextVar("instrument_source", default="")
+_OPEN: ContextVar[tuple[Span, ...]] = ContextVar("instrument_open_spans", default=())
+
+
+class Recorder:
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def record(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._t0
+
+    def snapshot(self) -> list[Span]:
+        with self._lock:
+            return list(self.spans)
+
+    def totals(self) -> dict[tuple[str, str], dict[str, float]]:
+        """Per (source, stage): seconds, spans, errors and summed counters."""
+        out: dict[tuple[str, str], dict[str, float]] = {}
+        for s in self.snapshot():
+            t = out.setdefault((s.source, s.stage), {"seconds": 0.0, "spans": 0, "errors": 0})
+            t["seconds"] += s.seconds
+            t["spans"] += 1
+            t["errors"] += 0 if s.ok else 1
+            for name, value in s.counts.items():
+                t[name] = t.get(name, 0) + value
+        return out
+
+
+RUN = Recorder()
+# Set by `profiling.start()` (--profile): told about every span entered and left.
+PROFILER = None
+
+
+@contextmanager
+def source(name: str) -> Iterator[None]:
+    token = _SOURCE.set(name)
+    try:
+        yield
+    finally:
+        _SOURCE.reset(token)
+
+
+@contextmanager
+def span(stage: str, **counts: float) -> Iterator[Span]:
+    s = Span(source=_SOURCE.get(), stage=stage, started=time.time(), counts=dict(counts))
+    token = _OPEN.set((*_OPEN.get(), s))
+    profiler = PROFILER
+    if profiler is not None:
+        profiler.enter(stage)
+    t0 = time.perf_counter()
+    try:
+        yield s
+    except BaseException as e:
+        s.ok = False
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        s.seconds = time.perf_counter() - t0
+        if profiler is not None:
+            profiler.exit(stage)
+        _OPEN.reset(token)
+        RUN.record(s)
+
+
+def add(**counts: float) -> None:
+    """Add counters to the innermost open span (no-op outside spans)."""
+    open_spans = _OPEN.get()
+    if open_spans:
+        open_spans[-1].add(**counts)
+
+
+def add_metrics_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--metrics-dir", default=str(DEFAULT_METRICS_DIR), help="Where to write run metrics")
+    parser.add_argument("--no-metrics", action="store_true", help="Don't write the metrics log / Prometheus file.")
+
+
+def _labels(**labels: str) -> str:
+    def escape(value: str) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def prometheus_text(updater: str, recorder: Recorder, ok: bool, http: dict[str, dict[str, float]]) -> str:
+    lines: list[str] = []
+
+    def metric(name: str, help_text: str, samples: list[tuple[dict[str, str], float]]) -> None:
+        lines.append(f"# HELP {PROM_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {PROM_PREFIX}_{name} gauge")
+        for labels, value in samples:
+            lines.append(f"{PROM_PREFIX}_{name}{_labels(updater=updater, **labels)} {float(value)!r}")
+
+    totals = recorder.totals()
+
+    def by_stage(key: str) -> list[tuple[dict[str, str], float]]:
+        return [({"source": src, "stage": stage}, t[key]) for (src, stage), t in sorted(totals.items()) if key in t]
+
+    metric("update_stage_seconds", "Seconds spent per updater stage in the last run.", by_stage("seconds"))
+    metric("update_stage_errors", "Failed spans per updater stage in the last run.", by_stage("errors"))
+    metric("update_stage_rows", "Rows handled per updater stage in the last run.", by_stage("rows"))
+    metric("update_stage_bytes", "Bytes read/written per updater stage in the last run.", by_stage("bytes"))
+    for key, help_text in [
+        ("attempts", "HTTP attempts per host in the last run."),
+        ("retries", "HTTP retries per host in the last run."),
+        ("failures", "Failed HTTP calls (after retries) per host in the last run."),
+        ("short_circuits", "HTTP calls refused by an open circuit in the last run."),
+        ("backoff_seconds", "Seconds spent in retry backoff per host in the last run."),
+        ("throttle_seconds", "Seconds spent waiting for the rate limiter per host in the last run."),
+    ]:
+        metric(f"http_{key}", help_text, [({"host": host}, m[key]) for host, m in sorted(http.items())])
+    metric("update_duration_seconds", "Wall-clock duration of the last run.", [({}, recorder.elapsed)])
+    metric("update_success", "1 if the last run finished without errors.", [({}, 1 if ok else 0)])
+    metric("update_last_run_timestamp_seconds", "Unix time the last run started.", [({}, recorder.started)])
+    return "\n".join(lines) + "\n"
+
+
+def finish(
+    args: argparse.Namespace,
+    updater: str,
+    ok: bool = True,
+    http: dict[str, dict[str, float]] | None = None,
+    cache: dict[str, int] | None = None,
+) -> None:
+    """Append this run's spans to the JSON-lines log and rewrite the Prometheus textfile."""
+    if getattr(args, "no_metrics", False):
+        return
+    directory = Path(getattr(args, "metrics_dir", DEFAULT_METRICS_DIR))
+    http = http or {}
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        records = [
+            {
+                "type": "span",
+                "run_id": RUN.run_id,
+                "updater": updater,
+                "ts": datetime.fromtimestamp(s.started, timezone.utc).isoformat(timespec="milliseconds"),
+                "source": s.source,
+                "stage": s.stage,
+                "seconds": round(s.seconds, 6),
+                "ok": s.ok,
+                **({"error": s.error} if s.error else {}),
+                **s.counts,
+            }
+            for s in RUN.snapshot()
+        ]
+        records.append(
+            {
+                "type": "run",
+                "run_id": RUN.run_id,
+                "updater": updater,
+                "ts": datetime.fromtimestamp(RUN.started, timezone.utc).isoformat(timespec="milliseconds"),
+                "seconds": round(RUN.elapsed, 6),
+                "ok": ok,
+                "http": http,
+                **({"cache": cache} if cache is not None else {}),
+            }
+        )
+        with open(directory / LOG_NAME, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(r) + "\n" for r in records))
+        prom = prometheus_text(updater, RUN, ok, http)
+        atomic_write(directory / f"{PROM_PREFIX}_{updater}.prom", lambda f: f.write(prom))
+    except OSError as e:
+        # Metrics must never fail an update.
+        print(f"[metrics] WARNING: could not write metrics to {directory}: {e}")
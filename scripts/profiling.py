@@ -0,0 +1,213 @@
+"""
+Opt-in profiling for the scripts (`--profile`): cProfile and tracemalloc per named stage.
+
+Stages are the `instrument.span()` blocks (read, fetch, parse, merge, write, regenerate, the
+daily CPI generator's `daily_*` steps, ...); time outside any span goes to the `main` stage.
+Every stage name gets its own cProfile profile, and the enclosing stage's profiler is paused
+while a nested stage runs, so each function call is counted in exactly one stage. Wall time and
+the tracemalloc peak of a stage include its nested stages. Only the thread that started
+profiling is profiled (`update_all.py --profile` runs its sources one at a time for that).
+
+    profiling.add_profile_args(parser)
+    args = parser.parse_args()
+    profiling.start(args, "update_cpi")  # no-op without --profile
+
+`finish()` runs at interpreter exit and writes to `--profile-dir` (default
+`datasets/.profiles/<script>-<UTC time>/`):
+- `<stage>.pstats` per stage (`python3 -m pstats` / snakeviz)
+- `summary.txt`: per stage, wall time, peak traced memory, the hottest functions by cumulative
+  time and the biggest allocation sites (net growth by line while the stage ran)
+"""
+from __future__ import annotations
+
+import argparse
+import atexit
+import cProfile
+import io
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+import instrument
+
+DEFAULT_PROFILE_DIR = Path(__file__).resolve().parent.parent / "datasets" / ".profiles"
+MAIN_STAGE = "main"
+TOP = 15
+MIB = 1024 * 1024
+
+# tracemalloc's and the profiler's own bookkeeping.
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+]
+
+
+@dataclass
+class StageStats:
+    profile: cProfile.Profile = field(default_factory=cProfile.Profile)
+    spans: int = 0
+    seconds: float = 0.0
+    peak: int = 0
+    allocations: Counter = field(default_factory=Counter)  # "file:line" -> net bytes
+
+
+@dataclass
+class _Open:
+    stage: str
+    stats: StageStats
+    started: float
+    base: int  # traced bytes when the stage started
+    snapshot: tracemalloc.Snapshot
+    peak: int = 0
+
+
+class StageProfiler:
+    def __init__(self, script: str, directory: Path):
+        self.script = script
+        self.directory = directory
+        self.stages: dict[str, StageStats] = {}
+        self._stack: list[_Open] = []
+        self._thread = threading.get_ident()
+        self._started_tracing = False
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.enter(MAIN_STAGE)
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+    def enter(self, stage: str) -> None:
+        if threading.get_ident() != self._thread:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            outer = self._stack[-1]
+            outer.stats.profile.disable()
+            outer.peak = max(outer.peak, peak - outer.base)
+        tracemalloc.reset_peak()
+        stats = self.stages.setdefault(stage, StageStats())
+        self._stack.append(_Open(stage, stats, time.perf_counter(), current, self._snapshot()))
+        stats.profile.enable()
+
+    def exit(self, stage: str) -> None:
+        if threading.get_ident() != self._thread or not self._stack or self._stack[-1].stage != stage:
+            return
+        frame = self._stack.pop()
+        frame.stats.profile.disable()
+        _, peak = tracemalloc.get_traced_memory()
+        stats = frame.stats
+        stats.spans += 1
+        stats.seconds += time.perf_counter() - frame.started
+        stats.peak = max(stats.peak, frame.peak, peak - frame.base)
+        for diff in self._snapshot().compare_to(frame.snapshot, "lineno")[: TOP * 2]:
+            site = diff.traceback[0]
+            stats.allocations[f"{site.filename}:{site.lineno}"] += diff.size_diff
+        if self._stack:
+            outer = self._stack[-1]
+            outer.peak = max(outer.peak, peak - outer.base)
+            outer.stats.profile.enable()
+
+    def stop(self) -> None:
+        while self._stack:
+            self.exit(self._stack[-1].stage)
+        if self._started_tracing:
+            tracemalloc.stop()
+
+    def summary(self) -> str:
+        out = io.StringIO()
+        out.write(f"{self.script}: {len(self.stages)} stages, profiles in {self.directory}\n")
+        for stage, stats in sorted(self.stages.items(), key=lambda item: -item[1].seconds):
+            out.write(
+                f"\n== {stage}: {stats.spans} span(s), {stats.seconds:.3f}s wall, "
+                f"peak +{stats.peak / MIB:.1f} MiB traced\n"
+            )
+            out.write("  hottest functions (cumulative, nested stages excluded):\n")
+            for line in _hottest(stats.profile, TOP):
+                out.write(f"    {line}\n")
+            allocators = [(site, size) for site, size in stats.allocations.most_common(TOP) if size > 0]
+            if allocators:
+                out.write("  biggest allocators (net growth):\n")
+                for site, size in allocators:
+                    out.write(f"    {size / MIB:+8.2f} MiB  {site}\n")
+        return out.getvalue()
+
+    def write(self) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for stage, stats in self.stages.items():
+            stats.profile.dump_stats(self.directory / f"{_file_name(stage)}.pstats")
+        summary = self.directory / "summary.txt"
+        summary.write_text(self.summary(), encoding="utf-8")
+        return summary
+
+
+def _file_name(stage: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", stage)
+
+
+def _hottest(profile: cProfile.Profile, n: int) -> list[str]:
+    try:
+        stats = pstats.Stats(profile)
+    except TypeError:  # nothing was recorded
+        return []
+    rows = sorted(stats.stats.items(), key=lambda item: -item[1][3])
+    lines = []
+    for func, (_, calls, tottime, cumtime, _) in rows:
+        name = pstats.func_std_string(func)
+        if "profiling.py" in name or "cProfile" in name or "'disable'" in name:
+            continue
+        lines.append(f"{cumtime:8.3f}s cum {tottime:8.3f}s own {calls:>8d} calls  {name}")
+        if len(lines) == n:
+            break
+    return lines
+
+
+def add_profile_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile", action="store_true", help="Record cProfile stats and tracemalloc peaks per stage."
+    )
+    parser.add_argument(
+        "--profile-dir", default=None, help=f"Where to write them (default: {DEFAULT_PROFILE_DIR}/<script>-<time>)"
+    )
+
+
+def start(args: argparse.Namespace, script: str) -> StageProfiler | None:
+    """
+    Start profiling when `--profile` was given (results are written at interpreter exit, so
+    early returns and errors are covered); stages are reported through `instrument.span()`.
+    """
+    if not getattr(args, "profile", False):
+        return None
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    directory = Path(args.profile_dir) if args.profile_dir else DEFAULT_PROFILE_DIR / f"{script}-{stamp}"
+    profiler = StageProfiler(script, directory)
+    instrument.PROFILER = profiler
+    profiler.start()
+    atexit.register(finish, profiler)
+    return profiler
+
+
+def finish(profiler: StageProfiler | None) -> None:
+    if profiler is None or instrument.PROFILER is not profiler:
+        return
+    instrument.PROFILER = None
+    profiler.stop()
+    try:
+        summary = profiler.write()
+    except OSError as e:
+        print(f"[profile] WARNING: could not write profiles to {profiler.directory}: {e}")
+        return
+    hottest = sorted(profiler.stages.items(), key=lambda item: -item[1].seconds)[:5]
+    for stage, stats in hottest:
+        print(f"[profile] {stage}: {stats.seconds:.3f}s, peak +{stats.peak / MIB:.1f} MiB")
+    print(f"[profile] wrote {summary}")
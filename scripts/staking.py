@@ -0,0 +1,194 @@
+"""
+Staking / fixed-yield simulator over historical prices.
+
+A `Strategy` grows a token balance by a yield (quoted as APR with a compounding frequency, or
+as APY via `Strategy.from_apy`) minus a fee on rewards and an optional exit fee. `simulate()`
+evaluates every strategy on a grid of start dates x horizons in one vectorized pass:
+
+- balances come from a cumulative sum of log growth factors over a daily calendar index, so
+  the balance between any two days is `exp(L[end] - L[start])` (one gather per grid cell, no
+  per-day Python loop)
+- prices at the start/end of each cell come from a batch `PriceLookup.nearest()` (that day,
+  else up to 7 days before, else up to 7 days after)
+
+The result is a tidy frame with one row per (strategy, start, horizon):
+
+    from staking import Strategy, simulate
+    grid = simulate(
+        "ethereum",
+        [Strategy.from_apy("SRS", 0.045), Strategy.from_apy("ETH Stake", 0.027)],
+        starts=pd.date_range("2018-01-01", "2024-12-31"),
+        horizons=["3m", "1y", "2y"],
+    )
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from debase_data import PriceLookup
+
+DAYS_PER_YEAR = 365
+_HORIZON_RE = re.compile(r"^\s*(\d+)\s*([dwmy])\s*$", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class Strategy:
+    """
+    name: label in the results
+    apr: nominal annual rate, credited `compounds_per_year` times a year (rate apr / n each time);
+         0 compounds = simple interest (rewards accrue daily but are never restaked)
+    reward_fee: fraction of every reward kept by the operator (e.g. 0.1 = 10% commission)
+    exit_fee: fraction of the final balance paid when withdrawing
+    """
+    name: str
+    apr: float
+    compounds_per_year: int = DAYS_PER_YEAR
+    reward_fee: float = 0.0
+    exit_fee: float = 0.0
+
+    @classmethod
+    def from_apy(
+        cls,
+        name: str,
+        apy: float,
+        compounds_per_year: int = DAYS_PER_YEAR,
+        reward_fee: float = 0.0,
+        exit_fee: float = 0.0,
+    ) -> "Strategy":
+        # APR that yields `apy` per year (before fees) at this compounding frequency.
+        n = compounds_per_year
+        apr = n * ((1 + apy) ** (1 / n) - 1) if n > 0 else apy
+        return cls(name=name, apr=apr, compounds_per_year=n, reward_fee=reward_fee, exit_fee=exit_fee)
+
+    @property
+    def apy(self) -> float:
+        """Effective annual yield before fees."""
+        n = self.compounds_per_year
+        return (1 + self.apr / n) ** n - 1 if n > 0 else self.apr
+
+    def log_growth(self, days: np.ndarray) -> np.ndarray:
+        """
+        Cumulative log balance multiplier at each epoch day in `days` (consecutive, ascending),
+        relative to the day before `days[0]`. Compounding events are spread evenly over the
+        calendar (epoch-aligned), so the result doesn't depend on the start date.
+        """
+        n = self.compounds_per_year
+        net_rate = self.apr * (1 - self.reward_fee)
+        if n <= 0:
+            raise ValueError("simple interest has no log-growth path; see `units`")
+        # A compounding event happens on day d when floor(d * n / 365) ticks over.
+        events = (days * n) // DAYS_PER_YEAR - ((days - 1) * n) // DAYS_PER_YEAR
+        return np.cumsum(events * np.log1p(net_rate / n))
+
+
+def parse_horizon(horizon) -> pd.DateOffset | pd.Timedelta:
+    """
+    `90` / `"90d"` -> 90 days, `"2w"` -> 14 days, `"3m"` -> 3 calendar months, `"1y"` -> 1 year.
+    """
+    if isinstance(horizon, (int, np.integer)):
+        return pd.Timedelta(days=int(horizon))
+    if isinstance(horizon, (pd.DateOffset, pd.Timedelta)):
+        return horizon
+    match = _HORIZON_RE.match(str(horizon))
+    if not match:
+        raise ValueError(f"Invalid horizon {horizon!r} (use e.g. 90, '90d', '2w', '3m', '1y')")
+    count, unit = int(match.group(1)), match.group(2).lower()
+    if unit == "d":
+        return pd.Timedelta(days=count)
+    if unit == "w":
+        return pd.Timedelta(weeks=count)
+    if unit == "m":
+        return pd.DateOffset(months=count)
+    return pd.DateOffset(years=count)
+
+
+def _epoch_days(index: pd.DatetimeIndex) -> np.ndarray:
+    return np.asarray(index, dtype="datetime64[D]").astype(np.int64)
+
+
+def units(strategy: Strategy, start_days: np.ndarray, end_days: np.ndarray, amount: float = 1.0) -> np.ndarray:
+    """
+    Balance at `end_days` of `amount` staked at `start_days` (both epoch-day arrays, same shape),
+    after fees.
+    """
+    start_days = np.asarray(start_days, dtype=np.int64)
+    end_days = np.asarray(end_days, dtype=np.int64)
+    if start_days.size == 0:
+        return np.zeros(start_days.shape)
+
+    if strategy.compounds_per_year <= 0:
+        growth = 1 + strategy.apr * (1 - strategy.reward_fee) * (end_days - start_days) / DAYS_PER_YEAR
+    else:
+        first = int(start_days.min())
+        calendar = np.arange(first, int(end_days.max()) + 1)
+        log_path = np.concatenate([[0.0], strategy.log_growth(calendar[1:])])
+        growth = np.exp(log_path[end_days - first] - log_path[start_days - first])
+    return amount * growth * (1 - strategy.exit_fee)
+
+
+def simulate(
+    asset: str | PriceLookup,
+    strategies: list[Strategy],
+    starts,
+    horizons,
+    amount: float = 1.0,
+    max_gap_days: int = 7,
+) -> pd.DataFrame:
+    """
+    Evaluate every strategy on every (start, horizon) pair.
+
+    Args:
+        asset: dataset name (e.g. "ethereum") or a prebuilt `PriceLookup` of its closes.
+        strategies: strategies to compare.
+        starts: start dates (anything `pd.DatetimeIndex` accepts).
+        horizons: holding periods (see `parse_horizon`), e.g. [90, "6m", "1y"].
+        amount: tokens staked at each start.
+        max_gap_days: how far from a start/end day a price may be taken from.
+
+    Returns:
+        DataFrame with columns strategy, start, horizon, end, units_start, units_end,
+        reward_units, price_start, price_end, value_start, value_end, return_pct.
+        Prices/values are NaN when no price is found within `max_gap_days`.
+    """
+    prices = PriceLookup.from_dataset(asset) if isinstance(asset, str) else asset
+    start_index = pd.DatetimeIndex(pd.to_datetime(starts)).normalize()
+    horizon_labels = [str(h) for h in horizons]
+    offsets = [parse_horizon(h) for h in horizons]
+
+    # Grid in (horizon, start) order; each horizon shifts all starts at once.
+    grid_starts = np.tile(_epoch_days(start_index), len(offsets))
+    grid_ends = np.concatenate([_epoch_days(start_index + off) for off in offsets]) if offsets else grid_starts
+    grid_horizons = np.repeat(np.array(horizon_labels, dtype=object), len(start_index))
+
+    price_start = prices.nearest(grid_starts.astype("datetime64[D]"), max_days=max_gap_days)
+    price_end = prices.nearest(grid_ends.astype("datetime64[D]"), max_days=max_gap_days)
+
+    frames = []
+    for strategy in strategies:
+        units_end = units(strategy, grid_starts, grid_ends, amount)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "strategy": strategy.name,
+                    "start": grid_starts.astype("datetime64[D]").astype("datetime64[ns]"),
+                    "horizon": grid_horizons,
+                    "end": grid_ends.astype("datetime64[D]").astype("datetime64[ns]"),
+                    "units_start": float(amount),
+                    "units_end": units_end,
+                    "reward_units": units_end - amount,
+                    "price_start": price_start,
+                    "price_end": price_end,
+                    "value_start": amount * price_start,
+                    "value_end": units_end * price_end,
+                }
+            )
+        )
+    if not frames:
+        return pd.DataFrame()
+    result = pd.concat(frames, ignore_index=True)
+    result["return_pct"] = (result["value_end"] / result["value_start"] - 1) * 100
+    return result
@@ -7,20 +7,10 @@ REPO_ROOT="$(cd .. && pwd)"
 echo "=== Building Docker image ==="
 docker build -t debase-update -f Dockerfile .
 
-echo "=== Running updates in parallel ==="
-docker run --rm -v "$REPO_ROOT:/work" -w /work/scripts debase-update python update_cpi.py &
-PID_CPI=$!
-
-docker run --rm -v "$REPO_ROOT:/work" -w /work/scripts debase-update python update_metals.py &
-PID_METALS=$!
-
-python3 update_crypto.py &
-PID_CRYPTO=$!
-
-fail=0
-wait $PID_CPI || { echo "[CPI] failed"; fail=1; }
-wait $PID_METALS || { echo "[METALS] failed"; fail=1; }
-wait $PID_CRYPTO || { echo "[CRYPTO] failed"; fail=1; }
+# update_all.py runs crypto, metals and CPI concurrently in one process
+# (bounded thread pool, per-host limits, shared HTTP connection pool), then
+# rebuilds the derived front-end files (adjusted prices, rolling matrices, LOD series).
+echo "=== Running updates ==="
+docker run --rm -v "$REPO_ROOT:/work" -w /work/scripts debase-update python update_all.py "$@"
 
 echo "=== All updates complete ==="
-exit $fail
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Refresh every dataset in one process: Kraken pairs, Yahoo metal tickers and the BLS CPI series.
+
+Sources run concurrently in a bounded thread pool. Each API host has its own concurrency limit
+(so e.g. Kraken never sees more than one of our requests at a time), and the Kraken/BLS fetchers
+share one `requests.Session` so TCP/TLS connections are reused across sources. Retries, per-host
+rate limits and circuit breaking come from `http_client.py`. Responses go through the on-disk
+HTTP cache (`http_cache.py`) unless `--no-cache` is given; `--offline` replays a refresh
+entirely from it.
+
+Wall-clock time is reported per source and for the whole refresh. Afterwards the derived
+front-end series (`build_adjusted.py`, `build_rolling.py`, `build_lod.py`) are rebuilt if any
+of their input CSVs changed.
+"""
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from importlib import import_module
+from pathlib import Path
+from typing import Callable
+
+import requests
+
+import instrument
+import profiling
+from http_cache import HttpCache, add_cache_args, cache_from_args
+from http_client import DEFAULT_CLIENT, make_session
+
+
+# Max concurrent sources per API host.
+DEFAULT_HOST_LIMITS = {
+    "api.kraken.com": 1,
+    "query1.finance.yahoo.com": 2,
+    "api.bls.gov": 1,
+}
+
+
+@dataclass(frozen=True)
+class Source:
+    name: str
+    host: str
+    run: Callable[[requests.Session], None]
+
+
+@dataclass(frozen=True)
+class SourceResult:
+    name: str
+    seconds: float
+    error: str | None
+
+
+def build_sources(args: argparse.Namespace, end: date, cache: HttpCache | None = None) -> list[Source]:
+    import update_cpi
+    import update_crypto
+    import update_metals
+    from update_crypto import Crypto
+    from update_metals import Metal
+
+    sources: list[Source] = []
+
+    cryptos = [
+        Crypto(name="bitcoin", pair="XBTUSD", csv_path=update_crypto._resolve_dataset_path(args.btc_path)),
+        Crypto(name="ethereum", pair="ETHUSD", csv_path=update_crypto._resolve_dataset_path(args.eth_path)),
+        Crypto(name="monero", pair="XMRUSD", csv_path=update_crypto._resolve_dataset_path(args.xmr_path)),
+    ]
+    for crypto in cryptos:
+        sources.append(
+            Source(
+                name=crypto.name,
+                host="api.kraken.com",
+                run=lambda session, c=crypto: update_crypto.update_crypto(
+                    c,
+                    end=end,
+                    dry_run=args.dry_run,
+                    debug=args.debug,
+                    base_url=args.kraken_url or update_crypto.KRAKEN_OHLC_URL,
+                    session=session,
+                ),
+            )
+        )
+
+    metals = [
+        Metal(name="gold", ticker="GC=F", csv_path=update_metals._resolve_dataset_path(args.gold_path)),
+        Metal(name="silver", ticker="SI=F", csv_path=update_metals._resolve_dataset_path(args.silver_path)),
+    ]
+    for metal in metals:
+        # yfinance manages its own HTTP client, so it doesn't use the shared session.
+        sources.append(
+            Source(
+                name=metal.name,
+                host="query1.finance.yahoo.com",
+                run=lambda session, m=metal: update_metals.update_metal(
+                    m, end=end, dry_run=args.dry_run, cache=cache
+                ),
+            )
+        )
+
+    cfg = update_cpi.CpiConfig(
+        series_id=args.series_id,
+        cpi_csv=update_cpi._resolve_path(args.cpi_path),
+        generator_py=update_cpi._resolve_path(args.generator_path),
+    )
+    sources.append(
+        Source(
+            name="cpi",
+            host="api.bls.gov",
+            run=lambda session: update_cpi.update_cpi(
+                cfg,
+                end_year=end.year,
+                dry_run=args.dry_run,
+                debug=args.debug,
+                lookback_years=args.lookback_years,
+                overwrite_existing=True,
+                session=session,
+            ),
+        )
+    )
+    return sources
+
+
+def _interleave_by_host(sources: list[Source]) -> list[Source]:
+    # Round-robin across hosts so pool threads don't all queue behind one host's limit.
+    by_host: dict[str, list[Source]] = {}
+    for source in sources:
+        by_host.setdefault(source.host, []).append(source)
+    queues = list(by_host.values())
+    out: list[Source] = []
+    while any(queues):
+        for q in queues:
+            if q:
+                out.append(q.pop(0))
+    return out
+
+
+def run_sources(
+    sources: list[Source],
+    max_workers: int,
+    host_limits: dict[str, int],
+    cache: HttpCache | None = None,
+) -> tuple[list[SourceResult], float]:
+    """
+    Run all sources concurrently; returns per-source results (in start order) and total seconds.
+    With `max_workers=1` they run one after another on the calling thread.
+    """
+    host_locks = {host: threading.BoundedSemaphore(limit) for host, limit in host_limits.items()}
+    session = make_session(cache, pool_size=max_workers)
+
+    def run_one(source: Source) -> SourceResult:
+        gate = host_locks.get(source.host) or threading.BoundedSemaphore(max_workers)
+        with gate:
+            t0 = time.perf_counter()
+            try:
+                with instrument.source(source.name):
+                    source.run(session)
+                error = None
+            except Exception as e:
+                error = str(e)
+                print(f"[{source.name}] ERROR: {e}")
+            return SourceResult(name=source.name, seconds=time.perf_counter() - t0, error=error)
+
+    t0 = time.perf_counter()
+    try:
+        if max_workers == 1:
+            results = [run_one(source) for source in sources]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                results = list(pool.map(run_one, _interleave_by_host(sources)))
+    finally:
+        session.close()
+    return results, time.perf_counter() - t0
+
+
+# Derived artifacts, in order, as (name, module whose `run()` builds it); each reads the CSVs the
+# sources just wrote. The modules are imported when they run.
+DERIVED_STEPS: list[tuple[str, str]] = [
+    ("adjusted", "build_adjusted"),
+    ("rolling", "build_rolling"),
+    ("lod", "build_lod"),
+]
+
+
+def _run_derived() -> list[SourceResult]:
+    results = []
+    for name, module in DERIVED_STEPS:
+        t0 = time.perf_counter()
+        try:
+            with instrument.source(name), instrument.span("build"):
+                import_module(module).run()
+            error = None
+        except Exception as e:
+            error = str(e)
+            print(f"[{name}] ERROR: {e}")
+        results.append(SourceResult(name=name, seconds=time.perf_counter() - t0, error=error))
+    return results
+
+
+def _print_timings(results: list[SourceResult], total: float) -> None:
+    print("\n=== Timings ===")
+    for r in results:
+        status = "ok" if r.error is None else "FAILED"
+        print(f"  {r.name:10s} {r.seconds:7.2f}s  {status}")
+    print(f"  {'total':10s} {total:7.2f}s  (wall clock)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Update all datasets (crypto, metals, CPI) concurrently.")
+    parser.add_argument("--btc-path", default="datasets/bitcoin_2010-07-17_2025-07-25.csv", help="Path to Bitcoin CSV")
+    parser.add_argument("--eth-path", default="datasets/ethereum_2015-08-07_2025-07-25.csv", help="Path to Ethereum CSV")
+    parser.add_argument("--xmr-path", default="datasets/monero_2014-05-21_2025-07-25.csv", help="Path to Monero CSV")
+    parser.add_argument("--gold-path", default="datasets/gold.csv", help="Path to gold CSV")
+    parser.add_argument("--silver-path", default="datasets/silver.csv", help="Path to silver CSV")
+    parser.add_argument(
+        "--kraken-url", default=None, help="Kraken OHLC endpoint (default: public API)"
+    )
+    parser.add_argument("--series-id", default="CUUR0000SA0", help="BLS series id (default: CUUR0000SA0)")
+    parser.add_argument("--cpi-path", default="datasets/CPI_U.csv", help="Path to CPI_U.csv")
+    parser.add_argument(
+        "--generator-path", default="datasets/generator_cpi_daily.py", help="Path to the daily CPI generator"
+    )
+    parser.add_argument(
+        "--lookback-years", type=int, default=3, help="CPI years to always refresh (default: 3)"
+    )
+    parser.add_argument("--end", default=None, help="End date (YYYY-MM-DD). Default: today (UTC).")
+    parser.add_argument("--workers", type=int, default=4, help="Max sources running at once (default: 4)")
+    parser.add_argument("--only", nargs="+", default=None, help="Only run these sources (e.g. bitcoin gold cpi)")
+    parser.add_argument("--dry-run", action="store_true", help="Download and merge in-memory without writing files.")
+    parser.add_argument("--debug", action="store_true", help="Print debug info.")
+    add_cache_args(parser)
+    instrument.add_metrics_args(parser)
+    profiling.add_profile_args(parser)
+    args = parser.parse_args()
+    profiling.start(args, "update_all")
+    cache = cache_from_args(args)
+
+    end = (
+        datetime.now(timezone.utc).date()
+        if args.end is None
+        else datetime.strptime(args.end, "%Y-%m-%d").date()
+    )
+
+    sources = build_sources(args, end, cache=cache)
+    if args.only:
+        sources = [s for s in sources if s.name in set(args.only)]
+
+    # The profiler only follows the main thread.
+    workers = 1 if args.profile else max(1, args.workers)
+    if args.debug:
+        print(f"[debug] cwd={Path.cwd()} sources={[s.name for s in sources]} workers={workers}")
+
+    results, total = run_sources(sources, max_workers=workers, host_limits=DEFAULT_HOST_LIMITS, cache=cache)
+    if cache is not None:
+        print(f"[cache] {cache.summary()}")
+    for line in DEFAULT_CLIENT.summary():
+        print(f"[http] {line}")
+    if not args.dry_run:
+        derived = _run_derived()
+        results.extend(derived)
+        total += sum(r.seconds for r in derived)
+    _print_timings(results, total)
+    ok = not any(r.error for r in results)
+    instrument.finish(
+        args, "all", ok=ok, http=DEFAULT_CLIENT.metrics(), cache=None if cache is None else cache.stats
+    )
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,17 +2,35 @@
 from __future__ import annotations
 
 import argparse
+import contextvars
+import csv
+import importlib.util
 import json
-import subprocess
-import sys
+import math
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from time import sleep
+from types import ModuleType
+from urllib.parse import urlsplit
 
-import pandas as pd
 import requests
 
+import instrument
+import profiling
+from csv_io import atomic_write
+from debase_data.cache import refresh_cache
+from http_cache import CachingSession, add_cache_args, cache_from_args
+from http_client import DEFAULT_CLIENT, QuotaExceeded, RetryClient, check_response, make_session
+
+
+BLS_API_URL = "https://api.bls.gov/publicAPI/v1/timeseries/data/"
+# Per-request limits of the public API, and how many requests run at once.
+BLS_MAX_SERIES = 25
+BLS_MAX_YEARS = 20
+BLS_MAX_WORKERS = 4
+# Where a series without a CSV yet starts (CPI-U begins in 1913; BLS returns what exists).
+NEW_SERIES_START_YEAR = 1913
 
 MONTH_COLS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
 CSV_COLUMNS = ["Year", *MONTH_COLS, "HALF1", "HALF2"]
@@ -37,7 +55,17 @@ MONTH_NUM_TO_COL = {
 class CpiConfig:
     series_id: str
     cpi_csv: Path
-    generator_py: Path
+    # Daily series generator; None for extra series that only keep a monthly table.
+    generator_py: Path | None = None
+
+    @property
+    def name(self) -> str:
+        return "cpi" if self.generator_py is not None else f"cpi:{self.series_id}"
+
+    @property
+    def daily_csv(self) -> Path:
+        # The generator writes next to itself (datasets/daily_cpi_inflation.csv).
+        return self.generator_py.parent / "daily_cpi_inflation.csv"
 
 
 def _utc_year() -> int:
@@ -72,6 +100,8 @@ def _resolve_path(default_relative: str) -> Path:
 
 
 def _load_cpi_table(csv_path: Path) -> pd.DataFrame:
+    import pandas as pd
+
     if not csv_path.exists():
         raise FileNotFoundError(f"Missing CPI CSV: {csv_path}")
 
@@ -97,6 +127,8 @@ def _find_last_filled_month(df: pd.DataFrame) -> tuple[int, int]:
     """
     Returns (year, month_num) for the latest month that has a numeric CPI value.
     """
+    import pandas as pd
+
     for _, row in df.sort_values("Year", ascending=False).iterrows():
         year = int(row["Year"])
         for month_num in range(12, 0, -1):
@@ -107,77 +139,84 @@ def _find_last_filled_month(df: pd.DataFrame) -> tuple[int, int]:
     raise ValueError("Could not find any numeric CPI values in CPI_U.csv")
 
 
-def _find_update_start(df: pd.DataFrame) -> tuple[int, int]:
+def _bls_fetch(
+    series_ids: list[str],
+    start_year: int,
+    end_year: int,
+    debug: bool,
+    session: requests.Session | None = None,
+    url: str = BLS_API_URL,
+    client: RetryClient | None = None,
+) -> dict[str, list[dict]]:
     """
-    Decide the first (year, month) we should try to update.
-
-    Normally we append from the last filled month+1, but the latest year row can
-    sometimes contain placeholders (e.g. '-') creating "holes" (missing months)
-    even though later months are present. In that case, start at the first hole.
+    One BLS request for several series over one year range. Returns {series_id: data rows}.
     """
-    max_year = int(df["Year"].max())
-    row = df[df["Year"] == max_year].iloc[0]
-
-    vals = [pd.to_numeric(row[MONTH_NUM_TO_COL[m]], errors="coerce") for m in range(1, 13)]
-    numeric_months = [m for m, v in enumerate(vals, start=1) if pd.notna(v)]
-    if not numeric_months:
-        return max_year, 1
-
-    last_numeric = max(numeric_months)
-
-    # First hole before the last numeric month (e.g. '-' in Oct but Nov/Dec exist)
-    for m in range(1, last_numeric + 1):
-        if pd.isna(vals[m - 1]):
-            return max_year, m
-
-    # Otherwise, append after the last numeric month (if year incomplete)
-    if last_numeric < 12:
-        return max_year, last_numeric + 1
+    http = session or requests
+    payload = {"seriesid": list(series_ids), "startyear": str(start_year), "endyear": str(end_year)}
+    headers = {"Content-Type": "application/json"}
 
-    # Full year present: start at next year's Jan
-    return max_year + 1, 1
+    def attempt() -> dict[str, list[dict]]:
+        r = http.post(url, headers=headers, data=json.dumps(payload), timeout=20)
+        check_response(r)
+        instrument.add(bytes=len(r.content))
+        data = r.json()
+        if debug:
+            status = data.get("status")
+            print(f"[debug] bls {start_year}-{end_year} status={status} message={data.get('message')}")
+        if data.get("status") != "REQUEST_SUCCEEDED":
+            if isinstance(http, CachingSession):
+                http.discard(r)
+            message = f"BLS API status={data.get('status')} message={data.get('message')}"
+            if "threshold" in str(data.get("message", "")).lower():
+                # Daily request quota used up: retrying today won't help.
+                raise QuotaExceeded(message)
+            raise RuntimeError(message)
+
+        return {s["seriesID"]: s.get("data", []) for s in data["Results"]["series"]}
+
+    what = f"BLS series {','.join(series_ids)} {start_year}-{end_year}"
+    return (client or DEFAULT_CLIENT).call(urlsplit(url).hostname or "", attempt, what=what)
+
+
+def _bls_chunks(series_ids: list[str], start_year: int, end_year: int) -> list[tuple[list[str], int, int]]:
+    """
+    Split a fetch into requests of at most BLS_MAX_SERIES series x BLS_MAX_YEARS years.
+    """
+    chunks = []
+    for i in range(0, len(series_ids), BLS_MAX_SERIES):
+        batch = series_ids[i : i + BLS_MAX_SERIES]
+        for y in range(start_year, end_year + 1, BLS_MAX_YEARS):
+            chunks.append((batch, y, min(end_year, y + BLS_MAX_YEARS - 1)))
+    return chunks
 
-def _bls_fetch_series(series_id: str, start_year: int, end_year: int, debug: bool) -> list[dict]:
-    url = "https://api.bls.gov/publicAPI/v1/timeseries/data/"
-    payload = {"seriesid": [series_id], "startyear": str(start_year), "endyear": str(end_year)}
-    headers = {"Content-Type": "application/json"}
 
-    last_err: Exception | None = None
-    for attempt in range(1, 4):
-        try:
-            r = requests.post(url, headers=headers, data=json.dumps(payload), timeout=20)
-            r.raise_for_status()
-            data = r.json()
-            if debug:
-                status = data.get("status")
-                print(f"[debug] bls status={status} message={data.get('message')}")
-            if data.get("status") != "REQUEST_SUCCEEDED":
-                raise RuntimeError(f"BLS API status={data.get('status')} message={data.get('message')}")
-
-            series = data["Results"]["series"][0]
-            return series.get("data", [])
-        except Exception as e:
-            last_err = e
-            if attempt == 3:
-                break
-            sleep(1.5 * attempt)
-
-    raise RuntimeError(f"Failed to fetch BLS CPI series after retries: {last_err}")
-
-
-def _bls_fetch_series_range(series_id: str, start_year: int, end_year: int, debug: bool) -> list[dict]:
+def _bls_fetch_range(
+    series_ids: list[str],
+    start_year: int,
+    end_year: int,
+    debug: bool,
+    session: requests.Session | None = None,
+    url: str = BLS_API_URL,
+    max_workers: int = BLS_MAX_WORKERS,
+) -> dict[str, list[dict]]:
     """
-    Fetch BLS data in year chunks (public API can be finicky with large ranges).
+    Fetch several series over a year range: all series share each request, and the year chunks
+    (the public API can be finicky with large ranges) are requested concurrently.
     """
-    all_rows: list[dict] = []
-    chunk = 20
-    y = start_year
-    while y <= end_year:
-        y2 = min(end_year, y + chunk - 1)
-        rows = _bls_fetch_series(series_id, start_year=y, end_year=y2, debug=debug)
-        all_rows.extend(rows)
-        y = y2 + 1
-    return all_rows
+    chunks = _bls_chunks(series_ids, start_year, end_year)
+    rows: dict[str, list[dict]] = {series_id: [] for series_id in series_ids}
+    if not chunks:
+        return rows
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as pool:
+        # Each worker runs in a copy of the caller's context, so byte counts reach the open span.
+        futures = [
+            pool.submit(contextvars.copy_context().run, _bls_fetch, batch, y1, y2, debug, session, url)
+            for batch, y1, y2 in chunks
+        ]
+        for future in futures:
+            for series_id, data in future.result().items():
+                rows.setdefault(series_id, []).extend(data)
+    return rows
 
 
 def _extract_monthly_points(bls_rows: list[dict]) -> list[tuple[int, int, str]]:
@@ -200,7 +239,7 @@ def _extract_monthly_points(bls_rows: list[dict]) -> list[tuple[int, int, str]]:
         year = int(item["year"])
         value_str = str(item.get("value", "")).strip()
         # BLS can return placeholders like "-" for unavailable months.
-        if pd.isna(pd.to_numeric(value_str, errors="coerce")):
+        if not _is_number(value_str):
             continue
         out.append((year, month_num, value_str))
 
@@ -209,6 +248,8 @@ def _extract_monthly_points(bls_rows: list[dict]) -> list[tuple[int, int, str]]:
 
 
 def _ensure_year_row(df: pd.DataFrame, year: int) -> pd.DataFrame:
+    import pandas as pd
+
     if (df["Year"] == year).any():
         return df
     row = {c: "" for c in CSV_COLUMNS}
@@ -218,6 +259,8 @@ def _ensure_year_row(df: pd.DataFrame, year: int) -> pd.DataFrame:
 
 
 def _recalc_halves_for_year(df: pd.DataFrame, year: int) -> None:
+    import pandas as pd
+
     row_idx = df.index[df["Year"] == year]
     if len(row_idx) != 1:
         return
@@ -233,26 +276,161 @@ def _recalc_halves_for_year(df: pd.DataFrame, year: int) -> None:
     df.loc[i, "HALF2"] = avg_if_full(["Jul", "Aug", "Sep", "Oct", "Nov", "Dec"])
 
 
-def _years_with_missing_months(df: pd.DataFrame) -> set[int]:
-    missing: set[int] = set()
-    for _, row in df.iterrows():
-        y = int(row["Year"])
-        vals = pd.to_numeric(row[MONTH_COLS], errors="coerce")
-        # missing if any month cell is empty or non-numeric (NaN after coercion)
-        # but ignore full missing years (all NaN) if they ever exist
-        if vals.isna().any():
-            missing.add(y)
-    return missing
+_GENERATORS: dict[Path, ModuleType] = {}
 
 
-def update_cpi(
+def _load_generator(generator_py: Path) -> ModuleType:
+    """
+    Import the daily CPI generator from its path (it lives in datasets/, not on sys.path).
+    The module is loaded once per process.
+    """
+    if not generator_py.exists():
+        raise FileNotFoundError(f"Missing generator script: {generator_py}")
+    key = generator_py.resolve()
+    module = _GENERATORS.get(key)
+    if module is None:
+        spec = importlib.util.spec_from_file_location("generator_cpi_daily", generator_py)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _GENERATORS[key] = module
+    return module
+
+
+def _regenerate_daily(
     cfg: CpiConfig,
-    end_year: int,
-    dry_run: bool,
-    debug: bool,
-    lookback_years: int,
-    overwrite_existing: bool,
+    df: pd.DataFrame,
+    touched_cells: set[tuple[int, int]],
+    full: bool,
+    verify: bool,
+) -> None:
+    """
+    Refresh the daily CPI series in-process from the in-memory monthly table.
+
+    By default only the interpolation segments around `touched_cells` (plus the extrapolated
+    tail) are recomputed and spliced into the existing daily file.
+    """
+    generator = _load_generator(cfg.generator_py)
+    if full:
+        print(f"[cpi] regenerating daily CPI (full) into {cfg.daily_csv}")
+        generator.write_daily_cpi(generator.generate_daily_cpi(df), cfg.daily_csv)
+        refresh_cache(cfg.daily_csv)
+        return
+
+    print(f"[cpi] regenerating daily CPI (incremental, months={sorted(touched_cells)}) into {cfg.daily_csv}")
+    written = generator.update_daily_cpi(df, cfg.daily_csv, touched=touched_cells, verify=verify)
+    extra = ", verified against full rebuild" if verify else ""
+    print(f"[cpi] daily CPI: rewrote {written} rows{extra}")
+    refresh_cache(cfg.daily_csv)
+
+
+def _write_outputs(
+    cfg: CpiConfig,
+    df: pd.DataFrame,
+    touched_cells: set[tuple[int, int]],
+    full_daily: bool,
+    verify_daily: bool,
+    note: str = "",
 ) -> None:
+    """
+    Write the monthly table and, for the main series, the daily CPI derived from the same
+    in-memory table (no re-read of the monthly CSV, no generator subprocess).
+    """
+    with instrument.span("write", rows=len(df)) as sp:
+        atomic_write(cfg.cpi_csv, lambda f: df.to_csv(f, index=False))
+        sp.add(bytes=cfg.cpi_csv.stat().st_size)
+    print(f"[{cfg.name}] wrote {cfg.cpi_csv}{note}")
+    if cfg.generator_py is not None:
+        with instrument.span("regenerate"):
+            _regenerate_daily(cfg, df, touched_cells, full=full_daily, verify=verify_daily)
+
+
+@dataclass(frozen=True)
+class TableScan:
+    """
+    A monthly table as the up-to-date check sees it, read with the standard library: pandas is
+    only imported once a table actually has to change.
+    """
+
+    cells: dict[tuple[int, int], str]  # (year, month) -> cell, "" for blanks and placeholders
+    years: list[int]
+    placeholders: bool  # non-numeric cells such as "-" that a rewrite would clear
+
+    def refresh_start(self, lookback_years: int) -> int:
+        """
+        First year to fetch: always a recent window (BLS can publish previously-missing months
+        later), extended back to any year that still has missing months.
+        """
+        if not self.years:
+            return NEW_SERIES_START_YEAR
+        start = max(min(self.years), max(self.years) - max(0, lookback_years))
+        missing = [y for y in self.years if any((y, m) not in self.cells for m in range(1, 13))]
+        return min([start, *missing])
+
+    def last_filled(self) -> tuple[int, int]:
+        if not self.cells:
+            raise ValueError("Could not find any numeric CPI values in CPI_U.csv")
+        return max(self.cells)
+
+    def changes(self, points: list[tuple[int, int, str]], overwrite_existing: bool) -> bool:
+        """True if merging `points` would write any cell (same rule as `_merge_points`)."""
+        for y, m, v in points:
+            cur = self.cells.get((y, m))
+            if cur is None or (overwrite_existing and float(cur) != float(v)):
+                return True
+        return False
+
+
+def _is_number(value: str) -> bool:
+    # What pd.to_numeric(errors="coerce") keeps: "", "-" and "nan" are not numbers.
+    try:
+        return not math.isnan(float(value))
+    except ValueError:
+        return False
+
+
+def _scan_table(cfg: CpiConfig) -> TableScan:
+    if not cfg.cpi_csv.exists():
+        if cfg.generator_py is None:
+            # A newly tracked series: start from an empty table and fetch its whole history.
+            print(f"[{cfg.name}] {cfg.cpi_csv} not found, fetching from {NEW_SERIES_START_YEAR}")
+            return TableScan(cells={}, years=[], placeholders=False)
+        raise FileNotFoundError(f"Missing CPI CSV: {cfg.cpi_csv}")
+
+    cells: dict[tuple[int, int], str] = {}
+    years: list[int] = []
+    placeholders = False
+    with open(cfg.cpi_csv, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        if "Year" not in (reader.fieldnames or []):
+            raise ValueError(f"{cfg.cpi_csv} has no 'Year' column")
+        for row in reader:
+            try:
+                year = int(float(row["Year"]))
+            except (TypeError, ValueError):
+                continue
+            years.append(year)
+            for col in [*MONTH_COLS, "HALF1", "HALF2"]:
+                value = (row.get(col) or "").strip()
+                if value and not _is_number(value):
+                    placeholders = True
+            for m, col in MONTH_NUM_TO_COL.items():
+                value = (row.get(col) or "").strip()
+                if _is_number(value):
+                    cells[(year, m)] = value
+    if not years:
+        raise ValueError(f"{cfg.cpi_csv} has no rows")
+    return TableScan(cells=cells, years=sorted(years), placeholders=placeholders)
+
+
+def _prepare_table(cfg: CpiConfig) -> tuple[pd.DataFrame, bool]:
+    """
+    Load and normalize a series' table. Returns (table, placeholders cleaned?).
+    """
+    import pandas as pd
+
+    if not cfg.cpi_csv.exists() and cfg.generator_py is None:
+        return pd.DataFrame(columns=CSV_COLUMNS).astype({"Year": int}), False
+
     df = _load_cpi_table(cfg.cpi_csv)
 
     # Normalize: remove any non-numeric placeholders like "-" from numeric fields.
@@ -265,53 +443,28 @@ def update_cpi(
         if mask.any():
             df.loc[mask, col] = ""
             cleaned_any = True
+    return df, cleaned_any
 
-    last_year, last_month = _find_last_filled_month(df)
-
-    # Always refresh a recent window (BLS can publish previously-missing months later),
-    # and also revisit any years that still have missing months.
-    min_year = int(df["Year"].min())
-    max_year = int(df["Year"].max())
-    window_start = max(min_year, max_year - max(0, lookback_years))
-    missing_years = _years_with_missing_months(df)
-    if missing_years:
-        window_start = min(window_start, min(missing_years))
-
-    start_year = window_start
-    start_month = 1
-
-    if start_year > end_year:
-        print(f"[cpi] up to date (last={last_year}-{last_month:02d})")
-        return
 
-    if debug:
-        print(f"[debug] cpi_csv={cfg.cpi_csv} exists={cfg.cpi_csv.exists()}")
-        print(f"[debug] generator_py={cfg.generator_py} exists={cfg.generator_py.exists()}")
-        print(f"[debug] updating series={cfg.series_id} from {start_year} to {end_year} (lookback_years={lookback_years})")
-        print(f"[debug] overwrite_existing={overwrite_existing} missing_years={sorted(missing_years)}")
+def _merge_points(
+    df: pd.DataFrame,
+    bls_rows: list[dict],
+    start_year: int,
+    end_year: int,
+    overwrite_existing: bool,
+) -> tuple[pd.DataFrame, list[tuple[int, int, str]], set[int], set[tuple[int, int]]]:
+    """
+    Write the BLS values for [start_year, end_year] into the table. Returns (table, points in
+    range, touched years, touched (year, month) cells).
+    """
+    import pandas as pd
 
-    bls_rows = _bls_fetch_series_range(cfg.series_id, start_year=start_year, end_year=end_year, debug=debug)
     points = _extract_monthly_points(bls_rows)
 
     to_apply = [(y, m, v) for (y, m, v) in points if start_year <= y <= end_year]
 
-    if not to_apply:
-        if cleaned_any:
-            if dry_run:
-                print("[cpi] dry-run: would normalize non-numeric placeholders in CPI_U.csv")
-                return
-            cfg.cpi_csv.parent.mkdir(parents=True, exist_ok=True)
-            df.to_csv(cfg.cpi_csv, index=False)
-            print(f"[cpi] wrote {cfg.cpi_csv} (normalized placeholders)")
-            print(f"[cpi] regenerating daily CPI via {cfg.generator_py.name}")
-            subprocess.run([sys.executable, cfg.generator_py.name], cwd=str(cfg.generator_py.parent), check=True)
-            return
-
-        print("[cpi] no new monthly points returned (nothing to update)")
-        return
-
     touched_years: set[int] = set()
-    changed_cells = 0
+    touched_cells: set[tuple[int, int]] = set()
     for y, m, v in to_apply:
         df = _ensure_year_row(df, y)
         col = MONTH_NUM_TO_COL[m]
@@ -333,35 +486,168 @@ def update_cpi(
         if should_write:
             df.loc[df["Year"] == y, col] = str(v)
             touched_years.add(y)
-            changed_cells += 1
+            touched_cells.add((y, m))
 
     for y in sorted(touched_years):
         _recalc_halves_for_year(df, y)
 
     df = df.sort_values("Year").reset_index(drop=True)
+    return df, to_apply, touched_years, touched_cells
+
+
+def _apply_update(
+    cfg: CpiConfig,
+    df: pd.DataFrame,
+    cleaned_any: bool,
+    start_year: int,
+    end_year: int,
+    bls_rows: list[dict],
+    dry_run: bool,
+    overwrite_existing: bool,
+    full_daily: bool,
+    verify_daily: bool,
+) -> None:
+    with instrument.span("merge") as sp:
+        df, to_apply, touched_years, touched_cells = _merge_points(
+            df, bls_rows, start_year, end_year, overwrite_existing
+        )
+        sp.add(rows=len(touched_cells))
+
+    if not to_apply:
+        if cleaned_any:
+            if dry_run:
+                print(f"[{cfg.name}] dry-run: would normalize non-numeric placeholders in {cfg.cpi_csv.name}")
+                return
+            _write_outputs(cfg, df, set(), full_daily, verify_daily, note=" (normalized placeholders)")
+            return
+
+        print(f"[{cfg.name}] no new monthly points returned (nothing to update)")
+        return
+
+    changed_cells = len(touched_cells)
 
     if dry_run:
-        max_year = max(touched_years) if touched_years else last_year
+        max_year = max(touched_years) if touched_years else _find_last_filled_month(df)[0]
         extra = " + normalize placeholders" if cleaned_any else ""
         print(
-            f"[cpi] dry-run: would update years={sorted(touched_years)} "
+            f"[{cfg.name}] dry-run: would update years={sorted(touched_years)} "
             f"(latest touched={max_year}), changed_cells={changed_cells}{extra}"
         )
         return
 
     if not touched_years and not cleaned_any:
-        print("[cpi] nothing changed")
+        print(f"[{cfg.name}] nothing changed")
         return
 
-    cfg.cpi_csv.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(cfg.cpi_csv, index=False)
-    print(f"[cpi] wrote {cfg.cpi_csv}")
+    _write_outputs(cfg, df, touched_cells, full_daily, verify_daily)
+
 
-    # Regenerate daily CPI series
-    if not cfg.generator_py.exists():
-        raise FileNotFoundError(f"Missing generator script: {cfg.generator_py}")
-    print(f"[cpi] regenerating daily CPI via {cfg.generator_py.name}")
-    subprocess.run([sys.executable, cfg.generator_py.name], cwd=str(cfg.generator_py.parent), check=True)
+def update_cpi_series(
+    configs: list[CpiConfig],
+    end_year: int,
+    dry_run: bool,
+    debug: bool,
+    lookback_years: int,
+    overwrite_existing: bool,
+    full_daily: bool = False,
+    verify_daily: bool = False,
+    session: requests.Session | None = None,
+    bls_url: str = BLS_API_URL,
+) -> None:
+    """
+    Update several BLS series, each into its own table, with one set of requests: every request
+    carries all series, over the union of their refresh windows.
+
+    Tables are scanned with the standard library first; one is only loaded into pandas when the
+    fetched months would change it.
+    """
+    pending = []
+    for cfg in configs:
+        with instrument.source(cfg.name), instrument.span("read") as sp:
+            scan = _scan_table(cfg)
+            start_year = scan.refresh_start(lookback_years)
+            sp.add(rows=len(scan.years))
+        if start_year > end_year:
+            last_year, last_month = scan.last_filled()
+            print(f"[{cfg.name}] up to date (last={last_year}-{last_month:02d})")
+            continue
+        if debug:
+            print(f"[debug] {cfg.name}: csv={cfg.cpi_csv} exists={cfg.cpi_csv.exists()} generator={cfg.generator_py}")
+            print(f"[debug] {cfg.name}: updating series={cfg.series_id} from {start_year} to {end_year} "
+                  f"(lookback_years={lookback_years}, overwrite_existing={overwrite_existing})")
+        pending.append((cfg, scan, start_year))
+    if not pending:
+        return
+
+    series_ids = list(dict.fromkeys(cfg.series_id for cfg, *_ in pending))
+    fetch_start = min(start_year for *_, start_year in pending)
+    with instrument.span("fetch") as sp:
+        bls_rows = _bls_fetch_range(
+            series_ids, start_year=fetch_start, end_year=end_year, debug=debug, session=session, url=bls_url
+        )
+        sp.add(rows=sum(len(rows) for rows in bls_rows.values()))
+    for cfg, scan, start_year in pending:
+        rows = bls_rows.get(cfg.series_id, [])
+        points = [p for p in _extract_monthly_points(rows) if start_year <= p[0] <= end_year]
+        if not scan.placeholders and not scan.changes(points, overwrite_existing):
+            if not points:
+                print(f"[{cfg.name}] no new monthly points returned (nothing to update)")
+            else:
+                last_year, last_month = scan.last_filled()
+                print(f"[{cfg.name}] nothing changed (last={last_year}-{last_month:02d})")
+            continue
+        with instrument.source(cfg.name):
+            with instrument.span("read") as sp:
+                df, cleaned_any = _prepare_table(cfg)
+                sp.add(rows=len(df))
+            _apply_update(
+                cfg,
+                df,
+                cleaned_any,
+                start_year,
+                end_year,
+                rows,
+                dry_run=dry_run,
+                overwrite_existing=overwrite_existing,
+                full_daily=full_daily,
+                verify_daily=verify_daily,
+            )
+
+
+def update_cpi(
+    cfg: CpiConfig,
+    end_year: int,
+    dry_run: bool,
+    debug: bool,
+    lookback_years: int,
+    overwrite_existing: bool,
+    full_daily: bool = False,
+    verify_daily: bool = False,
+    session: requests.Session | None = None,
+    bls_url: str = BLS_API_URL,
+) -> None:
+    update_cpi_series(
+        [cfg],
+        end_year=end_year,
+        dry_run=dry_run,
+        debug=debug,
+        lookback_years=lookback_years,
+        overwrite_existing=overwrite_existing,
+        full_daily=full_daily,
+        verify_daily=verify_daily,
+        session=session,
+        bls_url=bls_url,
+    )
+
+
+def _parse_extra_series(specs: list[str]) -> list[CpiConfig]:
+    configs = []
+    for spec in specs:
+        series_id, sep, csv_path = spec.partition("=")
+        if not sep or not series_id or not csv_path:
+            raise SystemExit(f"--extra-series expects SERIES_ID=CSV_PATH, got {spec!r}")
+        configs.append(CpiConfig(series_id=series_id.strip(), cpi_csv=_resolve_path(csv_path.strip())))
+    return configs
 
 
 def main() -> int:
@@ -373,6 +659,15 @@ def main() -> int:
         default="datasets/generator_cpi_daily.py",
         help="Path to generator script (default: datasets/generator_cpi_daily.py)",
     )
+    parser.add_argument(
+        "--extra-series",
+        nargs="+",
+        default=[],
+        metavar="SERIES_ID=CSV_PATH",
+        help="More BLS series to keep, each in its own monthly table (e.g. CUUR0000SA0L1E=datasets/CPI_core.csv); "
+        "fetched in the same requests as --series-id",
+    )
+    parser.add_argument("--bls-url", default=BLS_API_URL, help=f"BLS timeseries endpoint (default: {BLS_API_URL})")
     parser.add_argument("--end-year", type=int, default=None, help="End year (default: current UTC year)")
     parser.add_argument(
         "--lookback-years",
@@ -385,24 +680,58 @@ def main() -> int:
         action="store_true",
         help="Do not overwrite existing numeric CPI values; only fill missing/blank months.",
     )
+    parser.add_argument(
+        "--full-daily",
+        action="store_true",
+        help="Rebuild the whole daily CPI series instead of splicing only the touched months.",
+    )
+    parser.add_argument(
+        "--verify-daily",
+        action="store_true",
+        help="After an incremental daily update, compare it against a full rebuild (fails on mismatch).",
+    )
     parser.add_argument("--dry-run", action="store_true", help="Fetch and compute updates without writing files.")
     parser.add_argument("--debug", action="store_true", help="Print debug info.")
+    add_cache_args(parser)
+    instrument.add_metrics_args(parser)
+    profiling.add_profile_args(parser)
     args = parser.parse_args()
-
-    cfg = CpiConfig(
-        series_id=args.series_id,
-        cpi_csv=_resolve_path(args.cpi_path),
-        generator_py=_resolve_path(args.generator_path),
-    )
+    profiling.start(args, "update_cpi")
+
+    configs = [
+        CpiConfig(
+            series_id=args.series_id,
+            cpi_csv=_resolve_path(args.cpi_path),
+            generator_py=_resolve_path(args.generator_path),
+        ),
+        *_parse_extra_series(args.extra_series),
+    ]
     end_year = _utc_year() if args.end_year is None else int(args.end_year)
-    update_cpi(
-        cfg,
-        end_year=end_year,
-        dry_run=args.dry_run,
-        debug=args.debug,
-        lookback_years=int(args.lookback_years),
-        overwrite_existing=not args.no_overwrite,
-    )
+    cache = cache_from_args(args)
+    ok = False
+    try:
+        with instrument.source("cpi"):
+            update_cpi_series(
+                configs,
+                end_year=end_year,
+                dry_run=args.dry_run,
+                debug=args.debug,
+                lookback_years=int(args.lookback_years),
+                overwrite_existing=not args.no_overwrite,
+                full_daily=args.full_daily,
+                verify_daily=args.verify_daily,
+                session=make_session(cache),
+                bls_url=args.bls_url,
+            )
+        ok = True
+    finally:
+        if cache is not None:
+            print(f"[cache] {cache.summary()}")
+        for line in DEFAULT_CLIENT.summary():
+            print(f"[http] {line}")
+        instrument.finish(
+            args, "cpi", ok=ok, http=DEFAULT_CLIENT.metrics(), cache=None if cache is None else cache.stats
+        )
     return 0
 
 
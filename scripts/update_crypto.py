@@ -5,11 +5,17 @@ import argparse
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from time import sleep
+from urllib.parse import urlsplit
 
-import pandas as pd
 import requests
 
+import instrument
+import profiling
+from csv_io import append_text, atomic_write, can_append, read_dates, read_max_date
+from debase_data.cache import refresh_cache
+from http_cache import CachingSession, add_cache_args, cache_from_args
+from http_client import DEFAULT_CLIENT, RateLimited, RequestRejected, RetryClient, check_response, make_session
+
 
 @dataclass(frozen=True)
 class Crypto:
@@ -20,6 +26,17 @@ class Crypto:
 
 CSV_COLUMNS = ["Start", "End", "Open", "High", "Low", "Close", "Volume", "Market Cap"]
 
+KRAKEN_OHLC_URL = "https://api.kraken.com/0/public/OHLC"
+# Kraken returns at most this many candles per OHLC call, and only serves the latest this many
+# daily candles at all: older holes can only be filled from a bulk dump (import_kraken_dump.py).
+KRAKEN_MAX_CANDLES = 720
+# Error strings Kraken sends (with HTTP 200) when throttling us, and how long to back off.
+KRAKEN_RATE_LIMIT_ERRORS = ("EAPI:Rate limit exceeded", "EGeneral:Too many requests")
+KRAKEN_RATE_LIMIT_WAIT = 10.0
+# Error prefixes for requests Kraken refuses as such (unknown pair, bad arguments): not retried.
+KRAKEN_REJECTED_ERRORS = ("EQuery:", "EGeneral:Invalid arguments")
+DAY_SECONDS = 86400
+
 
 def _utc_today() -> date:
     return datetime.now(timezone.utc).date()
@@ -46,63 +63,165 @@ def _resolve_dataset_path(default_relative: str) -> Path:
 
 
 def _read_last_date(csv_path: Path) -> date | None:
-    if not csv_path.exists() or csv_path.stat().st_size == 0:
-        return None
-
-    df = pd.read_csv(csv_path, usecols=["End"])
-    if df.empty:
-        return None
-
-    parsed = pd.to_datetime(df["End"], errors="coerce", utc=True)
-    parsed = parsed.dropna()
-    if parsed.empty:
-        return None
-
-    return parsed.max().date()
+    # Reads only the first/last few KB when the file is date-sorted (full scan otherwise).
+    return read_max_date(csv_path, "End")
 
 
-def _fetch_kraken_ohlc(pair: str, since: int) -> list[dict]:
-    url = (
-        f"https://api.kraken.com/0/public/OHLC?pair={pair}&interval=1440&since={since}"
-    )
-
-    last_err: Exception | None = None
-    for attempt in range(1, 4):
-        try:
-            r = requests.get(url, timeout=20)
-            r.raise_for_status()
-            data = r.json()
-
-            if data.get("error"):
-                raise RuntimeError(f"Kraken API error: {data['error']}")
-
-            result = data.get("result", {})
-            result_pair = list(result.keys())[0]
-            ohlc_data = result[result_pair]
-
-            return [
-                {
-                    "timestamp": int(row[0]),
-                    "open": float(row[1]),
-                    "high": float(row[2]),
-                    "low": float(row[3]),
-                    "close": float(row[4]),
-                    "vwap": float(row[5]),
-                    "volume": float(row[6]),
-                    "count": int(row[7]),
-                }
-                for row in ohlc_data
-            ]
-        except Exception as e:
-            last_err = e
-            if attempt == 3:
-                break
-            sleep(1.5 * attempt)
+def _read_start_dates(csv_path: Path) -> list[date]:
+    """Sorted unique `Start` days, read without pandas (it only decides whether to fetch)."""
+    if not csv_path.exists() or csv_path.stat().st_size == 0:
+        return []
+    return sorted(set(read_dates(csv_path, "Start")))
+
+
+def _find_missing_ranges(starts: list[date], end: date) -> list[tuple[date, date]]:
+    """
+    Inclusive (first, last) day ranges missing from the sorted `Start` dates: holes between the
+    first and last existing day, plus the tail after the last day up to `end`.
+    """
+    if not starts:
+        return []
+
+    days = [d.toordinal() for d in starts]
+    holes = [(a + 1, b - 1) for a, b in zip(days, days[1:]) if b - a > 1]
+
+    end_day = end.toordinal()
+    if days[-1] < end_day:
+        holes.append((days[-1] + 1, end_day))
+
+    return [(date.fromordinal(a), date.fromordinal(b)) for a, b in holes]
+
+
+def _split_fetchable(
+    missing: list[tuple[date, date]], oldest: date | None
+) -> tuple[list[tuple[date, date]], list[tuple[date, date]]]:
+    """
+    Split missing ranges at `oldest`, the first day the OHLC API still serves (None: no limit).
+    Returns (ranges to fetch, ranges before `oldest`); a range that straddles it is cut in two.
+    """
+    if oldest is None:
+        return missing, []
+    fetchable, too_old = [], []
+    for first, last in missing:
+        if first >= oldest:
+            fetchable.append((first, last))
+        elif last < oldest:
+            too_old.append((first, last))
+        else:
+            too_old.append((first, oldest - timedelta(days=1)))
+            fetchable.append((oldest, last))
+    return fetchable, too_old
+
+
+def _plan_fetch_windows(
+    missing: list[tuple[date, date]], max_days: int = KRAKEN_MAX_CANDLES
+) -> list[tuple[date, date]]:
+    """
+    Coalesce missing ranges that are close together into fetch windows, so nearby holes
+    share the same OHLC pages instead of re-downloading them.
+    """
+    windows: list[tuple[date, date]] = []
+    for first, last in sorted(missing):
+        if windows and (first - windows[-1][1]).days <= max_days:
+            windows[-1] = (windows[-1][0], max(windows[-1][1], last))
+        else:
+            windows.append((first, last))
+    return windows
+
+
+def _day_ts(d: date) -> int:
+    return int(datetime.combine(d, datetime.min.time()).replace(tzinfo=timezone.utc).timestamp())
+
+
+def _fetch_kraken_ohlc(
+    pair: str,
+    since: int,
+    base_url: str = KRAKEN_OHLC_URL,
+    session: requests.Session | None = None,
+    client: RetryClient | None = None,
+) -> tuple[list[dict], int]:
+    """
+    One OHLC call (at most KRAKEN_MAX_CANDLES daily candles).
+
+    Returns (rows, last) where `last` is Kraken's cursor to pass as `since` for the next page.
+    """
+    url = f"{base_url}?pair={pair}&interval=1440&since={since}"
+    http = session or requests
+
+    def attempt() -> tuple[list[dict], int]:
+        r = http.get(url, timeout=20)
+        check_response(r)
+        instrument.add(bytes=len(r.content))
+        data = r.json()
+
+        if data.get("error"):
+            if isinstance(http, CachingSession):
+                http.discard(r)
+            errors = ", ".join(data["error"])
+            if any(e in errors for e in KRAKEN_RATE_LIMIT_ERRORS):
+                raise RateLimited(f"Kraken API error: {errors}", retry_after=KRAKEN_RATE_LIMIT_WAIT)
+            if any(e.startswith(KRAKEN_REJECTED_ERRORS) for e in data["error"]):
+                raise RequestRejected(f"Kraken API error: {data['error']}")
+            raise RuntimeError(f"Kraken API error: {data['error']}")
+
+        result = data.get("result", {})
+        result_pair = next(k for k in result if k != "last")
+        ohlc_data = result[result_pair]
+
+        rows = [
+            {
+                "timestamp": int(row[0]),
+                "open": float(row[1]),
+                "high": float(row[2]),
+                "low": float(row[3]),
+                "close": float(row[4]),
+                "vwap": float(row[5]),
+                "volume": float(row[6]),
+                "count": int(row[7]),
+            }
+            for row in ohlc_data
+        ]
+        return rows, int(result.get("last", 0) or 0)
+
+    return (client or DEFAULT_CLIENT).call(urlsplit(url).hostname or "", attempt, what=f"Kraken {pair}")
+
+
+def _fetch_kraken_ohlc_paged(
+    pair: str,
+    first: date,
+    last: date,
+    base_url: str = KRAKEN_OHLC_URL,
+    debug: bool = False,
+    session: requests.Session | None = None,
+) -> list[dict]:
+    """
+    Fetch daily candles for [first, last] (inclusive), following Kraken's `last` cursor page by
+    page until it reaches `last` (or Kraken stops returning anything newer).
+    """
+    start_ts = _day_ts(first)
+    end_ts = _day_ts(last + timedelta(days=1))  # exclusive
+    max_pages = (last - first).days // KRAKEN_MAX_CANDLES + 2
+
+    by_ts: dict[int, dict] = {}
+    cursor = start_ts - 1  # Kraken's `since` is exclusive on some endpoints; keep day `first`
+    for page in range(1, max_pages + 1):
+        rows, next_cursor = _fetch_kraken_ohlc(
+            pair, since=cursor, base_url=base_url, session=session
+        )
+        for row in rows:
+            by_ts[row["timestamp"]] = row
+        if debug:
+            print(f"[debug] {pair} page={page} since={cursor} rows={len(rows)} last={next_cursor}")
+        if not rows or next_cursor <= cursor or next_cursor >= end_ts:
+            break
+        cursor = next_cursor
 
-    raise RuntimeError(f"Failed to fetch Kraken {pair} after retries: {last_err}")
+    return [by_ts[ts] for ts in sorted(by_ts) if start_ts <= ts < end_ts]
 
 
 def _convert_to_csv_format(rows: list[dict]) -> pd.DataFrame:
+    import pandas as pd
+
     out = []
     for row in rows:
         ts = row["timestamp"]
@@ -124,11 +243,31 @@ def _convert_to_csv_format(rows: list[dict]) -> pd.DataFrame:
     return pd.DataFrame(out, columns=CSV_COLUMNS)
 
 
+def _read_existing(csv_path: Path) -> pd.DataFrame:
+    import pandas as pd
+
+    # round_trip keeps re-written prices byte-identical to what was in the file
+    return pd.read_csv(csv_path, float_precision="round_trip")
+
+
+def _sort_canonical(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Canonical row order for crypto CSVs: ascending by `Start`, one row per day.
+    """
+    import pandas as pd
+
+    df = df.drop_duplicates(subset=["Start"], keep="first")
+    order = pd.to_datetime(df["Start"], errors="coerce").argsort(kind="stable")
+    return df.iloc[order].reset_index(drop=True)
+
+
 def _merge_append(
     existing_csv: Path, new_rows: pd.DataFrame
 ) -> tuple[pd.DataFrame, int]:
+    import pandas as pd
+
     if existing_csv.exists() and existing_csv.stat().st_size > 0:
-        existing = pd.read_csv(existing_csv)
+        existing = _read_existing(existing_csv)
     else:
         existing = pd.DataFrame(columns=CSV_COLUMNS)
 
@@ -146,70 +285,174 @@ def _merge_append(
             [new_rows[CSV_COLUMNS], existing[CSV_COLUMNS]], ignore_index=True
         )
 
-    before = len(merged)
-    merged = merged.drop_duplicates(subset=["Start", "End"], keep="first")
-    after = len(merged)
+    # New rows come first, so they win over existing rows for the same day.
+    merged = _sort_canonical(merged[CSV_COLUMNS])
+    return merged, len(merged)
+
 
-    return merged[CSV_COLUMNS], after
+def _try_append(csv_path: Path, new_rows: pd.DataFrame, dry_run: bool) -> bool:
+    """
+    Append `new_rows` in place when they all come strictly after the file's last `Start`
+    and the file is sorted; returns False when a full merge-rewrite is needed instead.
+    """
+    import pandas as pd
+
+    new_dates = [d.date() for d in pd.to_datetime(new_rows["Start"])]
+    if not can_append(csv_path, "Start", CSV_COLUMNS, new_dates):
+        return False
+    if not dry_run:
+        text = new_rows[CSV_COLUMNS].to_csv(index=False, header=False)
+        with instrument.span("write"):
+            append_text(csv_path, text)
+            instrument.add(rows=len(new_rows), bytes=len(text))
+            refresh_cache(csv_path)
+    return True
 
 
 def _write_csv(csv_path: Path, df: pd.DataFrame) -> None:
-    csv_path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(csv_path, index=False)
+    # temp file + atomic rename: readers never see a half-written file
+    atomic_write(csv_path, lambda f: df.to_csv(f, index=False))
+    instrument.add(rows=len(df), bytes=csv_path.stat().st_size)
+    refresh_cache(csv_path)
+
+
+def migrate_sort(crypto: Crypto, dry_run: bool) -> None:
+    """
+    One-shot migration: rewrite an existing crypto CSV in canonical ascending `Start` order.
+    Older runs prepended new rows, leaving files like bitcoin_*.csv out of order.
+    """
+    import pandas as pd
+
+    if not crypto.csv_path.exists() or crypto.csv_path.stat().st_size == 0:
+        print(f"[{crypto.name}] nothing to migrate ({crypto.csv_path} missing or empty)")
+        return
+
+    existing = _read_existing(crypto.csv_path)
+    for col in CSV_COLUMNS:
+        if col not in existing.columns:
+            existing[col] = pd.NA
+    canonical = _sort_canonical(existing[CSV_COLUMNS])
 
+    already = len(canonical) == len(existing) and canonical["Start"].equals(existing["Start"])
+    if already:
+        print(f"[{crypto.name}] already in canonical order ({len(existing)} rows)")
+        return
+    if dry_run:
+        print(f"[{crypto.name}] dry-run: would rewrite {len(canonical)} rows in ascending order")
+        return
 
-def update_crypto(crypto: Crypto, end: date, dry_run: bool, debug: bool) -> None:
+    _write_csv(crypto.csv_path, canonical)
+    dropped = len(existing) - len(canonical)
+    print(f"[{crypto.name}] rewrote {len(canonical)} rows in ascending order (dropped {dropped} duplicates)")
+
+
+def update_crypto(
+    crypto: Crypto,
+    end: date,
+    dry_run: bool,
+    debug: bool,
+    base_url: str = KRAKEN_OHLC_URL,
+    session: requests.Session | None = None,
+    history_days: int | None = KRAKEN_MAX_CANDLES,
+) -> None:
+    """
+    Fill the missing days of `crypto.csv_path` up to `end`. Only holes within the last
+    `history_days` days (what the OHLC API serves; None for no limit, e.g. a local stub) are
+    fetched; older ones are reported and left to `import_kraken_dump.py`.
+    """
     if not crypto.csv_path.exists():
         print(
             f"[{crypto.name}] WARNING: {crypto.csv_path} not found "
             f"(CWD={Path.cwd()}; are you mounting the repo root into /work?)"
         )
 
-    last = _read_last_date(crypto.csv_path)
-    if last is None:
+    with instrument.span("read") as sp:
+        starts = _read_start_dates(crypto.csv_path)
+        sp.add(rows=len(starts))
+    if not starts:
         print(
             f"[{crypto.name}] No existing data found, please provide initial CSV manually"
         )
         return
 
-    start_date = last + timedelta(days=1)
-
-    if start_date > end:
-        print(f"[{crypto.name}] up to date (last={last})")
+    oldest = None if history_days is None else _utc_today() - timedelta(days=history_days - 1)
+    missing, too_old = _split_fetchable(_find_missing_ranges(starts, end), oldest)
+    note = ""
+    if too_old:
+        old_days = sum((last - first).days + 1 for first, last in too_old)
+        note = (
+            f" ({old_days} missing days before {oldest} are older than the API serves, "
+            f"see import_kraken_dump.py)"
+        )
+    if not missing:
+        print(f"[{crypto.name}] up to date (last={starts[-1]}){note}")
         return
 
-    since_ts = int(
-        datetime.combine(start_date, datetime.min.time())
-        .replace(tzinfo=timezone.utc)
-        .timestamp()
-    )
+    missing_days = {
+        (first + timedelta(days=i)).isoformat()
+        for first, last in missing
+        for i in range((last - first).days + 1)
+    }
+    windows = _plan_fetch_windows(missing)
 
     if debug:
-        print(f"[debug] fetching {crypto.pair} since {start_date} (ts={since_ts})")
+        print(f"[debug] {crypto.pair} missing ranges={missing} fetch windows={windows}")
 
-    print(f"[{crypto.name}] downloading {crypto.pair} from {start_date} to {end}")
-    rows = _fetch_kraken_ohlc(crypto.pair, since=since_ts)
-
-    if not rows:
+    print(
+        f"[{crypto.name}] downloading {crypto.pair}: {len(missing_days)} missing days "
+        f"in {len(missing)} ranges ({len(windows)} fetch windows), up to {end}{note}"
+    )
+    rows: list[dict] = []
+    with instrument.span("fetch") as sp:
+        for first, last in windows:
+            rows.extend(
+                _fetch_kraken_ohlc_paged(
+                    crypto.pair, first, last, base_url=base_url, debug=debug, session=session
+                )
+            )
+        sp.add(rows=len(rows))
+
+    with instrument.span("parse") as sp:
+        new_df = _convert_to_csv_format(rows)
+        # Only fill the holes; days we already have are left untouched.
+        new_df = new_df[new_df["Start"].isin(missing_days)].drop_duplicates(subset=["Start"])
+        new_df = new_df.sort_values("Start").reset_index(drop=True)
+        sp.add(rows=len(new_df))
+
+    if new_df.empty:
         print(f"[{crypto.name}] no new data returned")
         return
 
-    new_df = _convert_to_csv_format(rows)
+    still_missing = len(missing_days) - len(new_df)
+    added = len(new_df)
+
+    # Fast path: only new trailing days -> append them instead of rewriting the history.
+    appended = _try_append(crypto.csv_path, new_df, dry_run=dry_run)
+    if appended:
+        if dry_run:
+            print(f"[{crypto.name}] dry-run: would append {added} rows (still missing={still_missing})")
+            return
+        new_last = _read_last_date(crypto.csv_path)
+        print(f"[{crypto.name}] appended {added} rows (still missing={still_missing}), new last={new_last}")
+        return
 
-    merged, _ = _merge_append(crypto.csv_path, new_df)
-    merged_dates = pd.to_datetime(merged["Start"], errors="coerce").dt.date
-    added = int((merged_dates > last).sum())
+    with instrument.span("merge") as sp:
+        merged, _ = _merge_append(crypto.csv_path, new_df)
+        sp.add(rows=len(merged))
 
     if dry_run:
         print(
-            f"[{crypto.name}] dry-run: would write {len(merged)} rows (estimated added={added})"
+            f"[{crypto.name}] dry-run: would write {len(merged)} rows (added={added}, "
+            f"still missing={still_missing})"
         )
         return
 
-    _write_csv(crypto.csv_path, merged)
+    with instrument.span("write"):
+        _write_csv(crypto.csv_path, merged)
     new_last = _read_last_date(crypto.csv_path)
     print(
-        f"[{crypto.name}] wrote {len(merged)} rows (added={added}), new last={new_last}"
+        f"[{crypto.name}] wrote {len(merged)} rows (added={added}, still missing={still_missing}), "
+        f"new last={new_last}"
     )
 
 
@@ -238,8 +481,22 @@ def main() -> int:
         action="store_true",
         help="Download and merge in-memory without writing files.",
     )
+    parser.add_argument(
+        "--kraken-url",
+        default=KRAKEN_OHLC_URL,
+        help=f"Kraken OHLC endpoint (default: {KRAKEN_OHLC_URL})",
+    )
+    parser.add_argument(
+        "--migrate-sort",
+        action="store_true",
+        help="Rewrite the existing CSVs in ascending Start order (no download) and exit.",
+    )
     parser.add_argument("--debug", action="store_true", help="Print debug info.")
+    add_cache_args(parser)
+    instrument.add_metrics_args(parser)
+    profiling.add_profile_args(parser)
     args = parser.parse_args()
+    profiling.start(args, "update_crypto")
 
     end = (
         _utc_today()
@@ -257,11 +514,35 @@ def main() -> int:
         Crypto(name="monero", pair="XMRUSD", csv_path=xmr_path),
     ]
 
+    if args.migrate_sort:
+        for crypto in cryptos:
+            migrate_sort(crypto, dry_run=args.dry_run)
+        return 0
+
+    cache = cache_from_args(args)
+    session = make_session(cache)
+    ok = True
     for crypto in cryptos:
         try:
-            update_crypto(crypto, end=end, dry_run=args.dry_run, debug=args.debug)
+            with instrument.source(crypto.name):
+                update_crypto(
+                    crypto,
+                    end=end,
+                    dry_run=args.dry_run,
+                    debug=args.debug,
+                    base_url=args.kraken_url,
+                    session=session,
+                )
         except Exception as e:
+            ok = False
             print(f"[{crypto.name}] ERROR: {e}")
+    if cache is not None:
+        print(f"[cache] {cache.summary()}")
+    for line in DEFAULT_CLIENT.summary():
+        print(f"[http] {line}")
+    instrument.finish(
+        args, "crypto", ok=ok, http=DEFAULT_CLIENT.metrics(), cache=None if cache is None else cache.stats
+    )
 
     return 0
 
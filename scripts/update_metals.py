@@ -2,13 +2,17 @@
 from __future__ import annotations
 
 import argparse
+import io
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from time import sleep
 
-import pandas as pd
-import yfinance as yf
+import instrument
+import profiling
+from csv_io import append_text, atomic_write, can_append, read_max_date
+from debase_data.cache import refresh_cache
+from http_cache import DEFAULT_TTLS, HttpCache, OfflineCacheMiss, add_cache_args, cache_from_args
+from http_client import DEFAULT_CLIENT, RateLimited
 
 
 @dataclass(frozen=True)
@@ -20,6 +24,23 @@ class Metal:
 
 CSV_COLUMNS = ["Price", "Close", "High", "Low", "Open", "Volume"]
 
+# Rate-limit/retry key for yfinance (it talks to several Yahoo hosts through its own client).
+YAHOO_HOST = "yahoo"
+YAHOO_RATE_LIMIT_WAIT = 30.0
+
+# yfinance (and pandas) take most of this script's startup; both are imported only once a
+# download is actually needed, so `--help` and up-to-date runs stay on the standard library.
+yf = None
+
+
+def _yfinance():
+    global yf
+    if yf is None:
+        import yfinance
+
+        yf = yfinance
+    return yf
+
 
 def _utc_today() -> date:
     return datetime.now(timezone.utc).date()
@@ -59,29 +80,21 @@ def _resolve_dataset_path(default_relative: str) -> Path:
 
 
 def _read_last_date(csv_path: Path) -> date | None:
-    if not csv_path.exists() or csv_path.stat().st_size == 0:
-        return None
-
-    df = pd.read_csv(csv_path, usecols=["Price"])
-    if df.empty:
-        return None
-
-    parsed = pd.to_datetime(df["Price"], errors="coerce", utc=True)
-    parsed = parsed.dropna()
-    if parsed.empty:
-        return None
+    # Reads only the first/last few KB when the file is date-sorted (full scan otherwise).
+    return read_max_date(csv_path, "Price")
 
-    return parsed.max().date()
 
+def _fetch_yahoo_daily(ticker: str, start_inclusive: date, end_inclusive: date) -> pd.DataFrame:
+    import pandas as pd
 
-def _download_yahoo_daily(ticker: str, start_inclusive: date, end_inclusive: date) -> pd.DataFrame:
     # yfinance end is exclusive
     end_exclusive = end_inclusive + timedelta(days=1)
 
-    df: pd.DataFrame | None = None
-    for attempt in range(1, 4):
+    def attempt() -> pd.DataFrame:
+        DEFAULT_CLIENT.throttle(YAHOO_HOST)
+        yahoo = _yfinance()
         try:
-            df = yf.download(
+            return yahoo.download(
                 ticker,
                 start=start_inclusive.isoformat(),
                 end=end_exclusive.isoformat(),
@@ -91,12 +104,18 @@ def _download_yahoo_daily(ticker: str, start_inclusive: date, end_inclusive: dat
                 progress=False,
                 threads=False,
             )
-            break
         except Exception as e:
-            if attempt == 3:
-                print(f"[yahoo:{ticker}] download failed after {attempt} attempts: {e}")
-                return pd.DataFrame(columns=CSV_COLUMNS)
-            sleep(1.5 * attempt)
+            from yfinance.exceptions import YFRateLimitError
+
+            if isinstance(e, YFRateLimitError):
+                raise RateLimited(f"Yahoo rate limit: {e}", retry_after=YAHOO_RATE_LIMIT_WAIT) from e
+            raise
+
+    try:
+        df = DEFAULT_CLIENT.call(YAHOO_HOST, attempt, what=f"Yahoo {ticker}")
+    except Exception as e:
+        print(f"[yahoo:{ticker}] download failed: {e}")
+        return pd.DataFrame(columns=CSV_COLUMNS)
 
     if df is None or df.empty:
         return pd.DataFrame(columns=CSV_COLUMNS)
@@ -141,7 +160,33 @@ def _download_yahoo_daily(ticker: str, start_inclusive: date, end_inclusive: dat
     return out[CSV_COLUMNS]
 
 
+def _download_yahoo_daily(
+    ticker: str,
+    start_inclusive: date,
+    end_inclusive: date,
+    cache: HttpCache | None = None,
+) -> pd.DataFrame:
+    import pandas as pd
+
+    if cache is None:
+        return _fetch_yahoo_daily(ticker, start_inclusive, end_inclusive)
+
+    # yfinance doesn't go through requests, so the normalized rows are memoized instead.
+    def fetch() -> bytes | None:
+        rows = _fetch_yahoo_daily(ticker, start_inclusive, end_inclusive)
+        return None if rows.empty else rows.to_csv(index=False).encode("utf-8")
+
+    key = cache.key("yahoo", ticker, start_inclusive.isoformat(), end_inclusive.isoformat())
+    body = cache.memoize(key, DEFAULT_TTLS["yahoo"], fetch)
+    instrument.add(bytes=len(body or b""))
+    if body is None:
+        return pd.DataFrame(columns=CSV_COLUMNS)
+    return pd.read_csv(io.BytesIO(body), dtype={"Price": str}, float_precision="round_trip")[CSV_COLUMNS]
+
+
 def _merge_append(existing_csv: Path, new_rows: pd.DataFrame) -> tuple[pd.DataFrame, int]:
+    import pandas as pd
+
     if existing_csv.exists() and existing_csv.stat().st_size > 0:
         existing = pd.read_csv(existing_csv)
     else:
@@ -167,19 +212,41 @@ def _merge_append(existing_csv: Path, new_rows: pd.DataFrame) -> tuple[pd.DataFr
     return merged[CSV_COLUMNS], after
 
 
+def _try_append(csv_path: Path, new_rows: pd.DataFrame, dry_run: bool) -> bool:
+    """
+    Append `new_rows` in place when they all come strictly after the file's last date
+    and the file is sorted; returns False when a full merge-rewrite is needed instead.
+    """
+    import pandas as pd
+
+    new_dates = [d.date() for d in pd.to_datetime(new_rows["Price"])]
+    if not can_append(csv_path, "Price", CSV_COLUMNS, new_dates):
+        return False
+    if not dry_run:
+        text = new_rows[CSV_COLUMNS].to_csv(index=False, header=False)
+        with instrument.span("write"):
+            append_text(csv_path, text)
+            instrument.add(rows=len(new_rows), bytes=len(text))
+            refresh_cache(csv_path)
+    return True
+
+
 def _write_csv(csv_path: Path, df: pd.DataFrame) -> None:
-    csv_path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(csv_path, index=False)
+    # temp file + atomic rename: readers never see a half-written file
+    atomic_write(csv_path, lambda f: df.to_csv(f, index=False))
+    instrument.add(rows=len(df), bytes=csv_path.stat().st_size)
+    refresh_cache(csv_path)
 
 
-def update_metal(metal: Metal, end: date, dry_run: bool) -> None:
+def update_metal(metal: Metal, end: date, dry_run: bool, cache: HttpCache | None = None) -> None:
     if not metal.csv_path.exists():
         print(
             f"[{metal.name}] WARNING: {metal.csv_path} not found "
             f"(CWD={Path.cwd()}; are you mounting the repo root into /work?)"
         )
 
-    last = _read_last_date(metal.csv_path)
+    with instrument.span("read"):
+        last = _read_last_date(metal.csv_path)
     if last is None:
         # If file is missing/empty, pull from the earliest date already used in your datasets.
         start = date(2001, 1, 1)
@@ -191,23 +258,38 @@ def update_metal(metal: Metal, end: date, dry_run: bool) -> None:
         return
 
     print(f"[{metal.name}] downloading {metal.ticker} from {start} to {end} into {metal.csv_path}")
-    new_rows = _download_yahoo_daily(metal.ticker, start_inclusive=start, end_inclusive=end)
+    with instrument.span("fetch") as sp:
+        new_rows = _download_yahoo_daily(metal.ticker, start_inclusive=start, end_inclusive=end, cache=cache)
+        sp.add(rows=len(new_rows))
     if new_rows.empty:
         print(f"[{metal.name}] no new rows returned")
         return
 
-    merged, _ = _merge_append(metal.csv_path, new_rows)
-    merged_dates = pd.to_datetime(merged["Price"], errors="coerce").dt.date
+    # Fast path: only new trailing days -> append them instead of rewriting the history.
+    appended = _try_append(metal.csv_path, new_rows, dry_run=dry_run)
+    if appended:
+        if dry_run:
+            print(f"[{metal.name}] dry-run: would append {len(new_rows)} rows")
+            return
+        new_last = _read_last_date(metal.csv_path)
+        print(f"[{metal.name}] appended {len(new_rows)} rows, new last={new_last}")
+        return
+
+    with instrument.span("merge") as sp:
+        merged, _ = _merge_append(metal.csv_path, new_rows)
+        sp.add(rows=len(merged))
     if last is None:
         added = len(merged)
     else:
-        added = int((merged_dates > last).sum())
+        # ISO dates compare as strings (unparseable ones were dropped by the merge)
+        added = int((merged["Price"].str[:10] > last.isoformat()).sum())
 
     if dry_run:
         print(f"[{metal.name}] dry-run: would write {len(merged)} rows (estimated added={added})")
         return
 
-    _write_csv(metal.csv_path, merged)
+    with instrument.span("write"):
+        _write_csv(metal.csv_path, merged)
     new_last = _read_last_date(metal.csv_path)
     print(f"[{metal.name}] wrote {len(merged)} rows (added~{added}), new last={new_last}")
 
@@ -219,7 +301,12 @@ def main() -> int:
     parser.add_argument("--end", default=None, help="End date (YYYY-MM-DD). Default: today (UTC).")
     parser.add_argument("--dry-run", action="store_true", help="Download and merge in-memory without writing files.")
     parser.add_argument("--debug", action="store_true", help="Print debug info about Yahoo responses.")
+    add_cache_args(parser)
+    instrument.add_metrics_args(parser)
+    profiling.add_profile_args(parser)
     args = parser.parse_args()
+    profiling.start(args, "update_metals")
+    cache = cache_from_args(args)
 
     end = _utc_today() if args.end is None else datetime.strptime(args.end, "%Y-%m-%d").date()
 
@@ -234,8 +321,21 @@ def main() -> int:
         print(f"[debug] gold_path={gold.csv_path} exists={gold.csv_path.exists()}")
         print(f"[debug] silver_path={silver.csv_path} exists={silver.csv_path.exists()}")
 
-    update_metal(gold, end=end, dry_run=args.dry_run)
-    update_metal(silver, end=end, dry_run=args.dry_run)
+    ok = True
+    for metal in (gold, silver):
+        try:
+            with instrument.source(metal.name):
+                update_metal(metal, end=end, dry_run=args.dry_run, cache=cache)
+        except OfflineCacheMiss as e:
+            ok = False
+            print(f"[{metal.name}] ERROR: {e}")
+    if cache is not None:
+        print(f"[cache] {cache.summary()}")
+    for line in DEFAULT_CLIENT.summary():
+        print(f"[http] {line}")
+    instrument.finish(
+        args, "metals", ok=ok, http=DEFAULT_CLIENT.metrics(), cache=None if cache is None else cache.stats
+    )
     return 0
 
 
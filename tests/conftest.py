@@ -0,0 +1,72 @@
+"""
+Shared test setup: `scripts/` on sys.path (as when the scripts are run directly) and a local
+HTTP stub server for the API fetchers.
+
+Run from repo root:
+
+    python3 -m pytest -q tests
+"""
+from __future__ import annotations
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+# (method, query, JSON body or None) -> JSON response
+Responder = Callable[[str, dict[str, list[str]], "dict | None"], dict]
+
+
+@pytest.fixture
+def stub_server():
+    """
+    `stub_server(responder)` starts a server answering every GET/POST with `responder(...)` as
+    JSON and returns its base URL. Requests are recorded on `responder.calls`.
+    """
+    servers: list[ThreadingHTTPServer] = []
+
+    def start(responder: Responder) -> str:
+        calls: list[tuple[str, dict, dict | None]] = []
+        lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            def _answer(self, method: str) -> None:
+                query = parse_qs(urlsplit(self.path).query)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                with lock:
+                    calls.append((method, query, body))
+                out = json.dumps(responder(method, query, body)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+            def do_GET(self) -> None:
+                self._answer("GET")
+
+            def do_POST(self) -> None:
+                self._answer("POST")
+
+            def log_message(self, *args) -> None:
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        responder.calls = calls
+        return f"http://127.0.0.1:{server.server_port}/"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import pandas as pd
+
+import analytic
+
+
+def _closes(values, start="2024-01-01"):
+    return pd.Series(values, index=pd.date_range(start, periods=len(values), freq="D"), dtype=float)
+
+
+def test_ath_engine_counts_aths_from_start_date():
+    prices = {"BTC": _closes([1, 3, 2, 4, 5]), "ETH": _closes([5, 4, 6, 6, 1])}
+
+    result = analytic.ath_engine(prices, "2024-01-03")
+
+    assert result.counts == {"BTC": 2, "ETH": 2}
+    assert result.pre_ath_values == {"BTC": 3.0, "ETH": 5.0}
+    assert list(result.events["Date"]) == list(pd.date_range("2024-01-03", periods=3, freq="D"))
+    assert list(result.events["ATH_Coins"]) == ["ETH", "BTC, ETH", "BTC"]
+
+
+def test_ath_engine_no_ath_after_start_date():
+    prices = {"BTC": _closes([1, 5, 4, 3, 2]), "ETH": _closes([2, 3, 1, 1, 1])}
+
+    result = analytic.ath_engine(prices, "2024-01-03")
+
+    assert result.counts == {"BTC": 0, "ETH": 0}
+    assert result.events.empty
+    assert list(result.events.columns) == ["Date", "ATH_Coins", "BTC_Price", "ETH_Price"]
+    assert result.pre_ath_values == {"BTC": 5.0, "ETH": 3.0}
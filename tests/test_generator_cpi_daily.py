@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import importlib.util
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+GENERATOR_PY = Path(__file__).resolve().parent.parent / "datasets" / "generator_cpi_daily.py"
+spec = importlib.util.spec_from_file_location("generator_cpi_daily", GENERATOR_PY)
+gen = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(gen)
+
+TARGET_END = date(2024, 9, 15)
+
+
+def cpi_table(last: tuple[int, int] = (2024, 6), revised: dict | None = None) -> pd.DataFrame:
+    """Monthly CPI table from 2015 through `last`, values rising by a varying monthly step."""
+    revised = revised or {}
+    rows = []
+    for year in range(2015, last[0] + 1):
+        row = {"Year": year}
+        for month, col in enumerate(gen.MONTH_COLS, start=1):
+            n = (year - 2015) * 12 + month
+            value = round(230 + n * 0.4 + np.sin(n) * 0.7, 3)
+            row[col] = revised.get((year, month), value) if (year, month) <= last else np.nan
+        rows.append(row)
+    return pd.DataFrame(rows, columns=["Year", *gen.MONTH_COLS])
+
+
+def _full_rebuild(table: pd.DataFrame, path: Path, target_end: date = TARGET_END) -> bytes:
+    gen.write_daily_cpi(gen.generate_daily_cpi(table, target_end=target_end), path)
+    return path.read_bytes()
+
+
+def _check_update(tmp_path, old_table, new_table, touched, old_end=TARGET_END, new_end=TARGET_END, edit=None):
+    daily = tmp_path / "daily_cpi_inflation.csv"
+    _full_rebuild(old_table, daily, old_end)
+    if edit:
+        edit(daily)
+
+    gen.update_daily_cpi(new_table, daily, touched, target_end=new_end)
+
+    assert daily.read_bytes() == _full_rebuild(new_table, tmp_path / "full.csv", new_end)
+
+
+def test_revised_old_month(tmp_path):
+    _check_update(tmp_path, cpi_table(), cpi_table(revised={(2019, 5): 250.0}), {(2019, 5)})
+
+
+def test_revised_first_month(tmp_path):
+    _check_update(tmp_path, cpi_table(), cpi_table(revised={(2015, 1): 229.0}), {(2015, 1)})
+
+
+def test_appended_month(tmp_path):
+    _check_update(tmp_path, cpi_table(last=(2024, 6)), cpi_table(last=(2024, 7)), {(2024, 7)})
+
+
+def test_target_end_moved_forward(tmp_path):
+    _check_update(tmp_path, cpi_table(), cpi_table(), set(), old_end=date(2024, 7, 10))
+
+
+def test_stale_daily_file(tmp_path):
+    # The file was built from a table ending in March; the update only reports June as touched.
+    _check_update(
+        tmp_path, cpi_table(last=(2024, 3)), cpi_table(last=(2024, 6)), {(2024, 6)}, old_end=date(2024, 4, 10)
+    )
+
+
+@pytest.mark.parametrize("keep_lines", [1, 2, 500, 3000])
+def test_truncated_daily_file(tmp_path, keep_lines):
+    def truncate(path):
+        lines = path.read_bytes().splitlines(keepends=True)
+        path.write_bytes(b"".join(lines[:keep_lines]))
+
+    _check_update(tmp_path, cpi_table(), cpi_table(revised={(2024, 5): 300.0}), {(2024, 5)}, edit=truncate)
+
+
+def test_missing_daily_file(tmp_path):
+    daily = tmp_path / "daily_cpi_inflation.csv"
+
+    gen.update_daily_cpi(cpi_table(), daily, {(2024, 6)}, target_end=TARGET_END)
+
+    assert daily.read_bytes() == _full_rebuild(cpi_table(), tmp_path / "full.csv")
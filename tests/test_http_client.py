@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import pytest
+import requests
+
+from http_client import (
+    CircuitOpen,
+    HostPolicy,
+    QuotaExceeded,
+    RequestRejected,
+    RetriesExhausted,
+    RetryClient,
+    RetryPolicy,
+)
+
+HOST = "api.example.com"
+
+
+def make_client() -> RetryClient:
+    policies = {HOST: HostPolicy(failure_threshold=2, cooldown=300.0)}
+    return RetryClient(policies=policies, retry=RetryPolicy(attempts=3), sleep=lambda s: None, seed=0)
+
+
+def http_error(status: int) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"HTTP {status}", response=response)
+
+
+def failing(err: Exception):
+    calls = []
+
+    def attempt():
+        calls.append(1)
+        raise err
+
+    attempt.calls = calls
+    return attempt
+
+
+def ok():
+    return "ok"
+
+
+@pytest.mark.parametrize("err", [http_error(400), http_error(404), RequestRejected("EQuery:Unknown asset pair")])
+def test_bad_requests_do_not_open_the_circuit(err):
+    client = make_client()
+
+    for _ in range(3):
+        attempt = failing(err)
+        with pytest.raises(type(err)):
+            client.call(HOST, attempt, what="bad")
+        assert len(attempt.calls) == 1  # not retried
+
+    assert client.call(HOST, ok, what="good") == "ok"
+    assert client.metrics()[HOST]["failures"] == 3
+    assert client.metrics()[HOST]["short_circuits"] == 0
+
+
+@pytest.mark.parametrize("err", [http_error(500), http_error(429), requests.ConnectionError("refused")])
+def test_host_failures_open_the_circuit(err):
+    client = make_client()
+
+    for _ in range(2):
+        attempt = failing(err)
+        with pytest.raises(RetriesExhausted):
+            client.call(HOST, attempt, what="down")
+        assert len(attempt.calls) == 3
+
+    with pytest.raises(CircuitOpen):
+        client.call(HOST, ok, what="good")
+
+
+def test_bad_request_resets_the_failure_streak():
+    client = make_client()
+
+    with pytest.raises(RetriesExhausted):
+        client.call(HOST, failing(http_error(503)), what="down")
+    with pytest.raises(requests.HTTPError):
+        client.call(HOST, failing(http_error(400)), what="bad")
+    with pytest.raises(RetriesExhausted):
+        client.call(HOST, failing(http_error(503)), what="down")
+
+    assert client.call(HOST, ok, what="good") == "ok"
+
+
+def test_quota_exceeded_opens_the_circuit_at_once():
+    client = make_client()
+
+    with pytest.raises(QuotaExceeded):
+        client.call(HOST, failing(QuotaExceeded("daily threshold")), what="quota")
+    with pytest.raises(CircuitOpen):
+        client.call(HOST, ok, what="good")
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import csv
+import time
+
+import update_cpi
+from update_cpi import BLS_MAX_SERIES, BLS_MAX_YEARS, CpiConfig
+
+
+def bls_value(series_id: str, year: int, month: int) -> str:
+    """A distinct value per series and month, so misrouted rows are easy to spot."""
+    return f"{100 + (year - 1900) + month / 100 + (sum(map(ord, series_id)) % 50) * 1000:.3f}"
+
+
+class BlsStub:
+    """BLS timeseries endpoint: every month of the requested years, newest first (like BLS)."""
+
+    def __init__(self, delay_for_year=None):
+        self.delay_for_year = delay_for_year
+
+    def __call__(self, method, query, body):
+        y1, y2 = int(body["startyear"]), int(body["endyear"])
+        if self.delay_for_year:
+            time.sleep(self.delay_for_year(y1))
+        series = [
+            {
+                "seriesID": s,
+                "data": [
+                    {"year": str(y), "period": f"M{m:02d}", "value": bls_value(s, y, m)}
+                    for y in range(y2, y1 - 1, -1)
+                    for m in range(12, 0, -1)
+                ],
+            }
+            for s in body["seriesid"]
+        ]
+        return {"status": "REQUEST_SUCCEEDED", "message": [], "Results": {"series": series}}
+
+
+def test_bls_chunks_split_years_and_series():
+    ids = [f"S{i}" for i in range(BLS_MAX_SERIES + 2)]
+
+    chunks = update_cpi._bls_chunks(ids, 1913, 1913 + 2 * BLS_MAX_YEARS)
+
+    year_ranges = [(1913, 1932), (1933, 1952), (1953, 1953)]
+    assert chunks == [(ids[:BLS_MAX_SERIES], y1, y2) for y1, y2 in year_ranges] + [
+        (ids[BLS_MAX_SERIES:], y1, y2) for y1, y2 in year_ranges
+    ]
+    assert update_cpi._bls_chunks(["S"], 2024, 2026) == [(["S"], 2024, 2026)]
+    assert update_cpi._bls_chunks(["S"], 2027, 2026) == []
+
+
+def test_bls_fetch_range_keeps_chunk_order(stub_server):
+    # The earliest chunk answers last, so completion order is the reverse of request order.
+    stub = BlsStub(delay_for_year=lambda year: max(0.0, (1990 - year) / 200))
+    url = stub_server(stub)
+
+    rows = update_cpi._bls_fetch_range(["A", "B"], 1913, 1990, debug=False, url=url, max_workers=4)
+
+    assert len(stub.calls) == 4
+    starts = [(y1, y2) for _, y1, y2 in update_cpi._bls_chunks(["A", "B"], 1913, 1990)]
+    for series_id in ("A", "B"):
+        expected = [
+            (str(y), f"M{m:02d}") for y1, y2 in starts for y in range(y2, y1 - 1, -1) for m in range(12, 0, -1)
+        ]
+        assert [(r["year"], r["period"]) for r in rows[series_id]] == expected
+        assert all(r["value"] == bls_value(series_id, int(r["year"]), int(r["period"][1:])) for r in rows[series_id])
+
+
+def _read_table(path):
+    with open(path, newline="") as f:
+        return {int(row["Year"]): row for row in csv.DictReader(f)}
+
+
+def test_extra_series_go_to_their_own_tables(stub_server, tmp_path):
+    stub = BlsStub()
+    url = stub_server(stub)
+    configs = [
+        CpiConfig("CUUR0000SA0L1E", tmp_path / "CPI_core.csv"),
+        CpiConfig("CWUR0000SA0", tmp_path / "CPI_W.csv"),
+    ]
+
+    update_cpi.update_cpi_series(
+        configs, end_year=1950, dry_run=False, debug=False, lookback_years=3, overwrite_existing=True, bls_url=url
+    )
+
+    # Both series share every request (1913-1950 is two year chunks).
+    assert [sorted(body["seriesid"]) for _, _, body in stub.calls] == [["CUUR0000SA0L1E", "CWUR0000SA0"]] * 2
+    for cfg in configs:
+        table = _read_table(cfg.cpi_csv)
+        assert sorted(table) == list(range(1913, 1951))
+        for year in (1913, 1932, 1933, 1950):
+            for month, col in update_cpi.MONTH_NUM_TO_COL.items():
+                assert float(table[year][col]) == float(bls_value(cfg.series_id, year, month))
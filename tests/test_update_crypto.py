@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import pytest
+
+import update_crypto
+from http_client import RequestRejected, RetryClient
+from update_crypto import DAY_SECONDS, KRAKEN_MAX_CANDLES, Crypto
+
+FIRST_DAY = date(2020, 1, 1)
+N_DAYS = 2000
+
+
+class KrakenStub:
+    """Kraken's OHLC endpoint over N_DAYS daily candles: at most 720 newer than `since` per call."""
+
+    def __init__(self):
+        self.first_ts = update_crypto._day_ts(FIRST_DAY)
+
+    def __call__(self, method, query, body):
+        since = int(query["since"][0])
+        first = max(self.first_ts, -(-(since + 1) // DAY_SECONDS) * DAY_SECONDS)
+        last = min(first + KRAKEN_MAX_CANDLES * DAY_SECONDS, self.first_ts + N_DAYS * DAY_SECONDS)
+        candles = [
+            [ts, "1.0", "2.0", "0.5", str(ts // DAY_SECONDS), "1.0", "10.0", 5]
+            for ts in range(first, last, DAY_SECONDS)
+        ]
+        return {"error": [], "result": {"XXBTZUSD": candles, "last": candles[-1][0] if candles else since}}
+
+
+def _utc_day(ts: int) -> date:
+    return date(1970, 1, 1) + timedelta(days=ts // DAY_SECONDS)
+
+
+def test_paged_fetch_follows_last_cursor(stub_server):
+    stub = KrakenStub()
+    url = stub_server(stub)
+    first, last = FIRST_DAY + timedelta(days=10), FIRST_DAY + timedelta(days=1609)
+
+    rows = update_crypto._fetch_kraken_ohlc_paged("XBTUSD", first, last, base_url=url)
+
+    days = [_utc_day(r["timestamp"]) for r in rows]
+    assert days == [first + timedelta(days=i) for i in range(1600)]
+    sinces = [int(q["since"][0]) for _, q, _ in stub.calls]
+    # 1600 days at 720 candles per call; every page starts from the previous page's `last`.
+    assert len(sinces) == 3
+    assert sinces[0] == update_crypto._day_ts(first) - 1
+    assert sinces[1] == update_crypto._day_ts(first) + (KRAKEN_MAX_CANDLES - 1) * DAY_SECONDS
+    assert sinces[2] == sinces[1] + KRAKEN_MAX_CANDLES * DAY_SECONDS
+
+
+def test_single_call_is_capped_at_720_candles(stub_server):
+    url = stub_server(KrakenStub())
+
+    rows, last = update_crypto._fetch_kraken_ohlc("XBTUSD", update_crypto._day_ts(FIRST_DAY) - 1, base_url=url)
+
+    assert len(rows) == KRAKEN_MAX_CANDLES
+    assert last == rows[-1]["timestamp"]
+
+
+def test_unknown_pair_is_rejected_without_retries(stub_server):
+    def unknown_pair(method, query, body):
+        return {"error": ["EQuery:Unknown asset pair"]}
+
+    url = stub_server(unknown_pair)
+    client = RetryClient(policies={}, sleep=lambda s: None)
+
+    with pytest.raises(RequestRejected):
+        update_crypto._fetch_kraken_ohlc("XBTUSDX", 0, base_url=url, client=client)
+    assert len(unknown_pair.calls) == 1
+    assert client.metrics()["127.0.0.1"]["failures"] == 1
+
+
+def test_paged_fetch_stops_at_end(stub_server):
+    stub = KrakenStub()
+    url = stub_server(stub)
+    first, last = FIRST_DAY + timedelta(days=100), FIRST_DAY + timedelta(days=199)
+
+    rows = update_crypto._fetch_kraken_ohlc_paged("XBTUSD", first, last, base_url=url)
+
+    # The stub returns 720 candles; everything after `last` is dropped and no second page is asked for.
+    assert [_utc_day(r["timestamp"]) for r in rows] == [first + timedelta(days=i) for i in range(100)]
+    assert len(stub.calls) == 1
+
+
+def test_paged_fetch_stops_when_nothing_newer(stub_server):
+    stub = KrakenStub()
+    url = stub_server(stub)
+    first = FIRST_DAY + timedelta(days=N_DAYS - 10)
+
+    rows = update_crypto._fetch_kraken_ohlc_paged("XBTUSD", first, first + timedelta(days=100), base_url=url)
+
+    # The second page comes back empty, which ends the paging before `last`.
+    assert len(rows) == 10
+    assert len(stub.calls) == 2
+
+
+def test_find_missing_ranges_holes_and_tail():
+    d = date(2024, 1, 1)
+    starts = [d, d + timedelta(days=1), d + timedelta(days=4), d + timedelta(days=5), d + timedelta(days=7)]
+
+    missing = update_crypto._find_missing_ranges(starts, d + timedelta(days=9))
+
+    assert missing == [
+        (d + timedelta(days=2), d + timedelta(days=3)),
+        (d + timedelta(days=6), d + timedelta(days=6)),
+        (d + timedelta(days=8), d + timedelta(days=9)),
+    ]
+
+
+def test_find_missing_ranges_up_to_date():
+    d = date(2024, 1, 1)
+    starts = [d + timedelta(days=i) for i in range(5)]
+
+    assert update_crypto._find_missing_ranges(starts, d + timedelta(days=4)) == []
+    assert update_crypto._find_missing_ranges(starts, d) == []
+    assert update_crypto._find_missing_ranges([], d) == []
+
+
+def test_plan_fetch_windows_coalesces_nearby_holes():
+    d = date(2020, 1, 1)
+    missing = [
+        (d + timedelta(days=1000), d + timedelta(days=1001)),
+        (d, d + timedelta(days=2)),
+        (d + timedelta(days=100), d + timedelta(days=100)),
+    ]
+
+    windows = update_crypto._plan_fetch_windows(missing)
+
+    # The first two holes are within 720 days of each other and share pages; the last one doesn't.
+    assert windows == [(d, d + timedelta(days=100)), (d + timedelta(days=1000), d + timedelta(days=1001))]
+
+
+def test_split_fetchable_cuts_at_oldest_day():
+    d = date(2024, 1, 1)
+    missing = [
+        (d, d + timedelta(days=2)),
+        (d + timedelta(days=8), d + timedelta(days=12)),
+        (d + timedelta(days=20), d + timedelta(days=20)),
+    ]
+
+    fetchable, too_old = update_crypto._split_fetchable(missing, d + timedelta(days=10))
+
+    assert fetchable == [(d + timedelta(days=10), d + timedelta(days=12)), missing[2]]
+    assert too_old == [missing[0], (d + timedelta(days=8), d + timedelta(days=9))]
+    assert update_crypto._split_fetchable(missing, None) == (missing, [])
+
+
+def _write_csv(csv_path, days):
+    csv_path.write_text(
+        "Start,End,Open,High,Low,Close,Volume,Market Cap\n"
+        + "".join(f"{d},{d + timedelta(days=1)},1.0,1.0,1.0,1.0,1.0,\n" for d in days)
+    )
+
+
+def test_update_crypto_fills_hole_and_tail(stub_server, tmp_path):
+    stub = KrakenStub()
+    url = stub_server(stub)
+    csv_path = tmp_path / "btc.csv"
+    _write_csv(csv_path, [FIRST_DAY + timedelta(days=i) for i in range(30) if i not in (10, 11)])
+
+    update_crypto.update_crypto(
+        Crypto("bitcoin", "XBTUSD", csv_path),
+        FIRST_DAY + timedelta(days=34),
+        dry_run=False,
+        debug=False,
+        base_url=url,
+        history_days=None,
+    )
+
+    starts = update_crypto._read_start_dates(csv_path)
+    assert starts == [FIRST_DAY + timedelta(days=i) for i in range(35)]
+    assert len(stub.calls) == 1  # hole and tail are close enough for one fetch window
+
+
+def test_update_crypto_skips_holes_older_than_the_api_serves(stub_server, tmp_path, monkeypatch, capsys):
+    stub = KrakenStub()
+    url = stub_server(stub)
+    today = FIRST_DAY + timedelta(days=KRAKEN_MAX_CANDLES + 100)
+    monkeypatch.setattr(update_crypto, "_utc_today", lambda: today)
+    csv_path = tmp_path / "btc.csv"
+    _write_csv(csv_path, [FIRST_DAY + timedelta(days=i) for i in range(KRAKEN_MAX_CANDLES + 101) if i != 5])
+
+    update_crypto.update_crypto(Crypto("bitcoin", "XBTUSD", csv_path), today, dry_run=False, debug=False, base_url=url)
+
+    assert stub.calls == []
+    assert "up to date" in capsys.readouterr().out
+    assert FIRST_DAY + timedelta(days=5) not in update_crypto._read_start_dates(csv_path)